@@ -7,6 +7,8 @@ import sys
 
 # 导入监控界面模块
 import gui_AI 
+# 物理单位换算公式 (与波形分析器共用)
+import fb284_units
 
 ICON_FILE = 'svg_code_to_png.ico'
 
@@ -619,8 +621,12 @@ class FB284Calculator(tk.Tk):
         self.create_output_row_grid(res_col2, 4, '📍 电机单圈位置指令:', self.res_pos_cmd, 'LU/圈')
         self.create_output_row_grid_dynamic_unit(res_col2, 5, '📍 负载单圈位置指令:', self.res_unit_convert, self.res_pos_ref_unit)
 
-        btn_calc = RoundedButton(panel, text='执行EPOS计算', command=self.calc_drive, width=220, height=50, bg_normal='#A3BE8C', bg_hover='#B5D19E', fg_color='#2E3440', outer_bg=self.colors['bg_output'])
-        btn_calc.grid(row=1, column=0, columnspan=3, pady=(15, 0))
+        btn_bar = ttk.Frame(panel, style='Output.TFrame')
+        btn_bar.grid(row=1, column=0, columnspan=3, pady=(15, 0))
+        btn_calc = RoundedButton(btn_bar, text='执行EPOS计算', command=self.calc_drive, width=220, height=50, bg_normal='#A3BE8C', bg_hover='#B5D19E', fg_color='#2E3440', outer_bg=self.colors['bg_output'])
+        btn_calc.pack(side='left', padx=(0, 15))
+        btn_export = RoundedButton(btn_bar, text='导出参数到波形分析器', command=self.export_params, width=220, height=50, bg_normal='#5E81AC', bg_hover='#81A1C1', outer_bg=self.colors['bg_output'])
+        btn_export.pack(side='left')
 
     def create_rounded_row(self, parent, row, label, var):
         ttk.Label(parent, text=label).grid(row=row, column=0, sticky='e', padx=(0, 10), pady=6)
@@ -741,7 +747,7 @@ class FB284Calculator(tk.Tk):
             try:
                 act_code_val = float(self.act_vel_code.get())
                 # 公式: 额定转速 * (输入值 / 1073741824)
-                act_real_rpm = rated * (act_code_val / 1073741824.0)
+                act_real_rpm = fb284_units.nist_to_rpm(act_code_val, rated)
                 self.res_act_vel.set(f'{act_real_rpm:.2f}')
                 
                 # --- 实际负载转速逻辑 (严谨模式) ---
@@ -760,13 +766,8 @@ class FB284Calculator(tk.Tk):
                     if mn == 0 or md == 0: 
                         raise ValueError
                     
-                    act_load_rpm = act_real_rpm * (md / mn)
-                    
-                    if self.mech_type.get() == 'rotary':
-                        act_load_val = act_load_rpm * 6.0 
-                    else:
-                        lead = self.get_float(self.linear_lead)
-                        act_load_val = act_load_rpm / 60.0 * lead 
+                    act_load_rpm = fb284_units.motor_to_load_rpm(act_real_rpm, mn, md)
+                    act_load_val = fb284_units.load_rpm_to_speed(act_load_rpm, self.mech_type.get(), self.get_float(self.linear_lead))
                     
                     self.res_act_load_vel.set(f'{act_load_val:.2f}')
                 
@@ -778,12 +779,12 @@ class FB284Calculator(tk.Tk):
                 self.res_act_vel.set('---')
                 self.res_act_load_vel.set('---')
 
-            pos_lu_per_motor_rev = rd * enc / rn
+            pos_lu_per_motor_rev = fb284_units.lu_per_motor_rev(rn, rd, enc)
             self.res_pos_cmd.set(f'{pos_lu_per_motor_rev:.0f}')
             mech_type = self.mech_type.get()
             lead_val = 0.0
             vel = self.get_float(self.Velocity)
-            rpm = vel * 1000 * (ov_v / 100) / enc * (rn / rd)
+            rpm = fb284_units.setpoint_to_rpm(vel, ov_v, enc, rn, rd)
             self.res_motor_spd.set(f'{rpm:.2f}')
             try:
                 raw_mech_n = self.gear_n.get()
@@ -792,22 +793,21 @@ class FB284Calculator(tk.Tk):
                 mech_d = float(raw_mech_d)
                 if mech_d == 0 or mech_n == 0:
                     raise ValueError
-                motor_revs_per_load_rev = mech_n / mech_d
-                lu_total = pos_lu_per_motor_rev * motor_revs_per_load_rev
+                lu_total = fb284_units.lu_per_load_rev(rn, rd, enc, mech_n, mech_d)
                 self.res_unit_convert.set(f'{lu_total:.0f}')
                 if mech_type == 'rotary':
                     self.res_pos_ref_unit.set('LU/360°')
                 else:
                     lead_val = self.get_float(self.linear_lead)
                     self.res_pos_ref_unit.set(f'LU/{lead_val}mm')
-                load_rpm = rpm * (mech_d / mech_n)
-                real_speed = load_rpm * 6.0 if mech_type == 'rotary' else load_rpm / 60.0 * lead_val
+                load_rpm = fb284_units.motor_to_load_rpm(rpm, mech_n, mech_d)
+                real_speed = fb284_units.load_rpm_to_speed(load_rpm, mech_type, lead_val)
                 self.res_real_spd.set(f'{real_speed:.2f}')
             except (ValueError, TypeError):
                 self.res_unit_convert.set('---')
                 self.res_pos_ref_unit.set('---')
                 self.res_real_spd.set('---')
-            v_max = rated * rd * enc * 100 / (rn * 1000 * ov_v)
+            v_max = fb284_units.rated_velocity(rated, ov_v, enc, rn, rd)
             epos_acc, epos_dec = (self.get_float(self.Epos_Acc_Max), self.get_float(self.Epos_Dec_Max))
             ov_acc, ov_dec = (self.get_float(self.OverAcc), self.get_float(self.OverDec))
             t_epos_acc = vel * ov_v / (epos_acc * ov_acc * 60) if epos_acc * ov_acc > 0 else 0
@@ -822,6 +822,31 @@ class FB284Calculator(tk.Tk):
             self.res_jog_dec_t.set(f'{t_jog_dec:.3f}')
         except Exception as e:
             messagebox.showerror('计算错误', str(e))
+
+    def drive_params(self):
+        """ 当前参数集 (换算公式见 fb284_units)，机械减速比未计算时为 None """
+        def gear(var):
+            try:
+                return float(var.get())
+            except ValueError:
+                return None
+        return {
+            'ratio_n': self.get_float(self.ratio_n), 'ratio_d': self.get_float(self.ratio_d),
+            'enc_res': self.get_float(self.enc_res), 'rated_spd': self.get_float(self.rated_spd),
+            'gear_n': gear(self.gear_n), 'gear_d': gear(self.gear_d),
+            'linear_lead': self.get_float(self.linear_lead), 'mech_type': self.mech_type.get(),
+        }
+
+    def export_params(self):
+        """ 导出参数集，波形分析器的“派生通道 → 物理单位”导入后把原始字换算成物理量 """
+        params = self.drive_params()
+        try:
+            fb284_units.check_params(params, 'motor_rpm')
+            fb284_units.save_params(params)
+        except (ValueError, OSError) as e:
+            messagebox.showerror('导出失败', str(e))
+            return
+        messagebox.showinfo('导出成功', f'参数已导出，可在波形分析器中导入：\n{fb284_units.PARAMS_FILE}')
 if __name__ == '__main__':
     app = FB284Calculator()
     app.mainloop()
\ No newline at end of file
@@ -5,18 +5,35 @@ import numpy as np
 import pyqtgraph as pg
 import ctypes 
 import time
-import win32com.client as win32
-from io import StringIO
+import csv
+import json
+import shutil
+import hashlib
+import tempfile
+import itertools
+import threading
+import re
+from collections import OrderedDict
+from io import StringIO, BytesIO, TextIOBase, RawIOBase, BufferedReader
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
                              QHBoxLayout, QPushButton, QLabel, QFileDialog, 
-                             QDoubleSpinBox, QCheckBox, QMessageBox, QFrame, 
-                             QStyleFactory, QTableWidget, QTableWidgetItem, 
+                             QDoubleSpinBox, QSpinBox, QCheckBox, QMessageBox, QFrame, 
+                             QStyleFactory, QTableView, 
                              QHeaderView, QMenu, QAction, QDialog, QComboBox, 
                              QListWidget, QGroupBox, QGridLayout, QFormLayout, 
-                             QDialogButtonBox, QAbstractItemView, QListView)
+                             QDialogButtonBox, QAbstractItemView, QListView, QLineEdit,
+                             QListWidgetItem, QProgressBar)
 
 from PyQt5.QtGui import QFont, QColor, QPalette, QIcon, QBrush, QPainter, QPen, QCursor
-from PyQt5.QtCore import Qt, QThread, pyqtSignal, QTimer, QRectF, QPointF
+from PyQt5.QtCore import Qt, QObject, QAbstractTableModel, QModelIndex, QThread, pyqtSignal, QTimer, QRectF, QPointF, QSettings
+
+# 物理单位换算公式 (与 EPOS 计算器共用)
+import fb284_units
+# 状态字/控制字各位的含义 (与驱动状态监控共用)，用于位通道显示
+try:
+    from gui_AI import PANEL_CONFIGS
+except ImportError:
+    PANEL_CONFIGS = {}
 
 # === [新增] 导入 Word COM 接口库 ===
 try:
@@ -52,7 +69,7 @@ def set_window_icon(target_obj):
 try:
     myappid = 'mycompany.oscilloscope.pro.final_v26_XY_measure'
     ctypes.windll.shell32.SetCurrentProcessExplicitAppUserModelID(myappid)
-except ImportError:
+except (ImportError, AttributeError):
     pass
 
 # === 全局配置 ===
@@ -62,6 +79,72 @@ pg.setConfigOption('foreground', '#DCDFE4')
 
 WAVE_COLORS = ['#98C379', '#E06C75', '#E5C07B', '#61AFEF', '#C678DD', '#56B6C2', '#D19A66', '#ABB2BF']
 
+# === 分块读取配置 ===
+CSV_CHUNK_ROWS = 200000       # 每块解析的行数，决定文本解析阶段的内存上限
+PARTIAL_EMIT_INTERVAL = 0.5   # 渐进显示的最小刷新间隔 (秒)
+SNIFF_HEAD_BYTES = 256 * 1024 # 格式识别: 文件头采样字节数
+SNIFF_PROBE_BYTES = 64 * 1024 # 格式识别: 中部/尾部各采样字节数
+CHANNEL_PICKER_MIN_COLS = 10  # 列数达到此值时，导入前先弹出通道选择
+
+# === 二进制列缓存配置 ===
+CACHE_DIR = os.path.join(os.environ.get('LOCALAPPDATA') or os.path.expanduser('~'), 'WaveformAnalyzer', 'cache')
+CACHE_LIMIT_BYTES = 4 * 1024 ** 3   # 缓存总量上限，超出后按最近使用时间淘汰
+
+# === 外存模式配置 ===
+SPILL_ROOT = os.path.join(os.path.dirname(CACHE_DIR), 'spill')
+OUT_OF_CORE_AUTO_BYTES = 4 * 1024 ** 3   # 文本超过此大小时自动启用外存模式
+STORE_CHUNK_ROWS = 1 << 20               # 通道分块遍历的行数 (派生通道、后台计算等)
+SPILL_SEQ = itertools.count()            # 外存文件名序号
+
+# === 派生通道配置 ===
+DERIVED_CACHE_BYTES = 256 * 1024 ** 2    # 派生通道计算结果的块缓存上限，超出后淘汰最久未用的块
+DERIVED_PREVIEW_ROWS = 1 << 20           # 派生通道尚无金字塔时，整列预览最多抽取的点数
+
+# === 区间加载配置 ===
+LINE_INDEX_STRIDE = 4096                 # 行偏移索引: 每隔多少行记录一次字节偏移
+LINE_INDEX_SCAN_BYTES = 16 * 1024 * 1024 # 建索引时每次扫描的字节数
+LINE_INDEX_VERSION = 1
+
+# === 跟随模式配置 ===
+FOLLOW_INTERVAL_MS = 500                 # 跟随模式轮询间隔
+FOLLOW_MAX_BYTES = 16 * 1024 * 1024      # 每次轮询最多读取的新增字节
+
+# === 多级 min/max 金字塔 (LOD) 配置 ===
+LOD_BASE_BUCKET = 32      # 第 0 级每桶的采样点数
+LOD_LEVEL_FACTOR = 4      # 相邻两级桶大小之比
+LOD_MIN_BUCKETS = 1024    # 最粗一级至少保留的桶数，数据量不足时不建金字塔
+LOD_VIEW_MARGIN = 0.5     # 取数时向可视区两侧各多取的比例，平移时不至于露白
+LOD_REFRESH_MS = 30       # 视图变化后刷新曲线数据的合并间隔
+
+# === 区间统计索引配置 ===
+STATS_BLOCK = 1024        # 统计索引的分块行数 (须整除 STORE_CHUNK_ROWS)，区间两端不满一块的部分直接计算
+
+# === 界面刷新合并配置 ===
+REFRESH_FRAME_MS = 16     # 统计表等刷新请求的合并间隔 (约一帧)
+
+# === 十字光标读数配置 ===
+READOUT_BLOCK = 4096      # 读数缓存的行数：显示通道的这段数据按行排列，鼠标在块内移动时一次取整行
+
+# === 曲线按需创建配置 ===
+HIDDEN_TRACE_KEEP = 4     # 隐藏后仍保留图元的通道数，超出时释放最早隐藏的 (再次显示时重建)
+
+# === 时间戳列配置 ===
+TIME_GAP_FACTOR = 3.0     # 相邻时间戳间隔超过典型周期的倍数即视为缺口
+TIME_GAP_REPORT = 20      # 提示中最多列出的缺口数
+
+# === 数据点配置 ===
+DOTS_MAX_DENSITY = 0.2    # 每像素最多的采样点数 (点径 5 px)，可视区更密时数据点自动隐藏
+DOTS_REFRESH_MS = 60      # 视图变化后重算数据点的合并间隔
+
+# === 逻辑分析仪 (位通道) 配置 ===
+LOGIC_LANE_PX = 18        # 每条位通道的高度 (像素)
+LOGIC_MAX_HEIGHT = 420    # 位通道区域的最大高度，通道多时压缩行高
+LOGIC_BAR = 0.7           # 位通道高电平占行高的比例
+
+# === 事件导航配置 ===
+EVENT_LIST_MAX = 5000     # “列出全部”最多列出的事件数 (导航本身不受限制)
+MARKER_REFRESH_MS = 30    # 视图变化后重画触发标记的合并间隔
+
 # === 新增：智能坐标轴 (支持 Hex 显示) ===
 class SmartAxisItem(pg.AxisItem):
     def __init__(self, *args, **kwargs):
@@ -78,6 +161,203 @@ class SmartAxisItem(pg.AxisItem):
             return [f"0x{int(v):X}" for v in values]
         return super().tickStrings(values, scale, spacing)
 
+# === 刷新合并 ===
+class RefreshScheduler(QObject):
+    """
+    合并高频刷新请求 (平移、缩放、拖动光标)：
+    1. request() 只标记为待刷新，一帧 (REFRESH_FRAME_MS) 内的多次请求合并为一次 callback。
+    2. key_fn 返回影响结果的全部输入；与上次刷新时相同则跳过计算，force=True 的请求 (如显示格式变化) 不跳过。
+    3. 记录请求、实际计算、合并与跳过的次数，report() 给出说明。
+    """
+    def __init__(self, callback, key_fn, interval=REFRESH_FRAME_MS, parent=None):
+        super().__init__(parent)
+        self.callback = callback
+        self.key_fn = key_fn
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(interval)
+        self.timer.timeout.connect(self.flush)
+        self.last_key = None
+        self.force = False
+        self.pending = 0
+        self.requests = self.runs = self.merged = self.skipped = 0
+
+    def request(self, *args, force=False):
+        self.requests += 1
+        self.pending += 1
+        self.force = self.force or force
+        if not self.timer.isActive(): self.timer.start()
+
+    def flush(self):
+        """ 立即执行积压的请求 (没有积压时不做任何事) """
+        self.timer.stop()
+        if not self.pending: return
+        self.merged += self.pending - 1
+        self.pending = 0
+        force, self.force = self.force, False
+        key = self.key_fn()
+        if not force and key is not None and key == self.last_key:
+            self.skipped += 1
+            return
+        self.last_key = key
+        self.runs += 1
+        self.callback()
+
+    def invalidate(self):
+        self.last_key = None
+
+    def report(self):
+        return (f"刷新请求 {self.requests} 次，实际计算 {self.runs} 次 "
+                f"(合并 {self.merged} 次，无变化跳过 {self.skipped} 次)")
+
+# === 统计表模型 ===
+def is_nan(val):
+    """ 空值判断，整数 (含超出 float64 精度的 64 位字) 不做浮点转换 """
+    return isinstance(val, (float, np.floating)) and np.isnan(val)
+
+class StatsTableModel(QAbstractTableModel):
+    """
+    统计表的数据模型 (替代逐格创建 QTableWidgetItem)：
+    1. 数值保存在 (通道数 × 列数) 的 object 数组中 (整数通道的值为 Python int，64 位字超过 2^53 也保持精确)，
+       文本在 data() 中按需格式化，只格式化屏幕上可见的格子。
+    2. update() 与上次的数组逐格比较，只对变化的格子发 dataChanged；通道列表或列布局变化时才重置模型。
+    3. 字体、画刷只创建一次，颜色按通道缓存。
+    列布局为 [(表头, 类型)]，类型决定格式化方式：
+    'val' 按通道的 DEC/HEX 显示，'cursor' 同 'val' 但无 Y 光标时显示 "--"，'count' 为整数，'num' 为 6 位有效数字。
+    """
+    VIEW_COLUMNS = [("Ymin", 'val'), ("Ymax", 'val'), ("Y_Vpp", 'val'), ("Ymean", 'val'),
+                    ("Y1", 'cursor'), ("Y2", 'cursor'), ("ΔY", 'cursor')]
+    CURSOR_COLUMNS = [("N", 'count'), ("Min", 'val'), ("Max", 'val'), ("Mean", 'num'),
+                      ("RMS", 'num'), ("Std", 'num'), ("∫dt (·ms)", 'num')]
+
+    def __init__(self, format_fn, parent=None):
+        super().__init__(parent)
+        self.format_fn = format_fn
+        self.columns = self.VIEW_COLUMNS
+        self.names = []
+        self.formats = []
+        self.values = np.zeros((0, len(self.columns)), dtype=object)
+        self.has_cursor = False
+        self.name_font = QFont("Microsoft YaHei", 9, QFont.Bold)
+        self.brushes = {}
+        self.colors = {}
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.names)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.columns) + 1
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return "波形名称" if section == 0 else self.columns[section - 1][0]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid(): return None
+        row, col = index.row(), index.column()
+        name = self.names[row]
+        if role == Qt.DisplayRole:
+            if col == 0: return f"■ {name}"
+            kind = self.columns[col - 1][1]
+            val = self.values[row, col - 1]
+            if kind == 'cursor' and not self.has_cursor: return "--"
+            if is_nan(val): return "NaN"
+            if kind == 'count': return f"{int(val)}"
+            if kind == 'num': return f"{val:.6g}"
+            return self.format_fn(name, val)
+        if col == 0:
+            if role == Qt.ForegroundRole: return self.brushes.get(name)
+            if role == Qt.FontRole: return self.name_font
+        elif role == Qt.TextAlignmentRole:
+            return Qt.AlignCenter
+        return None
+
+    def update(self, names, colors, formats, values, has_cursor, columns=None):
+        for name, color in zip(names, colors):
+            if self.colors.get(name) != color:
+                self.colors[name] = color
+                self.brushes[name] = QBrush(QColor(color))
+        columns = columns or self.VIEW_COLUMNS
+        if names != self.names or columns is not self.columns:
+            self.beginResetModel()
+            self.columns = columns
+            self.names, self.formats, self.values, self.has_cursor = list(names), list(formats), values, has_cursor
+            self.endResetModel()
+            return
+        changed = ~self.same_cells(values, self.values).astype(bool)
+        if has_cursor != self.has_cursor:
+            for i, (_, kind) in enumerate(columns):
+                if kind == 'cursor': changed[:, i] = True
+        for row, (old, new) in enumerate(zip(self.formats, formats)):
+            if old != new: changed[row, :] = True
+        self.formats, self.values, self.has_cursor = list(formats), values, has_cursor
+        for row in np.flatnonzero(changed.any(axis=1)):
+            cols = np.flatnonzero(changed[row])
+            self.dataChanged.emit(self.index(row, cols[0] + 1), self.index(row, cols[-1] + 1))
+
+    # 逐格比较 (空值与空值视为相同)，整数按原值比较
+    same_cells = staticmethod(np.frompyfunc(lambda a, b: a == b or (is_nan(a) and is_nan(b)), 2, 1))
+
+    def clear(self):
+        self.update([], [], [], np.zeros((0, len(self.columns)), dtype=object), False, self.columns)
+
+# === 十字光标读数浮层 ===
+class CrosshairReadout(QFrame):
+    """
+    十字光标读数 (替代每次重建整段 HTML 的 TextItem)：
+    1. 每个通道一个预先建好的 QLabel，只有显示的通道或颜色变化时才重建。
+    2. set_values() 只给文字变化的标签 setText，有变化时才重新计算浮层大小。
+    3. 浮层是绘图区上的普通控件，不参与场景重绘，鼠标事件穿透。
+    """
+    def __init__(self, parent):
+        super().__init__(parent)
+        self.setAttribute(Qt.WA_TransparentForMouseEvents)
+        self.setStyleSheet("""
+            QFrame { background-color: rgba(40, 44, 52, 200); border: 1px solid #3B4048; }
+            QLabel { border: none; background: transparent; font-family: Consolas; font-size: 12px; }
+        """)
+        self.box = QVBoxLayout(self)
+        self.box.setContentsMargins(6, 4, 6, 4)
+        self.box.setSpacing(0)
+        self.time_label = QLabel()
+        self.time_label.setStyleSheet("color: #ABB2BF;")
+        self.box.addWidget(self.time_label)
+        self.labels = []
+        self.channels = None
+        self.hide()
+
+    def set_channels(self, names, colors):
+        key = (tuple(names), tuple(colors))
+        if key == self.channels: return
+        self.channels = key
+        for label in self.labels:
+            self.box.removeWidget(label)
+            label.deleteLater()
+        self.labels = []
+        for color in colors:
+            label = QLabel()
+            label.setStyleSheet(f"color: {color};")
+            self.box.addWidget(label)
+            self.labels.append(label)
+
+    def set_values(self, time_text, texts):
+        changed = False
+        if self.time_label.text() != time_text:
+            self.time_label.setText(time_text); changed = True
+        for label, text in zip(self.labels, texts):
+            if label.text() != text:
+                label.setText(text); changed = True
+        if changed: self.adjustSize()
+
+    def place(self, point):
+        """ 放在鼠标右上方，靠近边缘时翻到另一侧 """
+        area = self.parentWidget().rect()
+        x, y = point.x() + 12, point.y() - self.height() - 12
+        if x + self.width() > area.right(): x = point.x() - self.width() - 12
+        if y < 0: y = point.y() + 12
+        self.move(max(0, x), max(0, y))
+
 # === 加载动画控件 ===
 class LoadingOverlay(QWidget):
     def __init__(self, parent=None):
@@ -130,16 +410,31 @@ class LoadingOverlay(QWidget):
         if self.parent(): self.resize(self.parent().size())
         super().resizeEvent(event)
 
-# === 高级合并管理器 ===
+# === 高级合并管理器 (派生通道) ===
 class MergeManagerDialog(QDialog):
-    def __init__(self, df, parent=None):
+    """
+    派生通道配置：
+    1. 运算类型见 DERIVED_OPS，输入通道与参数随运算切换。
+    2. 只登记派生规则 (pending_specs)，数据由 ChannelStore 按块惰性计算。
+    """
+    # 各运算用到的参数控件
+    OP_PARAMS = {'words': ['bits', 'signed'], 'bits': ['lsb', 'width'], 'scale': ['gain', 'offset'],
+                 'diff': [], 'arith': ['arith'], 'units': ['quantity', 'drive']}
+    MAX_INPUTS = 4
+    UNIT_SUFFIX = {'motor_rpm': 'rpm', 'load_speed': 'v', 'load_position': 'pos'}
+
+    def __init__(self, store, parent=None):
         super().__init__(parent)
-        self.setWindowTitle("数据合并配置")
-        self.resize(550, 480)
-        self.df = df
-        self.pending_merges = [] 
-        self.removed_cols = []   
-        self.source_cols = list(df.columns)
+        self.setWindowTitle("派生通道配置")
+        self.resize(560, 600)
+        self.store = store
+        self.pending_specs = []
+        self.removed_cols = []
+        self.source_cols = list(store.columns)
+        try:
+            self.drive_params = fb284_units.load_params()   # EPOS 计算器导出的参数集
+        except (OSError, ValueError):
+            self.drive_params = None
         
         self.setStyleSheet("""
             QDialog { background-color: #282C34; color: #DCDFE4; font-family: "Microsoft YaHei UI"; }
@@ -148,10 +443,13 @@ class MergeManagerDialog(QDialog):
             }
             QGroupBox::title { subcontrol-origin: margin; subcontrol-position: top left; left: 10px; padding: 0 5px; }
             QLabel { color: #ABB2BF; font-size: 13px; font-weight: normal; }
+            QCheckBox { color: #ABB2BF; font-size: 13px; }
             QComboBox { background-color: #21252B; border: 1px solid #3B4048; border-radius: 4px; padding: 5px 10px; color: #DCDFE4; min-height: 20px; }
             QComboBox:hover { border: 1px solid #61AFEF; }
             QComboBox::drop-down { subcontrol-origin: padding; subcontrol-position: top right; width: 20px; border-left-width: 0px; }
             QComboBox QAbstractItemView { background-color: #21252B; border: 1px solid #3B4048; color: #DCDFE4; selection-background-color: #3E4451; }
+            QLineEdit, QSpinBox, QDoubleSpinBox { background-color: #21252B; border: 1px solid #3B4048; border-radius: 4px; padding: 4px 8px; color: #DCDFE4; }
+            QLineEdit:focus { border: 1px solid #61AFEF; }
             QListWidget { background-color: #21252B; border: 1px solid #3B4048; border-radius: 6px; color: #98C379; font-family: Consolas, "Microsoft YaHei"; padding: 5px; outline: none; }
             QListWidget::item { padding: 5px; border-bottom: 1px solid #2C313A; }
             QListWidget::item:selected { background-color: #3E4451; color: #FFFFFF; }
@@ -172,33 +470,92 @@ class MergeManagerDialog(QDialog):
         main_layout.setContentsMargins(20, 20, 20, 20)
         main_layout.setSpacing(15)
         
-        grp_new = QGroupBox("新增合并规则 (Signed 32-bit)")
+        grp_new = QGroupBox("新增派生通道")
         grp_layout = QGridLayout(grp_new)
         grp_layout.setContentsMargins(15, 25, 15, 15)
-        grp_layout.setVerticalSpacing(15)
-        
-        lbl_h = QLabel("高16位 (High Word):")
-        self.cb_high = QComboBox()
-        self.cb_high.setView(QListView()) 
-        self.cb_high.addItems(self.source_cols)
-        grp_layout.addWidget(lbl_h, 0, 0)
-        grp_layout.addWidget(self.cb_high, 0, 1)
-        
-        lbl_l = QLabel("低16位 (Low Word):")
-        self.cb_low = QComboBox()
-        self.cb_low.setView(QListView()) 
-        self.cb_low.addItems(self.source_cols)
-        if len(self.source_cols) > 1: self.cb_low.setCurrentIndex(1)
-        grp_layout.addWidget(lbl_l, 1, 0)
-        grp_layout.addWidget(self.cb_low, 1, 1)
-        
+        grp_layout.setVerticalSpacing(10)
+
+        self.cb_op = QComboBox()
+        self.cb_op.setView(QListView())
+        for key, op in DERIVED_OPS.items(): self.cb_op.addItem(op['label'], key)
+        grp_layout.addWidget(QLabel("运算类型:"), 0, 0)
+        grp_layout.addWidget(self.cb_op, 0, 1)
+
+        self.input_labels, self.input_combos = [], []
+        for i in range(self.MAX_INPUTS):
+            lbl = QLabel()
+            cb = QComboBox()
+            cb.setView(QListView())
+            cb.addItems(self.source_cols)
+            if len(self.source_cols) > i: cb.setCurrentIndex(i)
+            cb.currentIndexChanged.connect(self.update_name_hint)
+            grp_layout.addWidget(lbl, 1 + i, 0)
+            grp_layout.addWidget(cb, 1 + i, 1)
+            self.input_labels.append(lbl)
+            self.input_combos.append(cb)
+
+        self.cb_bits = QComboBox()
+        self.cb_bits.addItem("32 位 (2 个字)", 32)
+        self.cb_bits.addItem("64 位 (4 个字)", 64)
+        self.cb_bits.currentIndexChanged.connect(self.update_form)
+        self.chk_signed = QCheckBox("有符号")
+        self.chk_signed.setChecked(True)
+        self.spin_lsb = QSpinBox()
+        self.spin_lsb.setRange(0, 63)
+        self.spin_width = QSpinBox()
+        self.spin_width.setRange(1, 32)
+        self.spin_gain = QDoubleSpinBox()
+        self.spin_gain.setRange(-1e9, 1e9)
+        self.spin_gain.setDecimals(6)
+        self.spin_gain.setValue(1.0)
+        self.spin_offset = QDoubleSpinBox()
+        self.spin_offset.setRange(-1e9, 1e9)
+        self.spin_offset.setDecimals(6)
+        self.cb_arith = QComboBox()
+        for sym, text in (('+', "A + B"), ('-', "A - B"), ('*', "A × B"), ('/', "A ÷ B")):
+            self.cb_arith.addItem(text, sym)
+        for w in (self.spin_lsb, self.spin_width): w.valueChanged.connect(self.update_name_hint)
+        self.cb_arith.currentIndexChanged.connect(self.update_name_hint)
+        self.cb_quantity = QComboBox()
+        for key, (text, _) in fb284_units.QUANTITIES.items(): self.cb_quantity.addItem(text, key)
+        self.cb_quantity.currentIndexChanged.connect(self.update_name_hint)
+        drive_box = QWidget()
+        drive_layout = QHBoxLayout(drive_box)
+        drive_layout.setContentsMargins(0, 0, 0, 0)
+        self.lbl_drive = QLabel()
+        self.lbl_drive.setWordWrap(True)
+        btn_drive = QPushButton("导入计算器参数")
+        btn_drive.setStyleSheet("background-color: #3B4048; color: #DCDFE4;")
+        btn_drive.clicked.connect(self.import_drive_params)
+        drive_layout.addWidget(self.lbl_drive, 1)
+        drive_layout.addWidget(btn_drive)
+        self.show_drive_params()
+
+        self.param_rows = {
+            'bits': (QLabel("位宽:"), self.cb_bits), 'signed': (QLabel("符号:"), self.chk_signed),
+            'lsb': (QLabel("起始位 (LSB):"), self.spin_lsb), 'width': (QLabel("位数:"), self.spin_width),
+            'gain': (QLabel("比例系数:"), self.spin_gain), 'offset': (QLabel("偏移量:"), self.spin_offset),
+            'arith': (QLabel("运算:"), self.cb_arith),
+            'quantity': (QLabel("换算为:"), self.cb_quantity), 'drive': (QLabel("驱动参数:"), drive_box),
+        }
+        row = 1 + self.MAX_INPUTS
+        for lbl, widget in self.param_rows.values():
+            grp_layout.addWidget(lbl, row, 0)
+            grp_layout.addWidget(widget, row, 1)
+            row += 1
+
+        self.edit_name = QLineEdit()
+        grp_layout.addWidget(QLabel("通道名称:"), row, 0)
+        grp_layout.addWidget(self.edit_name, row, 1)
+
         self.btn_add = QPushButton("⬇  生成并添加到列表")
         self.btn_add.setObjectName("BtnAdd")
         self.btn_add.setCursor(Qt.PointingHandCursor)
         self.btn_add.clicked.connect(self.add_merge_task)
-        grp_layout.addWidget(self.btn_add, 2, 0, 1, 2)
+        grp_layout.addWidget(self.btn_add, row + 1, 0, 1, 2)
         
         main_layout.addWidget(grp_new)
+        self.cb_op.currentIndexChanged.connect(self.update_form)
 
         lbl_list = QLabel("待处理任务队列:")
         lbl_list.setStyleSheet("color: #E5C07B; font-weight: bold; margin-top: 5px;")
@@ -225,54 +582,725 @@ class MergeManagerDialog(QDialog):
         self.btn_cancel.clicked.connect(self.reject)
         bot_layout.addWidget(self.btn_cancel)
 
-        self.btn_ok = QPushButton("应用合并")
+        self.btn_ok = QPushButton("应 用")
         self.btn_ok.setObjectName("BtnOK")
         self.btn_ok.setFixedSize(100, 32)
         self.btn_ok.clicked.connect(self.accept)
         bot_layout.addWidget(self.btn_ok)
         
         main_layout.addLayout(bot_layout)
+        self.update_form()
         self.refresh_list()
 
+    def input_titles(self):
+        """ 当前运算各输入通道的标题 """
+        op = self.cb_op.currentData()
+        if op == 'words':
+            if self.cb_bits.currentData() == 32: return ["高16位 (High Word):", "低16位 (Low Word):"]
+            return ["字 3 (最高):", "字 2:", "字 1:", "字 0 (最低):"]
+        if op == 'arith': return ["通道 A:", "通道 B:"]
+        return ["源通道:"]
+
+    def update_form(self):
+        """ 按运算类型显示对应的输入通道与参数 """
+        titles = self.input_titles()
+        for i, (lbl, cb) in enumerate(zip(self.input_labels, self.input_combos)):
+            lbl.setVisible(i < len(titles))
+            cb.setVisible(i < len(titles))
+            if i < len(titles): lbl.setText(titles[i])
+        params = self.OP_PARAMS[self.cb_op.currentData()]
+        for key, (lbl, widget) in self.param_rows.items():
+            lbl.setVisible(key in params)
+            widget.setVisible(key in params)
+        self.update_name_hint()
+
+    def current_spec(self, name=None):
+        op = self.cb_op.currentData()
+        inputs = [cb.currentText() for cb in self.input_combos[:len(self.input_titles())]]
+        params = {
+            'words': lambda: {'bits': self.cb_bits.currentData(), 'signed': self.chk_signed.isChecked()},
+            'bits': lambda: {'lsb': self.spin_lsb.value(), 'width': self.spin_width.value()},
+            'scale': lambda: {'gain': self.spin_gain.value(), 'offset': self.spin_offset.value()},
+            'diff': lambda: {},
+            'arith': lambda: {'symbol': self.cb_arith.currentData()},
+            'units': lambda: {'quantity': self.cb_quantity.currentData(), **(self.drive_params or {})},
+        }[op]()
+        return derived_spec(name or self.suggest_name(op, inputs, params), op, inputs, **params)
+
+    def suggest_name(self, op, inputs, params):
+        """ 默认通道名 (32 位字合并沿用以前的 M_低位列名) """
+        src = inputs[-1] if op == 'words' else inputs[0]
+        if op == 'words': return f"M_{src}" if params['bits'] == 32 else f"M64_{src}"
+        if op == 'bits':
+            lsb, width = params['lsb'], params['width']
+            return f"{src}.{lsb}" if width == 1 else f"{src}[{lsb + width - 1}:{lsb}]"
+        if op == 'scale': return f"{src}_k"
+        if op == 'diff': return f"d_{src}"
+        if op == 'units': return f"{src}_{self.UNIT_SUFFIX[params['quantity']]}"
+        return f"{inputs[0]}{params['symbol']}{inputs[1]}"
+
+    def update_name_hint(self):
+        if not hasattr(self, 'edit_name'): return
+        self.edit_name.setPlaceholderText(self.current_spec()['name'])
+
+    def import_drive_params(self):
+        """ 重新读取 EPOS 计算器“导出参数到波形分析器”保存的参数集 """
+        try:
+            params = fb284_units.load_params()
+        except (OSError, ValueError) as e:
+            QMessageBox.warning(self, "导入失败", f"参数文件无法读取：\n{e}")
+            return
+        if params is None:
+            QMessageBox.information(self, "提示", "未找到参数文件，请先在 EPOS 计算器中点击“导出参数到波形分析器”。")
+            return
+        self.drive_params = params
+        self.show_drive_params()
+
+    def show_drive_params(self):
+        p = self.drive_params
+        if p is None:
+            self.lbl_drive.setText("(未导入)")
+            return
+        v = lambda key: f"{p[key]:.10g}" if isinstance(p.get(key), (int, float)) else "---"
+        mech = "旋转" if p.get('mech_type') == 'rotary' else f"线性 导程 {v('linear_lead')} mm"
+        self.lbl_drive.setText(f"额定 {v('rated_spd')} rpm | 齿轮比 {v('ratio_n')}/{v('ratio_d')} | "
+                               f"编码器 {v('enc_res')} | 减速比 {v('gear_n')}/{v('gear_d')} | {mech}")
+
     def refresh_list(self):
         self.list_widget.clear()
-        for col in self.df.columns:
-            if col.startswith("M_") and col not in self.removed_cols:
-                self.list_widget.addItem(f"🔗 [已存在] {col}")
-        for name, h, l in self.pending_merges:
-            self.list_widget.addItem(f"✨ [新添加] {name}")
+        for spec in self.store.derived_specs():
+            if spec['name'] in self.removed_cols: continue
+            item = QListWidgetItem(f"🔗 [已存在] {describe_derived(spec)}")
+            item.setData(Qt.UserRole, ('existing', spec['name']))
+            self.list_widget.addItem(item)
+        for spec in self.pending_specs:
+            item = QListWidgetItem(f"✨ [新添加] {describe_derived(spec)}")
+            item.setData(Qt.UserRole, ('pending', spec['name']))
+            self.list_widget.addItem(item)
 
     def add_merge_task(self):
-        h = self.cb_high.currentText()
-        l = self.cb_low.currentText()
-        if h == l:
-            QMessageBox.warning(self, "逻辑错误", "高位和低位不能选择同一列数据！")
+        spec = self.current_spec(self.edit_name.text().strip())
+        name = spec['name']
+        if spec['op'] == 'words' and len(set(spec['inputs'])) < len(spec['inputs']):
+            QMessageBox.warning(self, "逻辑错误", "参与合并的各个字不能选择同一列数据！")
             return
-        name = f"M_{l}"
-        if name in self.df.columns and name not in self.removed_cols:
-            QMessageBox.information(self, "提示", "该合并列已存在，无需重复添加。")
+        if spec['op'] == 'units':
+            try:
+                if self.drive_params is None: raise ValueError("请先导入 EPOS 计算器的参数")
+                fb284_units.check_params(self.drive_params, spec['params']['quantity'])
+            except ValueError as e:
+                QMessageBox.warning(self, "参数无效", str(e))
+                return
+        if name in self.store.columns and name not in self.removed_cols:
+            QMessageBox.information(self, "提示", f"通道 {name} 已存在，请换一个名称。")
             return
-        for n, _, _ in self.pending_merges:
-            if n == name: return
-        self.pending_merges.append((name, h, l))
-        if name in self.removed_cols: self.removed_cols.remove(name)
+        if any(s['name'] == name for s in self.pending_specs): return
+        self.pending_specs.append(spec)
+        self.edit_name.clear()
         self.refresh_list()
         self.list_widget.scrollToBottom()
 
     def remove_merge_task(self):
-        row = self.list_widget.currentRow()
-        if row < 0: return
-        item_text = self.list_widget.item(row).text()
-        if "[新添加]" in item_text:
-            idx = -1
-            target = item_text.replace("✨ [新添加] ", "").strip()
-            for i, (n, h, l) in enumerate(self.pending_merges):
-                if n == target: idx = i; break
-            if idx != -1: self.pending_merges.pop(idx)
-        elif "[已存在]" in item_text:
-            self.removed_cols.append(item_text.replace("🔗 [已存在] ", "").strip())
+        item = self.list_widget.currentItem()
+        if item is None: return
+        kind, name = item.data(Qt.UserRole)
+        if kind == 'pending':
+            self.pending_specs = [s for s in self.pending_specs if s['name'] != name]
+        else:
+            self.removed_cols.append(name)
         self.refresh_list()
 
+# === 导入前通道选择 ===
+class ChannelPickerDialog(QDialog):
+    def __init__(self, columns, selected, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("选择要加载的通道")
+        self.resize(420, 560)
+        self.setStyleSheet("""
+            QDialog { background-color: #282C34; color: #DCDFE4; font-family: "Microsoft YaHei UI"; }
+            QLabel { color: #ABB2BF; font-size: 13px; }
+            QLineEdit { background-color: #21252B; border: 1px solid #3B4048; border-radius: 4px; padding: 5px 10px; color: #DCDFE4; }
+            QLineEdit:focus { border: 1px solid #61AFEF; }
+            QListWidget { background-color: #21252B; border: 1px solid #3B4048; border-radius: 6px; color: #DCDFE4; font-family: Consolas, "Microsoft YaHei"; padding: 5px; outline: none; }
+            QListWidget::item { padding: 3px; }
+            QPushButton { background-color: #3B4048; color: #DCDFE4; border: none; border-radius: 4px; padding: 6px 12px; font-weight: bold; font-size: 12px; }
+            QPushButton:hover { background-color: #4B5263; }
+            QPushButton#BtnOK { background-color: #61AFEF; color: #282C34; }
+            QPushButton#BtnOK:hover { background-color: #82C2F5; }
+        """)
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(15, 15, 15, 15)
+
+        self.lbl_info = QLabel()
+        layout.addWidget(self.lbl_info)
+
+        self.edit_filter = QLineEdit()
+        self.edit_filter.setPlaceholderText("筛选通道名...")
+        self.edit_filter.textChanged.connect(self.apply_filter)
+        layout.addWidget(self.edit_filter)
+
+        self.list_widget = QListWidget()
+        selected = set(selected)
+        for col in columns:
+            item = QListWidgetItem(col)
+            item.setFlags(item.flags() | Qt.ItemIsUserCheckable)
+            item.setCheckState(Qt.Checked if col in selected else Qt.Unchecked)
+            self.list_widget.addItem(item)
+        self.list_widget.itemChanged.connect(self.update_info)
+        layout.addWidget(self.list_widget)
+
+        btn_row = QHBoxLayout()
+        for text, state in (("全选", Qt.Checked), ("全不选", Qt.Unchecked)):
+            btn = QPushButton(text)
+            btn.clicked.connect(lambda _, st=state: self.set_visible_items(st))
+            btn_row.addWidget(btn)
+        btn_row.addStretch()
+        btn_ok = QPushButton("加 载")
+        btn_ok.setObjectName("BtnOK")
+        btn_ok.clicked.connect(self.accept)
+        btn_row.addWidget(btn_ok)
+        btn_cancel = QPushButton("取 消")
+        btn_cancel.clicked.connect(self.reject)
+        btn_row.addWidget(btn_cancel)
+        layout.addLayout(btn_row)
+        self.update_info()
+
+    def apply_filter(self, text):
+        text = text.strip().lower()
+        for i in range(self.list_widget.count()):
+            item = self.list_widget.item(i)
+            item.setHidden(bool(text) and text not in item.text().lower())
+
+    def set_visible_items(self, state):
+        # 只作用于筛选后可见的项，便于按名称批量勾选
+        for i in range(self.list_widget.count()):
+            item = self.list_widget.item(i)
+            if not item.isHidden(): item.setCheckState(state)
+
+    def selected_columns(self):
+        return [self.list_widget.item(i).text() for i in range(self.list_widget.count())
+                if self.list_widget.item(i).checkState() == Qt.Checked]
+
+    def update_info(self, *args):
+        self.lbl_info.setText(f"已选 {len(self.selected_columns())} / {self.list_widget.count()} 个通道 (仅解析选中的列)")
+
+    def accept(self):
+        if not self.selected_columns():
+            QMessageBox.warning(self, "提示", "请至少选择一个通道！")
+            return
+        super().accept()
+
+# === 区间加载对话框 ===
+class WindowLoadDialog(QDialog):
+    def __init__(self, total_rows, rate, parent=None):
+        super().__init__(parent)
+        self.total_rows = total_rows
+        self.rate = rate
+        self.setWindowTitle("区间加载")
+        self.setFixedWidth(380)
+        self.setStyleSheet("""
+            QDialog { background-color: #282C34; color: #DCDFE4; font-family: "Microsoft YaHei UI"; }
+            QLabel { color: #ABB2BF; font-size: 13px; }
+            QComboBox, QDoubleSpinBox { background-color: #21252B; border: 1px solid #3B4048; border-radius: 4px; padding: 4px 8px; color: #DCDFE4; }
+            QPushButton { background-color: #3B4048; color: #DCDFE4; border: none; border-radius: 4px; padding: 6px 12px; font-weight: bold; font-size: 12px; }
+            QPushButton:hover { background-color: #4B5263; }
+            QPushButton#BtnOK { background-color: #61AFEF; color: #282C34; }
+            QPushButton#BtnOK:hover { background-color: #82C2F5; }
+        """)
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(15, 15, 15, 15)
+        layout.addWidget(QLabel(f"共 {total_rows} 行，约 {total_rows * rate / 1000:.1f} s (采样 {rate:g} ms)"))
+
+        form = QFormLayout()
+        self.combo_unit = QComboBox()
+        self.combo_unit.addItems(["行号", "时间 (ms)"])
+        self.combo_unit.currentIndexChanged.connect(self.on_unit_changed)
+        form.addRow("单位:", self.combo_unit)
+        self.spin_start = QDoubleSpinBox()
+        self.spin_end = QDoubleSpinBox()
+        for spin in (self.spin_start, self.spin_end):
+            spin.setDecimals(0)
+            spin.setRange(0, total_rows)
+        self.spin_end.setValue(min(total_rows, 100000))
+        form.addRow("起始:", self.spin_start)
+        form.addRow("结束:", self.spin_end)
+        layout.addLayout(form)
+
+        btn_row = QHBoxLayout()
+        btn_row.addStretch()
+        btn_ok = QPushButton("加 载")
+        btn_ok.setObjectName("BtnOK")
+        btn_ok.clicked.connect(self.accept)
+        btn_row.addWidget(btn_ok)
+        btn_cancel = QPushButton("取 消")
+        btn_cancel.clicked.connect(self.reject)
+        btn_row.addWidget(btn_cancel)
+        layout.addLayout(btn_row)
+
+    def on_unit_changed(self, index):
+        # 切换单位时按采样周期换算当前值
+        start, end = self.row_range()
+        factor = self.rate if index == 1 else 1
+        for spin, val in ((self.spin_start, start), (self.spin_end, end)):
+            spin.setDecimals(3 if index == 1 else 0)
+            spin.setRange(0, self.total_rows * factor)
+            spin.setValue(val * factor)
+
+    def row_range(self):
+        """ 返回 (起始行, 结束行)，不含结束行 """
+        a, b = sorted((self.spin_start.value(), self.spin_end.value()))
+        if self.spin_start.decimals():
+            a, b = int(a // self.rate), int(-(-b // self.rate)) + 1
+        return max(0, int(a)), min(self.total_rows, int(b))
+
+    def accept(self):
+        start, end = self.row_range()
+        if end <= start:
+            QMessageBox.warning(self, "提示", "区间为空！")
+            return
+        super().accept()
+
+# === 位跳变事件导航 ===
+class EventNavigatorDialog(QDialog):
+    """
+    位跳变事件导航 (非模态)：
+    1. 事件取自 LogicLanes：各位通道的游程起点就是跳变行号，本身为升序数组，首次用到的通道在后台线程中建立索引。
+    2. 上一个/下一个在行号数组上二分查找，起点为当前事件 (已移出视图时改用视图中心)，耗时与数据量无关。
+    3. “全部位”把各位的跳变合并排序后导航；“列出全部”按时间顺序最多列出 EVENT_LIST_MAX 条，点击跳转。
+    """
+    KINDS = [("上升沿 (0 → 1)", 'rise'), ("下降沿 (1 → 0)", 'fall'), ("任意跳变", 'any')]
+
+    def __init__(self, scope):
+        super().__init__(scope)
+        self.scope = scope
+        self.setWindowTitle("事件导航")
+        self.resize(480, 600)
+        self.current_row = None
+        self.merged = None   # “全部位”时合并后的行号: (键, 数组)
+        self.setStyleSheet("""
+            QDialog { background-color: #282C34; color: #DCDFE4; font-family: "Microsoft YaHei UI"; }
+            QLabel { color: #ABB2BF; font-size: 13px; }
+            QLabel#Info { color: #E5C07B; }
+            QComboBox { background-color: #21252B; border: 1px solid #3B4048; border-radius: 4px; padding: 4px 8px; color: #DCDFE4; min-height: 20px; }
+            QComboBox:hover { border: 1px solid #61AFEF; }
+            QComboBox QAbstractItemView { background-color: #21252B; border: 1px solid #3B4048; color: #DCDFE4; selection-background-color: #3E4451; }
+            QListWidget { background-color: #21252B; border: 1px solid #3B4048; border-radius: 6px; color: #98C379; font-family: Consolas, "Microsoft YaHei"; padding: 5px; outline: none; }
+            QListWidget::item { padding: 3px; }
+            QListWidget::item:selected { background-color: #3E4451; color: #FFFFFF; }
+            QPushButton { background-color: #3B4048; color: #DCDFE4; border: none; border-radius: 4px; padding: 6px 12px; font-weight: bold; font-size: 12px; }
+            QPushButton:hover { background-color: #4B5263; }
+            QPushButton:disabled { color: #5C6370; }
+            QPushButton#BtnOK { background-color: #61AFEF; color: #282C34; }
+            QPushButton#BtnOK:hover { background-color: #82C2F5; }
+        """)
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(15, 15, 15, 15)
+
+        grid = QGridLayout()
+        self.cb_col = QComboBox()
+        self.cb_col.setView(QListView())
+        self.cb_col.currentIndexChanged.connect(self.on_col_changed)
+        grid.addWidget(QLabel("通道:"), 0, 0)
+        grid.addWidget(self.cb_col, 0, 1)
+        self.btn_index_all = QPushButton("索引全部状态字")
+        self.btn_index_all.setToolTip("在后台为所有状态字/控制字 (STW/ZSW 等) 建立跳变索引")
+        self.btn_index_all.clicked.connect(self.index_all)
+        grid.addWidget(self.btn_index_all, 0, 2)
+        self.cb_lane = QComboBox()
+        self.cb_lane.setView(QListView())
+        self.cb_lane.currentIndexChanged.connect(self.on_filter_changed)
+        grid.addWidget(QLabel("位:"), 1, 0)
+        grid.addWidget(self.cb_lane, 1, 1, 1, 2)
+        self.cb_kind = QComboBox()
+        for text, kind in self.KINDS: self.cb_kind.addItem(text, kind)
+        self.cb_kind.currentIndexChanged.connect(self.on_filter_changed)
+        grid.addWidget(QLabel("跳变:"), 2, 0)
+        grid.addWidget(self.cb_kind, 2, 1, 1, 2)
+        grid.setColumnStretch(1, 1)
+        layout.addLayout(grid)
+
+        btn_row = QHBoxLayout()
+        self.btn_prev = QPushButton("◀ 上一个")
+        self.btn_prev.clicked.connect(lambda: self.step(-1))
+        self.btn_next = QPushButton("下一个 ▶")
+        self.btn_next.setObjectName("BtnOK")
+        self.btn_next.clicked.connect(lambda: self.step(1))
+        self.btn_list = QPushButton("列出全部")
+        self.btn_list.clicked.connect(self.list_events)
+        for btn in (self.btn_prev, self.btn_next, self.btn_list): btn_row.addWidget(btn)
+        btn_row.addStretch()
+        layout.addLayout(btn_row)
+
+        self.lbl_info = QLabel()
+        self.lbl_info.setObjectName("Info")
+        layout.addWidget(self.lbl_info)
+        self.list_widget = QListWidget()
+        self.list_widget.itemClicked.connect(lambda item: self.jump(item.data(Qt.UserRole)))
+        layout.addWidget(self.list_widget)
+        self.lbl_status = QLabel()
+        layout.addWidget(self.lbl_status)
+
+    def refresh_channels(self):
+        """ 按当前数据重填通道列表，保留原来的选择；默认选第一个状态字/控制字 """
+        store = self.scope.store
+        current = self.cb_col.currentText()
+        cols = list(store.columns) if store is not None else []
+        self.cb_col.blockSignals(True)
+        self.cb_col.clear()
+        self.cb_col.addItems(cols)
+        if current in cols: self.cb_col.setCurrentText(current)
+        else:
+            words = [c for c in cols if panel_key(c) is not None]
+            if words: self.cb_col.setCurrentText(words[0])
+        self.cb_col.blockSignals(False)
+        self.btn_index_all.setEnabled(any(panel_key(c) is not None for c in cols))
+        self.on_col_changed()
+
+    def lanes(self):
+        col = self.cb_col.currentText()
+        return self.scope.ready_lanes(col) if col and self.scope.store is not None else None
+
+    def on_col_changed(self, *args):
+        col = self.cb_col.currentText()
+        lanes = self.lanes()
+        self.fill_lanes(lanes)
+        if lanes is None and col:
+            self.lbl_status.setText(f"正在建立 {col} 的跳变索引...")
+            self.scope.start_lane_index([col])
+
+    def index_all(self):
+        names = [c for c in self.scope.store.columns if panel_key(c) is not None]
+        if all(self.scope.ready_lanes(c) is not None for c in names):
+            self.lbl_status.setText(f"全部 {len(names)} 个状态字/控制字已建立跳变索引")
+        else: self.scope.start_lane_index(names)
+
+    def on_lanes_ready(self, name):
+        if name == self.cb_col.currentText(): self.fill_lanes(self.lanes())
+
+    def show_progress(self, done, total, name):
+        self.lbl_status.setText(f"正在建立跳变索引 {done + 1}/{total}: {name}" if done < total else f"已建立 {total} 个通道的跳变索引")
+
+    def fill_lanes(self, lanes):
+        """ 位筛选列表：“全部位”加上各条显示中的位通道 (单个位或多位字段) """
+        current = self.cb_lane.currentText()
+        self.cb_lane.blockSignals(True)
+        self.cb_lane.clear()
+        if lanes is not None:
+            self.cb_lane.addItem("全部位", None)
+            for i in lanes.shown_lanes(): self.cb_lane.addItem(lanes.lanes[i][0], i)
+            index = self.cb_lane.findText(current)
+            if index >= 0: self.cb_lane.setCurrentIndex(index)
+        self.cb_lane.blockSignals(False)
+        for w in (self.cb_lane, self.cb_kind, self.btn_prev, self.btn_next, self.btn_list): w.setEnabled(lanes is not None)
+        self.on_filter_changed()
+
+    def on_filter_changed(self, *args):
+        self.list_widget.clear()
+        self.current_row = None
+        self.update_info()
+
+    def selected_lanes(self, lanes):
+        i = self.cb_lane.currentData()
+        return lanes.shown_lanes() if i is None else [i]
+
+    def events(self):
+        """ 当前筛选条件下的事件行号 (升序)，索引未建立时返回 None """
+        lanes = self.lanes()
+        if lanes is None: return None
+        kind = self.cb_kind.currentData()
+        picked = self.selected_lanes(lanes)
+        if len(picked) == 1: return lanes.edges(picked[0], kind)
+        key = (id(lanes), kind, lanes.rows)
+        if self.merged is None or self.merged[0] != key:
+            self.merged = (key, np.unique(np.concatenate([lanes.edges(i, kind) for i in picked])))
+        return self.merged[1]
+
+    def step(self, direction):
+        rows = self.events()
+        if rows is None: return
+        row = self.scope.step_event(rows, self.current_row, direction)
+        if row is not None: self.jump(row)
+        else: self.lbl_status.setText("后面没有更多事件" if direction > 0 else "前面没有更多事件")
+
+    def jump(self, row):
+        self.current_row = row
+        self.scope.jump_to_row(row)
+        self.lbl_status.setText("")
+        self.update_info()
+
+    def update_info(self):
+        rows = self.events()
+        if rows is None:
+            self.lbl_info.setText("")
+            return
+        text = f"共 {len(rows)} 个事件"
+        if self.current_row is not None:
+            k = int(np.searchsorted(rows, self.current_row))
+            t = float(self.scope.time_base.time_at(self.current_row))
+            text += f"，当前第 {k + 1} 个 @ {t:.3f} ms (第 {self.current_row} 行)"
+        self.lbl_info.setText(text)
+
+    def list_events(self):
+        """ 按时间顺序列出事件 (最多 EVENT_LIST_MAX 条)，每条注明位与取值变化 """
+        lanes = self.lanes()
+        if lanes is None: return
+        kind = self.cb_kind.currentData()
+        parts = [(i,) + lanes.transitions(i, kind) for i in self.selected_lanes(lanes)]
+        rows = np.concatenate([p[1] for p in parts])
+        total = len(rows)
+        lane_id = np.concatenate([np.full(len(p[1]), p[0]) for p in parts])
+        old = np.concatenate([p[2] for p in parts])
+        new = np.concatenate([p[3] for p in parts])
+        order = np.argsort(rows, kind='stable')[:EVENT_LIST_MAX]
+        times = self.scope.time_base.time_at(rows[order])
+        self.list_widget.setUpdatesEnabled(False)
+        self.list_widget.clear()
+        for t, k in zip(times, order):
+            item = QListWidgetItem(f"{t:12.3f} ms  {lanes.lanes[lane_id[k]][0]}: {old[k]} → {new[k]}")
+            item.setData(Qt.UserRole, int(rows[k]))
+            self.list_widget.addItem(item)
+        self.list_widget.setUpdatesEnabled(True)
+        if total > EVENT_LIST_MAX: self.lbl_status.setText(f"共 {total} 个事件，仅列出前 {EVENT_LIST_MAX} 个")
+        else: self.lbl_status.setText("")
+
+# === 触发搜索窗口 ===
+class TriggerDialog(QDialog):
+    """
+    示波器式触发搜索 (非模态)：
+    1. 触发类型见 TRIGGER_TYPES，参数控件随类型切换；选通道时按可视区数据预填电平与窗口。
+    2. 搜索在后台线程中对整段数据分块扫描 (TriggerSearchThread)，可随时停止；结果在主视图中画成竖线标记。
+    3. 上一个/下一个与事件导航相同，在触发位置上二分查找；列表最多显示 EVENT_LIST_MAX 条，点击跳转。
+    """
+    TYPE_PARAMS = {'level': ['level', 'hysteresis', 'edge'], 'bit': ['bit', 'edge'],
+                   'window': ['low', 'high', 'inside', 'min_width'], 'pulse': ['level', 'polarity', 'min_width']}
+
+    def __init__(self, scope):
+        super().__init__(scope)
+        self.scope = scope
+        self.setWindowTitle("触发搜索")
+        self.resize(480, 640)
+        self.current_row = None
+        self.setStyleSheet("""
+            QDialog { background-color: #282C34; color: #DCDFE4; font-family: "Microsoft YaHei UI"; }
+            QLabel { color: #ABB2BF; font-size: 13px; }
+            QLabel#Info { color: #E5C07B; }
+            QComboBox { background-color: #21252B; border: 1px solid #3B4048; border-radius: 4px; padding: 4px 8px; color: #DCDFE4; min-height: 20px; }
+            QComboBox:hover { border: 1px solid #61AFEF; }
+            QComboBox QAbstractItemView { background-color: #21252B; border: 1px solid #3B4048; color: #DCDFE4; selection-background-color: #3E4451; }
+            QSpinBox, QDoubleSpinBox { background-color: #21252B; border: 1px solid #3B4048; border-radius: 4px; padding: 4px 8px; color: #DCDFE4; }
+            QProgressBar { background-color: #21252B; border: 1px solid #3B4048; border-radius: 4px; color: #DCDFE4; text-align: center; max-height: 14px; }
+            QProgressBar::chunk { background-color: #61AFEF; border-radius: 3px; }
+            QListWidget { background-color: #21252B; border: 1px solid #3B4048; border-radius: 6px; color: #98C379; font-family: Consolas, "Microsoft YaHei"; padding: 5px; outline: none; }
+            QListWidget::item { padding: 3px; }
+            QListWidget::item:selected { background-color: #3E4451; color: #FFFFFF; }
+            QPushButton { background-color: #3B4048; color: #DCDFE4; border: none; border-radius: 4px; padding: 6px 12px; font-weight: bold; font-size: 12px; }
+            QPushButton:hover { background-color: #4B5263; }
+            QPushButton:disabled { color: #5C6370; }
+            QPushButton#BtnOK { background-color: #61AFEF; color: #282C34; }
+            QPushButton#BtnOK:hover { background-color: #82C2F5; }
+        """)
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(15, 15, 15, 15)
+
+        grid = QGridLayout()
+        self.cb_type = QComboBox()
+        for key, kind in TRIGGER_TYPES.items(): self.cb_type.addItem(kind['label'], key)
+        self.cb_type.currentIndexChanged.connect(self.on_type_changed)
+        grid.addWidget(QLabel("触发类型:"), 0, 0)
+        grid.addWidget(self.cb_type, 0, 1)
+        self.cb_col = QComboBox()
+        self.cb_col.setView(QListView())
+        self.cb_col.currentIndexChanged.connect(self.prefill_levels)
+        grid.addWidget(QLabel("通道:"), 1, 0)
+        grid.addWidget(self.cb_col, 1, 1)
+
+        def number(minimum=-1e15, decimals=4, suffix=""):
+            spin = QDoubleSpinBox()
+            spin.setRange(minimum, 1e15)
+            spin.setDecimals(decimals)
+            spin.setSuffix(suffix)
+            return spin
+
+        def choices(items):
+            cb = QComboBox()
+            for text, value in items: cb.addItem(text, value)
+            return cb
+
+        self.spin_bit = QSpinBox()
+        self.spin_bit.setRange(0, 31)
+        self.param_widgets = {
+            'level': ("电平:", number()),
+            'hysteresis': ("回差:", number(minimum=0)),
+            'edge': ("方向:", choices([("上升沿", 'rise'), ("下降沿", 'fall'), ("双沿", 'both')])),
+            'bit': ("位:", self.spin_bit),
+            'low': ("窗口下限:", number()),
+            'high': ("窗口上限:", number()),
+            'inside': ("条件:", choices([("进入窗口内", True), ("离开到窗口外", False)])),
+            'polarity': ("脉冲:", choices([("高脉冲 (≥ 电平)", 'high'), ("低脉冲 (< 电平)", 'low')])),
+            'min_width': ("宽度大于:", number(minimum=0, decimals=3, suffix=" ms")),
+        }
+        self.param_labels = {}
+        for row, (key, (text, widget)) in enumerate(self.param_widgets.items(), start=2):
+            self.param_labels[key] = QLabel(text)
+            grid.addWidget(self.param_labels[key], row, 0)
+            grid.addWidget(widget, row, 1)
+        grid.setColumnStretch(1, 1)
+        layout.addLayout(grid)
+
+        run_row = QHBoxLayout()
+        self.btn_search = QPushButton("搜 索")
+        self.btn_search.setObjectName("BtnOK")
+        self.btn_search.clicked.connect(self.search)
+        self.btn_stop = QPushButton("停止")
+        self.btn_stop.clicked.connect(self.stop)
+        self.progress = QProgressBar()
+        self.progress.setRange(0, 100)
+        run_row.addWidget(self.btn_search)
+        run_row.addWidget(self.btn_stop)
+        run_row.addWidget(self.progress, 1)
+        layout.addLayout(run_row)
+
+        nav_row = QHBoxLayout()
+        self.btn_prev = QPushButton("◀ 上一个")
+        self.btn_prev.clicked.connect(lambda: self.step(-1))
+        self.btn_next = QPushButton("下一个 ▶")
+        self.btn_next.clicked.connect(lambda: self.step(1))
+        self.btn_clear = QPushButton("清除标记")
+        self.btn_clear.clicked.connect(self.clear)
+        for btn in (self.btn_prev, self.btn_next, self.btn_clear): nav_row.addWidget(btn)
+        nav_row.addStretch()
+        layout.addLayout(nav_row)
+
+        self.lbl_info = QLabel()
+        self.lbl_info.setObjectName("Info")
+        layout.addWidget(self.lbl_info)
+        self.list_widget = QListWidget()
+        self.list_widget.itemClicked.connect(lambda item: self.jump(item.data(Qt.UserRole)))
+        layout.addWidget(self.list_widget)
+        self.on_type_changed()
+        self.on_results()
+
+    def refresh_channels(self):
+        store = self.scope.store
+        current = self.cb_col.currentText()
+        cols = list(store.columns) if store is not None else []
+        self.cb_col.blockSignals(True)
+        self.cb_col.clear()
+        self.cb_col.addItems(cols)
+        if current in cols: self.cb_col.setCurrentText(current)
+        self.cb_col.blockSignals(False)
+        if current not in cols: self.prefill_levels()
+
+    def on_type_changed(self, *args):
+        used = self.TYPE_PARAMS[self.cb_type.currentData()]
+        for key, (_, widget) in self.param_widgets.items():
+            widget.setVisible(key in used)
+            self.param_labels[key].setVisible(key in used)
+
+    def prefill_levels(self, *args):
+        """ 按通道在可视区内的最小/最大值预填电平、回差与窗口 """
+        scope, col = self.scope, self.cb_col.currentText()
+        if scope.store is None or col not in scope.store or scope.main_vb is None: return
+        n, lo, hi = scope.range_summary(col, *scope.view_rows())[:3]
+        if not n: return
+        lo, hi = float(lo), float(hi)
+        mid, span = (lo + hi) / 2, hi - lo
+        self.param_widgets['level'][1].setValue(mid)
+        self.param_widgets['hysteresis'][1].setValue(span * 0.02)
+        self.param_widgets['low'][1].setValue(mid - span / 4)
+        self.param_widgets['high'][1].setValue(mid + span / 4)
+
+    def build_spec(self):
+        kind = self.cb_type.currentData()
+        params = {}
+        for key in self.TYPE_PARAMS[kind]:
+            widget = self.param_widgets[key][1]
+            params[key] = widget.currentData() if isinstance(widget, QComboBox) else widget.value()
+        if kind == 'window' and params['low'] > params['high']:
+            raise ValueError("窗口下限不能大于上限")
+        return trigger_spec(kind, self.cb_col.currentText(), **params)
+
+    def search(self):
+        if self.scope.store is None or self.cb_col.currentText() not in self.scope.store: return
+        try:
+            spec = self.build_spec()
+        except ValueError as e:
+            QMessageBox.warning(self, "参数无效", str(e))
+            return
+        self.current_row = None
+        self.list_widget.clear()
+        self.lbl_info.setText("正在搜索...")
+        self.progress.setValue(0)
+        self.set_running(True)
+        self.scope.start_trigger_search(spec)
+
+    def stop(self):
+        """ 停止搜索，保留上一次的结果 """
+        self.scope.stop_trigger_search()
+        self.on_results()
+
+    def clear(self):
+        self.scope.clear_trigger_hits()
+
+    def set_running(self, running):
+        self.btn_search.setEnabled(not running)
+        self.btn_stop.setEnabled(running)
+        hits = self.scope.trigger_hits
+        for btn in (self.btn_prev, self.btn_next, self.btn_clear): btn.setEnabled(not running and hits is not None)
+
+    def show_progress(self, percent):
+        self.progress.setValue(percent)
+
+    def on_results(self):
+        """ 搜索完成 (或结果被清除)：刷新列表与说明 """
+        self.set_running(False)
+        self.current_row = None
+        self.list_widget.clear()
+        hits = self.scope.trigger_hits
+        if hits is None:
+            self.progress.setValue(0)
+            self.lbl_info.setText("")
+            return
+        self.progress.setValue(100)
+        starts, ends = hits
+        run_mode = TRIGGER_TYPES[self.scope.trigger_spec['type']]['mode'] == 'run'
+        times = self.scope.time_base.time_at(starts[:EVENT_LIST_MAX])
+        if run_mode:
+            last = len(self.scope.store) - 1
+            widths = self.scope.time_base.time_at(np.minimum(ends[:EVENT_LIST_MAX], last)) - times
+        self.list_widget.setUpdatesEnabled(False)
+        for k, t in enumerate(times):
+            text = f"{k + 1:6d}  {t:12.3f} ms"
+            if run_mode: text += f"  宽 {widths[k]:.3f} ms"
+            item = QListWidgetItem(text)
+            item.setData(Qt.UserRole, int(starts[k]))
+            self.list_widget.addItem(item)
+        self.list_widget.setUpdatesEnabled(True)
+        self.update_info()
+
+    def step(self, direction):
+        hits = self.scope.trigger_hits
+        if hits is None: return
+        row = self.scope.step_event(hits[0], self.current_row, direction)
+        if row is not None: self.jump(row)
+        else: self.lbl_info.setText("后面没有更多触发" if direction > 0 else "前面没有更多触发")
+
+    def jump(self, row):
+        self.current_row = row
+        self.scope.jump_to_row(row)
+        self.update_info()
+
+    def update_info(self):
+        hits = self.scope.trigger_hits
+        if hits is None: return
+        starts = hits[0]
+        text = f"共 {len(starts)} 次触发"
+        if len(starts) > EVENT_LIST_MAX: text += f" (列表显示前 {EVENT_LIST_MAX} 次)"
+        if self.current_row is not None:
+            k = int(np.searchsorted(starts, self.current_row))
+            text += f"，当前第 {k + 1} 次 @ {float(self.scope.time_base.time_at(self.current_row)):.3f} ms"
+        self.lbl_info.setText(text)
+
 class CustomViewBox(pg.ViewBox):
     sigDragEvent = pyqtSignal(object, object)
     sigRightClickDouble = pyqtSignal() 
@@ -339,194 +1367,1782 @@ class CustomViewBox(pg.ViewBox):
             scale_factor = 1.15
         self.sigZoomEvent.emit(scale_factor, ev.scenePos())
 
-    def suggestPadding(self, axis):
-        if axis == 1: return 0.1 
-        return 0.0
+    def suggestPadding(self, axis):
+        if axis == 1: return 0.1 
+        return 0.0
+
+# === 编码/格式识别 ===
+SEP_NAMES = {',': '逗号', ';': '分号', '\t': 'Tab', '|': '竖线'}
+
+def _trim_to_lines(sample, from_start):
+    """ 采样块可能截断多字节字符，只保留完整行再解码 """
+    if from_start:
+        end = sample.rfind(b'\n')
+        return sample[:end + 1] if end >= 0 else sample
+    start = sample.find(b'\n')
+    end = sample.rfind(b'\n')
+    return sample[start + 1:end + 1] if 0 <= start < end else b''
+
+def sniff_separator(text):
+    """ 在文本开头的几行上识别分隔符，识别不出时按表头中出现最多的候选，默认逗号 """
+    lines = [ln for ln in text.splitlines()[:20] if ln.strip()]
+    try:
+        return csv.Sniffer().sniff('\n'.join(lines), delimiters=''.join(SEP_NAMES)).delimiter
+    except csv.Error:
+        header = lines[0] if lines else ''
+        counts = {d: header.count(d) for d in SEP_NAMES}
+        best = max(counts, key=counts.get)
+        return best if counts[best] > 0 else ','
+
+def sniff_text_format(file_path):
+    """
+    一次采样判定文件格式，避免整文件按 UTF-8 / GBK 轮流试读：
+    1. 读取文件头与中部、尾部采样，判断是否为文本 (含大量 NUL/控制字符视为加密或二进制)。
+    2. 依次用 BOM、UTF-8、GBK 严格解码全部采样，选定编码。
+    3. 在文件头的前几行上识别分隔符。
+    返回 dict: kind ('text'/'binary'), encoding, sep, desc (状态栏说明)
+    """
+    file_size = os.path.getsize(file_path)
+    with open(file_path, 'rb') as f:
+        head = f.read(SNIFF_HEAD_BYTES)
+        probes = [_trim_to_lines(head, True)]
+        for pos in (file_size // 2, file_size - SNIFF_PROBE_BYTES):
+            if pos > len(head):
+                f.seek(pos)
+                probes.append(_trim_to_lines(f.read(SNIFF_PROBE_BYTES), False))
+
+    fmt = {'kind': 'text', 'encoding': 'utf-8', 'sep': ',', 'desc': ''}
+    if not head:
+        fmt.update(kind='binary', desc='空文件')
+        return fmt
+
+    if head.startswith(b'\xef\xbb\xbf'):
+        fmt['encoding'] = 'utf-8-sig'
+    elif head.startswith((b'\xff\xfe', b'\xfe\xff')):
+        fmt['encoding'] = 'utf-16'
+    else:
+        ctrl = sum(head.count(bytes([c])) for c in range(32) if c not in (9, 10, 13))
+        if b'\x00' in head or ctrl > len(head) * 0.01:
+            fmt.update(kind='binary', desc='非文本数据 (疑似加密) → Word 解密')
+            return fmt
+        fmt['encoding'] = None
+        for enc in ('utf-8', 'gbk'):
+            try:
+                for p in probes: p.decode(enc)
+                fmt['encoding'] = enc
+                break
+            except UnicodeDecodeError:
+                continue
+        if fmt['encoding'] is None:
+            # 两种编码都不完全匹配: 按 GB18030 读取并替换坏字符，数值列不受影响
+            fmt['encoding'] = 'gb18030'
+
+    fmt['sep'] = sniff_separator(head.decode(fmt['encoding'], errors='replace'))
+    enc_name = fmt['encoding'].upper().replace('-SIG', ' (BOM)')
+    fmt['desc'] = f"{enc_name} · {SEP_NAMES[fmt['sep']]}分隔 · C 引擎分块解析"
+    return fmt
+
+def read_header_columns(file_path, fmt):
+    """ 只读表头，返回去空格后的列名 (加密/二进制文件返回 None) """
+    if fmt['kind'] != 'text': return None
+    try:
+        header = pd.read_csv(file_path, nrows=0, encoding=fmt['encoding'], sep=fmt['sep'], encoding_errors='replace')
+    except Exception:
+        return None
+    return [str(c).strip() for c in header.columns]
+
+def layout_key(columns):
+    """ 表头布局指纹，用于按布局记忆通道选择 """
+    return hashlib.sha1('\x1f'.join(columns).encode('utf-8')).hexdigest()[:16]
+
+# === 通道数据类型推断 ===
+INT_DTYPES_UNSIGNED = [np.uint8, np.uint16, np.uint32]
+INT_DTYPES_SIGNED = [np.int8, np.int16, np.int32]
+
+def narrowest_dtype(values):
+    """
+    推断能精确保存 values (float64) 的最窄类型：
+    1. 全为有限的整数 (无 NaN / ±inf) 且在 int64 范围内: 按取值范围选 uint8/16/32 或 int8/16/32/64，
+       状态字等 16 位数据保持 2 字节。
+    2. 其余情况: 转为 float32 再转回与原值完全相同时才用 float32，否则用 float64
+       (如 0.1 ms 分辨率、数值在 3.6e6 附近的时间列，float32 会舍入到整 ms)。
+    """
+    if len(values) == 0: return np.dtype(np.uint8)
+    nan_mask = np.isnan(values)
+    if nan_mask.all(): return np.dtype(np.float32)
+    if np.isfinite(values).all() and np.array_equal(values, np.trunc(values)):
+        v_min, v_max = values.min(), values.max()
+        for dt in (INT_DTYPES_UNSIGNED if v_min >= 0 else INT_DTYPES_SIGNED):
+            info = np.iinfo(dt)
+            if info.min <= v_min and v_max <= info.max: return np.dtype(dt)
+        if -2.0 ** 63 <= v_min and v_max < 2.0 ** 63: return np.dtype(np.int64)
+    with np.errstate(over='ignore'):
+        exact = np.array_equal(values.astype(np.float32).astype(np.float64), values, equal_nan=True)
+    return np.dtype(np.float32 if exact else np.float64)
+
+def widen_dtype(current, needed):
+    """ 合并两个类型，结果能精确容纳两者 (uint16 + int16 -> int32，int32 + float32 -> float64) """
+    if current is None: return np.dtype(needed)
+    return np.promote_types(current, needed)
+
+def to_native_array(series):
+    """ 文本列 -> 数值数组，按 narrowest_dtype 收窄 """
+    values = pd.to_numeric(series, errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+    return values.astype(narrowest_dtype(values), copy=False)
+
+# === 派生通道 (按块惰性计算) ===
+def integer_words(block):
+    """ 数值 -> int64，空值按 0 处理 """
+    block = np.asarray(block)
+    if block.dtype.kind == 'f': block = np.nan_to_num(block, nan=0)
+    return block.astype(np.int64)
+
+def derive_words(blocks, bits=32, signed=True):
+    """ 16 位字按高位在前拼成 32/64 位整数 (精确)，空值按 0 处理 """
+    acc = np.zeros(len(blocks[0]), dtype=np.uint64)
+    for block in blocks:
+        acc = (acc << np.uint64(16)) | (integer_words(block) & 0xFFFF).astype(np.uint64)
+    out = acc.astype(np.dtype(f'uint{bits}'))
+    return out.view(np.dtype(f'int{bits}')) if signed else out
+
+def derive_bits(blocks, lsb=0, width=1):
+    """ 取第 lsb 位起的 width 位 (无符号)，结果用能容纳的最窄整型 """
+    out = (integer_words(blocks[0]) >> lsb) & ((1 << width) - 1)
+    for dt in (np.uint8, np.uint16, np.uint32):
+        if width <= np.iinfo(dt).bits: return out.astype(dt)
+    return out.astype(np.uint64)
+
+def derive_scale(blocks, gain=1.0, offset=0.0):
+    return np.asarray(blocks[0], dtype=np.float64) * gain + offset
+
+def derive_diff(blocks):
+    """ 相邻两点之差，输入块比输出多取前一行 (lookback=1) """
+    return np.diff(np.asarray(blocks[0], dtype=np.float64))
+
+ARITH_OPS = {'+': np.add, '-': np.subtract, '*': np.multiply, '/': np.divide}
+
+def derive_arith(blocks, symbol='+'):
+    """ 两通道逐点运算，除以 0 等得到的非有限值记为空值 """
+    a, b = (np.asarray(block, dtype=np.float64) for block in blocks)
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        out = ARITH_OPS[symbol](a, b)
+    out[~np.isfinite(out)] = np.nan
+    return out
+
+def derive_units(blocks, quantity='motor_rpm', **params):
+    """ 按 EPOS 计算器导出的参数集换算为物理量 (公式见 fb284_units) """
+    return fb284_units.convert(np.asarray(blocks[0], dtype=np.float64), quantity, params)
+
+# 运算类型: label 界面名称; func(输入块列表, **params) 向量化计算; lookback 每块需要额外读取的前置行数
+DERIVED_OPS = {
+    'words': {'label': '高低字合并', 'func': derive_words, 'lookback': 0},
+    'bits':  {'label': '位段提取', 'func': derive_bits, 'lookback': 0},
+    'scale': {'label': '比例/偏移', 'func': derive_scale, 'lookback': 0},
+    'diff':  {'label': '差分', 'func': derive_diff, 'lookback': 1},
+    'arith': {'label': '通道运算', 'func': derive_arith, 'lookback': 0},
+    'units': {'label': '物理单位 (FB284)', 'func': derive_units, 'lookback': 0},
+}
+
+def derived_spec(name, op, inputs, **params):
+    """ 派生通道的声明 (可直接写入缓存元数据的 JSON) """
+    return {'name': name, 'op': op, 'inputs': list(inputs), 'params': params}
+
+def derived_arity(spec):
+    """ 运算需要的输入通道数 """
+    if spec['op'] == 'words': return spec['params'].get('bits', 32) // 16
+    return 2 if spec['op'] == 'arith' else 1
+
+def describe_derived(spec):
+    """ 派生通道的文字说明 (合并管理器列表用) """
+    name, inputs, p = spec['name'], spec['inputs'], spec['params']
+    op = spec['op']
+    if op == 'words':
+        return f"{name} = {' : '.join(inputs)} ({'有' if p.get('signed', True) else '无'}符号 {p.get('bits', 32)} 位)"
+    if op == 'bits':
+        lsb, width = p.get('lsb', 0), p.get('width', 1)
+        return f"{name} = {inputs[0]} 第 {lsb} 位" if width == 1 else f"{name} = {inputs[0]} 第 {lsb}~{lsb + width - 1} 位"
+    if op == 'scale':
+        return f"{name} = {inputs[0]} × {p.get('gain', 1.0):g} + {p.get('offset', 0.0):g}"
+    if op == 'diff':
+        return f"{name} = Δ {inputs[0]}"
+    if op == 'units':
+        quantity = p.get('quantity', 'motor_rpm')
+        return f"{name} = {inputs[0]} {fb284_units.QUANTITIES[quantity][0]} ({fb284_units.quantity_unit(quantity, p)})"
+    return f"{name} = {inputs[0]} {p.get('symbol', '+')} {inputs[1]}"
+
+class DerivedColumn:
+    """
+    派生通道的只读列，对外表现为一维数组 (len / dtype / 切片 / 取单点)：
+    1. 数据不落地，按 STORE_CHUNK_ROWS 分块计算，块结果放在 ChannelStore 的 LRU 缓存中 (上限 DERIVED_CACHE_BYTES)。
+    2. 缓存块记录输入通道的版本，输入被替换或删除后自动重算；跟随模式追加行只重算末尾不完整的块。
+    3. np.asarray() 会计算整列，只适合小数据，大数据按区间切片。
+    """
+    ndim = 1
+
+    def __init__(self, store, spec):
+        self.store = store
+        self.spec = spec
+        self.op = DERIVED_OPS[spec['op']]
+        self._dtype = None
+
+    def __len__(self):
+        return len(self.store)
+
+    @property
+    def shape(self):
+        return (len(self),)
+
+    @property
+    def dtype(self):
+        # 各运算的结果类型只取决于参数与输入类型，用一小段零值试算即可
+        if self._dtype is None:
+            rows = 1 + self.op['lookback']
+            blocks = [np.zeros(rows, dtype=self.store.dtype(n)) for n in self.spec['inputs']]
+            self._dtype = self.op['func'](blocks, **self.spec['params']).dtype
+        return self._dtype
+
+    def evaluate(self, start, end):
+        """ 直接计算行 [start, end) (不经过缓存)，第 0 行之前缺少的前置行补 NaN """
+        if end <= start: return np.empty(0, dtype=self.dtype)
+        lookback = self.op['lookback']
+        first = max(0, start - lookback)
+        blocks = [np.asarray(self.store.slice(n, first, end)) for n in self.spec['inputs']]
+        out = self.op['func'](blocks, **self.spec['params'])
+        pad = lookback - (start - first)
+        if pad: out = np.concatenate([np.full(pad, np.nan, dtype=out.dtype), out])
+        return out
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            start, stop, step = key.indices(len(self))
+            if step < 1: raise IndexError("派生通道不支持反向切片")
+            return self._take(start, stop, step)
+        idx = int(key)
+        if idx < 0: idx += len(self)
+        if not 0 <= idx < len(self): raise IndexError(f"行号 {key} 超出范围")
+        return self.store.derived_chunk(self, idx // STORE_CHUNK_ROWS)[idx % STORE_CHUNK_ROWS]
+
+    def _take(self, start, stop, step):
+        parts = []
+        pos = start
+        while pos < stop:
+            ci = pos // STORE_CHUNK_ROWS
+            base = ci * STORE_CHUNK_ROWS
+            hi = min(stop, base + STORE_CHUNK_ROWS)
+            parts.append(self.store.derived_chunk(self, ci)[pos - base:hi - base:step])
+            pos += -(-(hi - pos) // step) * step
+        if not parts: return np.empty(0, dtype=self.dtype)
+        return parts[0] if len(parts) == 1 else np.concatenate(parts)
+
+    def __array__(self, dtype=None, copy=None):
+        out = self[:]
+        return out if dtype is None else out.astype(dtype, copy=False)
+
+# === 可增长列缓冲区 (分块读取用) ===
+class ColumnBuffer:
+    """
+    按块追加的单列缓冲区：
+    1. 容量按读取进度预估，一次分配到位，避免反复拼接。
+    2. view() 返回已写入部分的视图，可安全交给界面线程做渐进显示。
+    """
+    def __init__(self, dtype=np.float32, capacity=0):
+        self.data = np.empty(capacity, dtype=dtype)
+        self.size = 0
+
+    @property
+    def dtype(self):
+        return self.data.dtype
+
+    def widen(self, dtype):
+        """ 后续块超出当前类型范围时整列升级类型 (每列最多发生几次) """
+        new_data = np.empty(len(self.data), dtype=dtype)
+        new_data[:self.size] = self.data[:self.size]
+        self.data = new_data
+
+    def reserve(self, capacity):
+        if capacity <= len(self.data): return
+        new_data = np.empty(capacity, dtype=self.data.dtype)
+        new_data[:self.size] = self.data[:self.size]
+        self.data = new_data
+
+    def append(self, block):
+        end = self.size + len(block)
+        if end > len(self.data):
+            self.reserve(max(end, int(len(self.data) * 1.5)))
+        self.data[self.size:end] = block
+        self.size = end
+
+    def view(self):
+        return self.data[:self.size]
+
+# === 二进制列缓存 (再次打开同一文件时跳过解析) ===
+class TraceCache:
+    """
+    按列存储处理后的通道数据 (.npy，保持原生类型，可内存映射)：
+    1. 键 = 文件绝对路径 + 大小 + 修改时间，文件变动后自动失效。
+    2. meta.json 记录列名、行数以及 col_formats / 派生通道规则 / 隐藏列等界面元数据。
+    3. 总量超过 CACHE_LIMIT_BYTES 时按 last_used 淘汰最久未用的条目。
+    """
+    def __init__(self, root=CACHE_DIR, limit=CACHE_LIMIT_BYTES):
+        self.root = root
+        self.limit = limit
+
+    def _key(self, file_path):
+        st = os.stat(file_path)
+        ident = f"{os.path.abspath(file_path)}|{st.st_size}|{st.st_mtime_ns}"
+        return hashlib.sha1(ident.encode('utf-8')).hexdigest()[:20]
+
+    def _entry_dir(self, file_path):
+        return os.path.join(self.root, self._key(file_path))
+
+    def _read_meta(self, entry_dir):
+        try:
+            with open(os.path.join(entry_dir, 'meta.json'), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_meta(self, entry_dir, meta):
+        tmp = os.path.join(entry_dir, 'meta.json.tmp')
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False)
+        os.replace(tmp, os.path.join(entry_dir, 'meta.json'))
+
+    def lookup(self, file_path, usecols=None):
+        """
+        命中时返回 (meta, {列名: 只读内存映射数组})，否则返回 None。
+        usecols 为本次需要的列；缓存条目解析时的列选择必须覆盖它才算命中。
+        """
+        try:
+            entry_dir = self._entry_dir(file_path)
+        except OSError:
+            return None
+        meta = self._read_meta(entry_dir)
+        if meta is None: return None
+        parsed = meta.get('selection')
+        if parsed is not None and (usecols is None or not set(usecols) <= set(parsed)): return None
+        try:
+            columns = {name: np.load(os.path.join(entry_dir, fn), mmap_mode='r')
+                       for name, fn in zip(meta['columns'], meta['files'])
+                       if usecols is None or name in usecols}
+        except (OSError, ValueError, KeyError):
+            return None
+        if any(len(arr) != meta['rows'] for arr in columns.values()): return None
+        meta['last_used'] = time.time()
+        try: self._write_meta(entry_dir, meta)
+        except OSError: pass
+        return meta, columns
+
+    def store(self, file_path, columns, info="", selection=None, data_end=None):
+        """ 写入新条目 (先写临时目录再改名，中途中断不会留下半个条目) """
+        if sum(arr.nbytes for arr in columns.values()) > self.limit: return
+        entry_dir = self._entry_dir(file_path)
+        tmp_dir = os.path.join(self.root, f"tmp_{os.getpid()}_{os.path.basename(entry_dir)}")
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir)
+        names = list(columns.keys())
+        files = [f"c{i}.npy" for i in range(len(names))]
+        for name, fn in zip(names, files):
+            np.save(os.path.join(tmp_dir, fn), np.asarray(columns[name]))
+        meta = {
+            'source': os.path.abspath(file_path), 'rows': len(columns[names[0]]) if names else 0,
+            'columns': names, 'files': files, 'info': info, 'selection': selection, 'data_end': data_end,
+            'col_formats': {}, 'derived': [], 'hidden_cols': [],
+            'last_used': time.time(),
+        }
+        self._write_meta(tmp_dir, meta)
+        shutil.rmtree(entry_dir, ignore_errors=True)
+        os.replace(tmp_dir, entry_dir)
+        self.evict(keep=entry_dir)
+
+    def update_meta(self, file_path, **fields):
+        """ 更新界面元数据 (显示格式、派生通道规则等)，下次打开时恢复 """
+        try:
+            entry_dir = self._entry_dir(file_path)
+        except OSError:
+            return
+        meta = self._read_meta(entry_dir)
+        if meta is None: return
+        meta.update(fields)
+        try: self._write_meta(entry_dir, meta)
+        except OSError: pass
+
+    def _entries(self):
+        if not os.path.isdir(self.root): return []
+        result = []
+        for name in os.listdir(self.root):
+            path = os.path.join(self.root, name)
+            if not os.path.isdir(path): continue
+            size = sum(e.stat().st_size for e in os.scandir(path) if e.is_file())
+            meta = self._read_meta(path)
+            last_used = meta.get('last_used', 0) if meta else 0
+            result.append((last_used, size, path))
+        return result
+
+    def total_size(self):
+        return sum(size for _, size, _ in self._entries())
+
+    def evict(self, keep=None):
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.limit: break
+            if path == keep: continue
+            # 正被内存映射的文件在 Windows 上删不掉，忽略错误即可，下次再清
+            shutil.rmtree(path, ignore_errors=True)
+            total -= size
+
+    def clear(self):
+        for _, _, path in self._entries():
+            shutil.rmtree(path, ignore_errors=True)
+
+# === 外存列缓冲区 ===
+class SpillColumnBuffer:
+    """ 外存模式的列缓冲区：块数据直接追加写入磁盘文件，内存中不累积 """
+    def __init__(self, new_path, dtype=np.float32):
+        self.new_path = new_path
+        self.path = new_path()
+        self.dtype = np.dtype(dtype)
+        self.size = 0
+        self._fh = open(self.path, 'wb')
+
+    def widen(self, dtype):
+        """ 升级类型：旧文件按块转换写入新文件 (旧文件可能正被预览映射，写新文件而不是原地改) """
+        old = self.view()
+        self._fh.close()
+        self.path = self.new_path()
+        self.dtype = np.dtype(dtype)
+        self._fh = open(self.path, 'wb')
+        for start in range(0, self.size, STORE_CHUNK_ROWS):
+            old[start:start + STORE_CHUNK_ROWS].astype(self.dtype).tofile(self._fh)
+        del old
+
+    def reserve(self, capacity):
+        pass
+
+    def append(self, block):
+        np.ascontiguousarray(block, dtype=self.dtype).tofile(self._fh)
+        self.size += len(block)
+
+    def view(self):
+        if not self._fh.closed: self._fh.flush()
+        if self.size == 0: return np.empty(0, dtype=self.dtype)
+        return np.memmap(self.path, dtype=self.dtype, mode='r', shape=(self.size,))
+
+    def close(self):
+        self._fh.close()
+
+# === 通道存储 (统一的数据访问接口) ===
+class ChannelStore:
+    """
+    按列保存通道数据，绘图、统计、光标读数、派生通道都只通过本类取数：
+    1. 内存模式: 每列一个 ndarray。
+    2. 外存模式 (spill_dir 不为空): 每列一个磁盘文件 + np.memmap，常驻内存由系统页缓存决定。
+    3. 派生通道 (add_derived): DerivedColumn 按块惰性计算，计算结果只在块缓存中保留有限的一部分。
+    """
+    def __init__(self, columns=None, spill_dir=None):
+        self.spill_dir = spill_dir
+        self.rows = 0
+        self._arrays = {}
+        self._buffers = {}    # 跟随模式下各列的可增长缓冲区
+        self._derived = {}    # 派生通道名 -> DerivedColumn
+        self._versions = {}   # 通道名 -> 版本号，通道被替换或删除时递增
+        self._chunk_cache = OrderedDict()   # (派生通道名, 块号) -> (输入版本, 数据)，按最近使用排序
+        self._cache_bytes = 0
+        self._cache_lock = threading.Lock() # 后台建金字塔与界面线程会同时读取派生通道
+        for name, arr in (columns or {}).items():
+            self.add(name, arr)
+
+    @classmethod
+    def create_spill(cls):
+        """ 新建外存模式的空存储 (临时目录在 close() 时删除) """
+        os.makedirs(SPILL_ROOT, exist_ok=True)
+        return cls(spill_dir=tempfile.mkdtemp(prefix='store_', dir=SPILL_ROOT))
+
+    @property
+    def columns(self):
+        return list(self._arrays.keys()) + list(self._derived.keys())
+
+    @property
+    def base_columns(self):
+        """ 从文件读入的通道 (不含派生通道) """
+        return list(self._arrays.keys())
+
+    @property
+    def out_of_core(self):
+        return self.spill_dir is not None
+
+    def __len__(self):
+        return self.rows
+
+    def __contains__(self, name):
+        return name in self._arrays or name in self._derived
+
+    def dtype(self, name):
+        return self.values(name).dtype
+
+    def values(self, name):
+        """ 整列数据：普通通道为 ndarray / memmap，派生通道为按需计算的 DerivedColumn """
+        return self._arrays[name] if name in self._arrays else self._derived[name]
+
+    def slice(self, name, start, end):
+        return self.values(name)[max(0, start):end]
+
+    def row(self, idx, names):
+        return [self.values(n)[idx] for n in names]
+
+    def iter_chunks(self, name, chunk_rows=STORE_CHUNK_ROWS):
+        arr = self.values(name)
+        for start in range(0, self.rows, chunk_rows):
+            yield start, arr[start:start + chunk_rows]
+
+    def spill_path(self, tag):
+        # 序号在进程内全局递增：渐进预览的存储与加载线程的存储共用同一目录
+        return os.path.join(self.spill_dir, f"{tag}_{next(SPILL_SEQ)}.bin")
+
+    def allocate(self, tag, dtype, rows=None):
+        """ 分配一块与通道等长的可写数组，外存模式下落在磁盘上 """
+        rows = self.rows if rows is None else rows
+        if self.spill_dir is None or rows == 0:
+            return np.empty(rows, dtype=dtype)
+        return np.memmap(self.spill_path(tag), dtype=dtype, mode='w+', shape=(rows,))
+
+    def add(self, name, arr):
+        if name in self._derived:
+            raise ValueError(f"通道 {name} 已作为派生通道存在")
+        if self._arrays and len(arr) != self.rows:
+            raise ValueError(f"通道 {name} 长度 ({len(arr)}) 与现有数据 ({self.rows}) 不一致")
+        self.rows = len(arr)
+        self._arrays[name] = arr
+        self._bump(name)
+
+    def drop(self, name):
+        """ 删除通道，依赖它的派生通道一并删除；返回实际删除的通道名 """
+        dropped = []
+        for spec in self.derived_specs():
+            if name in spec['inputs'] and spec['name'] in self: dropped += self.drop(spec['name'])
+        if name not in self: return dropped
+        self._arrays.pop(name, None)
+        self._derived.pop(name, None)
+        buf = self._buffers.pop(name, None)
+        if isinstance(buf, SpillColumnBuffer): buf.close()
+        self._bump(name)
+        return [name] + dropped
+
+    def add_derived(self, spec):
+        """ 登记派生通道 (不立即计算)，spec 见 derived_spec()，输入通道须已存在 """
+        name = spec['name']
+        if name in self: raise ValueError(f"通道 {name} 已存在")
+        if spec['op'] not in DERIVED_OPS: raise ValueError(f"未知的派生运算: {spec['op']}")
+        missing = [c for c in spec['inputs'] if c not in self]
+        if missing: raise ValueError(f"派生通道 {name} 缺少输入通道: {', '.join(missing)}")
+        if len(spec['inputs']) != derived_arity(spec):
+            raise ValueError(f"派生通道 {name} 需要 {derived_arity(spec)} 个输入通道")
+        self._derived[name] = DerivedColumn(self, spec)
+        self._bump(name)
+
+    def is_derived(self, name):
+        return name in self._derived
+
+    def derived_specs(self):
+        return [col.spec for col in self._derived.values()]
+
+    def _bump(self, name):
+        self._versions[name] = self._versions.get(name, 0) + 1
+        with self._cache_lock:
+            for key in [k for k in self._chunk_cache if k[0] == name]:
+                self._cache_bytes -= self._chunk_cache.pop(key)[1].nbytes
+
+    def version(self, name):
+        """ 通道的版本：派生通道还包含各输入通道的版本，任何一个输入变化都会使其改变 """
+        col = self._derived.get(name)
+        if col is None: return self._versions.get(name, 0)
+        return (self._versions.get(name, 0), tuple(self.version(n) for n in col.spec['inputs']))
+
+    def derived_chunk(self, col, ci):
+        """ 派生通道第 ci 块的数据：缓存中版本与行数都一致时直接返回，否则重算并按 LRU 淘汰旧块 """
+        key = (col.spec['name'], ci)
+        start = ci * STORE_CHUNK_ROWS
+        end = min(self.rows, start + STORE_CHUNK_ROWS)
+        version = self.version(key[0])
+        with self._cache_lock:
+            hit = self._chunk_cache.get(key)
+            if hit is not None and hit[0] == version and len(hit[1]) == end - start:
+                self._chunk_cache.move_to_end(key)
+                return hit[1]
+        data = col.evaluate(start, end)   # 不持锁计算，输入本身也可能是派生通道
+        with self._cache_lock:
+            old = self._chunk_cache.pop(key, None)
+            if old is not None: self._cache_bytes -= old[1].nbytes
+            self._chunk_cache[key] = (version, data)
+            self._cache_bytes += data.nbytes
+            while self._cache_bytes > DERIVED_CACHE_BYTES and len(self._chunk_cache) > 1:
+                _, (_, evicted) = self._chunk_cache.popitem(last=False)
+                self._cache_bytes -= evicted.nbytes
+        return data
+
+    def make_growable(self):
+        """
+        跟随模式：把各列换成可增长缓冲区，之后 append_rows 只追加新行。
+        每列只在首次转换时按块复制一次现有数据。
+        """
+        for name, arr in list(self._arrays.items()):
+            if name in self._buffers: continue
+            if self.out_of_core:
+                buf = SpillColumnBuffer(lambda: self.spill_path('col'), arr.dtype)
+            else:
+                buf = ColumnBuffer(arr.dtype, self.rows + self.rows // 4)
+            for _, block in self.iter_chunks(name): buf.append(block)
+            self._buffers[name] = buf
+            self._arrays[name] = buf.view()
+
+    def promote(self, name, dtype):
+        """ 把读入的通道换成更宽的类型 (按块复制，外存模式下落在磁盘上)；已是该类型时不做任何事 """
+        dtype = np.dtype(dtype)
+        if self._arrays[name].dtype == dtype: return
+        out = self.allocate('col', dtype)
+        for start, block in self.iter_chunks(name): out[start:start + len(block)] = block
+        growable = self._buffers.pop(name, None) is not None
+        self._arrays[name] = out
+        self._bump(name)
+        if growable: self.make_growable()
+
+    def append_rows(self, blocks):
+        """ 各列追加等长的新数据，后续数据超出当前类型范围时自动升级类型 """
+        if set(blocks) != set(self._arrays):
+            raise ValueError("追加的数据与现有通道不一致")
+        self.make_growable()
+        for name, block in blocks.items():
+            buf = self._buffers[name]
+            dtype = widen_dtype(buf.dtype, block.dtype)
+            if dtype != buf.dtype: buf.widen(dtype)
+            buf.append(block)
+            self._arrays[name] = buf.view()
+        self.rows += len(next(iter(blocks.values())))
+
+    def close(self):
+        self._arrays.clear()
+        self._derived.clear()
+        with self._cache_lock:
+            self._chunk_cache.clear()
+            self._cache_bytes = 0
+        for buf in self._buffers.values():
+            if isinstance(buf, SpillColumnBuffer): buf.close()
+        self._buffers.clear()
+        if self.spill_dir:
+            shutil.rmtree(self.spill_dir, ignore_errors=True)
+
+def cleanup_stale_spill(max_age=24 * 3600):
+    """ 清理异常退出遗留的外存目录 (仅删除足够旧的，避免误删其他实例正在使用的) """
+    if not os.path.isdir(SPILL_ROOT): return
+    now = time.time()
+    for name in os.listdir(SPILL_ROOT):
+        path = os.path.join(SPILL_ROOT, name)
+        try:
+            if now - os.path.getmtime(path) > max_age:
+                shutil.rmtree(path, ignore_errors=True)
+        except OSError:
+            pass
+
+# === 隐式时间轴 ===
+class TimeBase:
+    """
+    隐式时间轴：第 i 行 (从 0 起) 的时间 = (offset + i) * period，本身不占内存。
+    1. 行号与时间的换算都按整数行号直接计算，长录波中不会像 float32 时间数组那样丢精度。
+    2. 修改采样周期只需新建一个 TimeBase，与文件大小无关。
+    3. take() 按需生成某一段的时间 (float64)，用于绘图与导出。
+    """
+    def __init__(self, offset=0, period=1.0):
+        self.offset = int(offset)
+        self.period = float(period)
+
+    def time_at(self, idx):
+        """ 行号 (整数或整数数组) 对应的时间 """
+        return (np.asarray(idx, dtype=np.int64) + self.offset) * self.period
+
+    def take(self, start, end, step=1):
+        return np.arange(self.offset + start, self.offset + end, step, dtype=np.int64) * self.period
+
+    def _position(self, t):
+        # 取 9 位小数消除除法误差，落在采样点上的时间不会被算到相邻行
+        return round(t / self.period - self.offset, 9)
+
+    def index_at(self, t, side='left'):
+        """ 等同于对完整时间数组做 searchsorted (结果未按行数截断) """
+        pos = self._position(t)
+        return int(np.ceil(pos)) if side == 'left' else int(np.floor(pos)) + 1
+
+    def index_range(self, t0, t1, rows):
+        """ 时间区间 [t0, t1] 覆盖的行范围 [start, end)，已截断到 0~rows """
+        start = min(max(0, self.index_at(t0, 'left')), rows)
+        end = min(max(start, self.index_at(t1, 'right')), rows)
+        return start, end
+
+    def nearest(self, t, rows):
+        """ 离时间 t 最近的行号 """
+        return min(max(0, int(round(self._position(t)))), rows - 1)
+
+class IndexedTimeBase:
+    """
+    以文件中的时间戳列作为时间轴 (采样有抖动或缺口的记录)，接口与 TimeBase 相同：
+    1. 时间列必须单调不减；行号与时间的换算用二分查找，可视区查询为 O(log n)。
+    2. 按块扫描一次：典型周期取首块间隔的中位数，间隔超过 TIME_GAP_FACTOR 倍的记为缺口。
+    3. 跟随模式下 extend() 只扫描新增的行。
+    4. 时间列一律按 float64 保存 (不论读入时收窄成什么类型)，缺口位置与时长不受 float32 尾数限制。
+    """
+    def __init__(self, store, name, offset=0):
+        self.store = store
+        self.name = name
+        self.offset = int(offset)
+        self.period = None
+        self.gaps = []       # [(缺口后第一行的行号, 缺口时长)]
+        self.rows = 0
+        self.extend()
+        store.promote(name, np.float64)   # 校验通过后才替换，无效的时间列保持原类型
+
+    @property
+    def times(self):
+        return self.store.values(self.name)
+
+    def extend(self):
+        """ 检查新增行的单调性并记录其中的缺口 """
+        times = self.times
+        rows = len(times)
+        for start in range(max(0, self.rows - 1), rows - 1, STORE_CHUNK_ROWS):
+            block = np.asarray(times[start:start + STORE_CHUNK_ROWS + 1], dtype=np.float64)
+            d = np.diff(block)
+            bad = np.flatnonzero(~(d >= 0))
+            if len(bad):
+                raise ValueError(f"时间列 {self.name} 第 {start + bad[0] + 2} 行的时间戳不是递增的 (或为空)")
+            if self.period is None:
+                pos = d[d > 0]
+                self.period = float(np.median(pos)) if len(pos) else 1.0
+            idx = np.flatnonzero(d > self.period * TIME_GAP_FACTOR)
+            self.gaps.extend((start + int(i) + 1, float(d[i])) for i in idx)
+        if self.period is None: self.period = 1.0
+        self.rows = rows
+
+    def time_at(self, idx):
+        if np.ndim(idx) == 0: return float(self.times[idx])
+        return np.asarray(self.times[idx], dtype=np.float64)
+
+    def take(self, start, end, step=1):
+        return np.asarray(self.times[start:end:step], dtype=np.float64)
+
+    def index_at(self, t, side='left'):
+        return int(np.searchsorted(self.times, t, side=side))
+
+    def index_range(self, t0, t1, rows):
+        times = self.times[:rows]
+        start = int(np.searchsorted(times, t0, side='left'))
+        end = int(np.searchsorted(times, t1, side='right'))
+        return start, max(start, end)
+
+    def nearest(self, t, rows):
+        times = self.times[:rows]
+        i = int(np.searchsorted(times, t, side='left'))
+        if i >= rows: return rows - 1
+        if i > 0 and t - times[i - 1] <= times[i] - t: return i - 1
+        return i
+
+    def gap_summary(self):
+        """ 缺口列表的文字说明 (最多 TIME_GAP_REPORT 条) """
+        lines = [f"第 {self.offset + row} 行前: 间隔 {gap:g} ms" for row, gap in self.gaps[:TIME_GAP_REPORT]]
+        if len(self.gaps) > TIME_GAP_REPORT: lines.append(f"... 共 {len(self.gaps)} 处")
+        return "\n".join(lines)
+
+# === 行偏移索引 (区间加载) ===
+class LineIndex:
+    """
+    文本文件的稀疏行偏移索引：
+    1. 一次顺序扫描按块统计换行符，每 LINE_INDEX_STRIDE 个数据行记录一次起始字节偏移。
+    2. 保存在文件旁的 .lidx.npz (目录不可写时放到缓存目录)，以大小 + 修改时间校验，重复区间加载无需重扫。
+    3. 按物理行计数：不支持引号内含换行的字段，也不支持 UTF-16 文本。
+    """
+    def __init__(self, offsets, rows, stride, file_size, mtime_ns):
+        self.offsets = offsets       # offsets[k] = 第 k * stride 个数据行的起始字节
+        self.rows = rows             # 数据行数 (不含表头)
+        self.stride = stride
+        self.file_size = file_size
+        self.mtime_ns = mtime_ns
+
+    @staticmethod
+    def sidecar_paths(file_path):
+        key = hashlib.sha1(os.path.abspath(file_path).encode('utf-8')).hexdigest()[:20]
+        return [file_path + '.lidx.npz', os.path.join(CACHE_DIR, f"{key}.lidx.npz")]
+
+    @classmethod
+    def load(cls, file_path):
+        """ 读取已有索引，文件已变动或索引损坏时返回 None """
+        st = os.stat(file_path)
+        for path in cls.sidecar_paths(file_path):
+            try:
+                with np.load(path) as z:
+                    if (int(z['version']) == LINE_INDEX_VERSION and int(z['file_size']) == st.st_size
+                            and int(z['mtime_ns']) == st.st_mtime_ns):
+                        return cls(z['offsets'], int(z['rows']), int(z['stride']), st.st_size, st.st_mtime_ns)
+            except (OSError, KeyError, ValueError):
+                continue
+        return None
+
+    @classmethod
+    def build(cls, file_path, progress=None, stride=LINE_INDEX_STRIDE):
+        """ 顺序扫描建立索引，progress(0~1) 用于进度回调 """
+        st = os.stat(file_path)
+        file_size = st.st_size
+        parts = []
+        data_start = None
+        rows = 0      # 已确定起始位置的数据行数
+        base = 0
+        with open(file_path, 'rb') as fh:
+            while base < file_size:
+                # 只扫描到 stat 时的文件大小，正在追加写入的文件也能得到一致的索引
+                buf = fh.read(min(LINE_INDEX_SCAN_BYTES, file_size - base))
+                if not buf: break
+                starts = np.flatnonzero(np.frombuffer(buf, dtype=np.uint8) == 0x0A).astype(np.int64) + (base + 1)
+                base += len(buf)
+                starts = starts[starts < file_size]   # 末尾换行之后没有数据行
+                if data_start is None:
+                    if len(starts) == 0: continue
+                    # 第一个换行之后是首个数据行
+                    data_start, starts = starts[0], starts[1:]
+                    parts.append(np.array([data_start], dtype=np.int64))
+                    rows = 1
+                # starts[i] 是第 rows + i 个数据行的起始位置，只保留 stride 整数倍的行
+                parts.append(starts[(-rows) % stride::stride])
+                rows += len(starts)
+                if progress: progress(base / max(1, file_size))
+
+        offsets = np.concatenate(parts) if parts else np.zeros(0, dtype=np.int64)
+        return cls(offsets, rows, stride, file_size, st.st_mtime_ns)
+
+    def save(self, file_path):
+        """ 优先写在数据文件旁，失败时写入缓存目录 """
+        for path in self.sidecar_paths(file_path):
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+                tmp = path + '.tmp.npz'
+                np.savez(tmp, version=LINE_INDEX_VERSION, offsets=self.offsets, rows=self.rows, stride=self.stride,
+                         file_size=self.file_size, mtime_ns=self.mtime_ns)
+                os.replace(tmp, path)
+                return path
+            except OSError:
+                continue
+        return None
+
+    def locate(self, start):
+        """ 返回 (最近的已记录行的字节偏移, 需要跳过的行数) """
+        k = min(start // self.stride, len(self.offsets) - 1)
+        return int(self.offsets[k]), start - k * self.stride
+
+    def byte_pos(self, row):
+        """ 不早于第 row 行的最近记录位置，用于估算区间的字节跨度 """
+        k = -(-row // self.stride)
+        return int(self.offsets[k]) if k < len(self.offsets) else self.file_size
+
+def last_line_end(file_path):
+    """ 最后一个换行符之后的字节位置，之后的内容是尚未写完的行；没有换行时返回 0 """
+    end = os.path.getsize(file_path)
+    with open(file_path, 'rb') as fh:
+        while end > 0:
+            start = max(0, end - LINE_INDEX_SCAN_BYTES)
+            fh.seek(start)
+            nl = fh.read(end - start).rfind(b'\n')
+            if nl >= 0: return start + nl + 1
+            end = start
+    return 0
+
+class FileRange(RawIOBase):
+    """ 只读到 end 字节为止的文件视图，pd.read_csv 不会读到之后的内容 """
+    def __init__(self, fh, end):
+        self.fh = fh
+        self.end = end
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        n = min(len(b), self.end - self.fh.tell())
+        if n <= 0: return 0
+        return self.fh.readinto(memoryview(b)[:n])
+
+class LineIndexThread(QThread):
+    finished_signal = pyqtSignal(object)
+    error_signal = pyqtSignal(str)
+    info_signal = pyqtSignal(str)
+
+    def __init__(self, file_path):
+        super().__init__()
+        self.file_path = file_path
+
+    def run(self):
+        try:
+            index = LineIndex.build(self.file_path, progress=lambda p: self.info_signal.emit(f"正在建立行索引: {int(p * 100)}%"))
+            index.save(self.file_path)
+            self.finished_signal.emit(index)
+        except Exception as e:
+            self.error_signal.emit(f"建立行索引失败: {str(e)}")
+
+# === 解密文本来源 (可插拔) ===
+class TextSource:
+    """
+    解密文本来源接口：
+    1. iter_chunks() 逐块产出 (文本, 进度 0~1)，文本直接流入分块 C 引擎解析，不落临时文件。
+    2. close() 释放后端资源 (COM 进程、文件句柄等)，解析结束或出错时都会调用。
+    3. info 回调用于向界面报告当前步骤。
+    """
+    name = "文本来源"
+
+    def __init__(self, file_path, info=None):
+        self.file_path = file_path
+        self.info = info or (lambda msg: None)
+
+    def iter_chunks(self):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+class WordTextSource(TextSource):
+    """ 通过 Word COM 打开加密文件，按字符区间分块取出文本 """
+    name = "Word 解密"
+    CHUNK_CHARS = 50000
+
+    def __init__(self, file_path, info=None):
+        super().__init__(file_path, info)
+        self.word_app = None
+        self.doc = None
+        self.com_ready = False
+
+    def iter_chunks(self):
+        # --- 步骤 1: 启动 Word ---
+        self.info("正在启动引擎...")
+        pythoncom.CoInitialize()
+        self.com_ready = True
+        self.word_app = win32.DispatchEx("Word.Application")
+        self.word_app.Visible = False
+        self.word_app.DisplayAlerts = False
+
+        # [关键优化] 禁用拼写和语法检查，显著提高打开大文件的速度
+        self.word_app.Options.CheckSpellingAsYouType = False
+        self.word_app.Options.CheckGrammarAsYouType = False
+        self.word_app.Options.CheckGrammarWithSpelling = False
+
+        # --- 步骤 2: 打开文件 (最耗时的一步) ---
+        file_abs_path = os.path.abspath(self.file_path)
+        file_size_mb = os.path.getsize(file_abs_path) / (1024 * 1024)
+        if file_size_mb > 50:
+            self.info(f"正在载入大文件 ({file_size_mb:.1f}MB)，请耐心等待...")
+        else:
+            self.info("正在打开文件...")
+
+        # 这里是阻塞的，Word 正在解析文件
+        self.doc = self.word_app.Documents.Open(
+            FileName=file_abs_path,
+            ConfirmConversions=False,
+            ReadOnly=True,
+            AddToRecentFiles=False
+        )
+
+        # --- 步骤 3: 分块取出文本 ---
+        self.info("文件打开成功，正在分析结构...")
+        total_chars = self.doc.Content.End
+        start_index = 0
+        while start_index < total_chars:
+            end_index = min(start_index + self.CHUNK_CHARS, total_chars)
+            chunk_text = self.doc.Range(Start=start_index, End=end_index).Text
+            if chunk_text:
+                yield chunk_text.replace('\r', '\n').replace('\x0b', '').replace('\x00', ''), end_index / total_chars
+            start_index = end_index
+
+    def close(self):
+        if self.doc:
+            try: self.doc.Close(SaveChanges=0)
+            except: pass
+        if self.word_app:
+            try: self.word_app.Quit()
+            except: pass
+        self.doc = None
+        self.word_app = None
+        if self.com_ready:
+            pythoncom.CoUninitialize()
+            self.com_ready = False
+
+class PlainTextSource(TextSource):
+    """ 纯文本替身：按 UTF-8 分块读取普通文件，用于在没有 Word 的环境 (如 Linux) 测试和测速解密流水线 """
+    name = "纯文本替身"
+    CHUNK_CHARS = 1 << 20
+
+    def __init__(self, file_path, info=None):
+        super().__init__(file_path, info)
+        self.fh = None
+
+    def iter_chunks(self):
+        total = max(1, os.path.getsize(self.file_path))
+        self.fh = open(self.file_path, 'r', encoding='utf-8', errors='replace', newline='')
+        done = 0
+        while True:
+            text = self.fh.read(self.CHUNK_CHARS)
+            if not text: break
+            done += len(text)
+            yield text, min(1.0, done / total)
+
+    def close(self):
+        if self.fh: self.fh.close()
+        self.fh = None
+
+TEXT_SOURCES = {'word': WordTextSource, 'plain': PlainTextSource}
+
+def text_source_class():
+    """
+    选择解密后端：默认 Word COM (需要 pywin32)。
+    设置环境变量 WAVE_TEXT_SOURCE=plain 时改用纯文本替身，且所有文件都走解密流水线，便于测试与测速。
+    """
+    name = os.environ.get('WAVE_TEXT_SOURCE') or ('word' if HAS_WIN32 else '')
+    return TEXT_SOURCES.get(name)
+
+class TextSourceStream(TextIOBase):
+    """ 把 TextSource 的分块输出包装成只读文本流，pd.read_csv 可直接按块读取 """
+    def __init__(self, source):
+        self._chunks = source.iter_chunks()
+        self._buf = ''
+        self.progress = 0.0
+
+    def readable(self):
+        return True
+
+    def _fill(self):
+        try:
+            text, self.progress = next(self._chunks)
+        except StopIteration:
+            return False
+        self._buf += text
+        return True
+
+    def peek(self, size):
+        """ 预读开头文本 (用于识别分隔符)，不消耗数据 """
+        while len(self._buf) < size and self._fill(): pass
+        return self._buf[:size]
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            while self._fill(): pass
+            size = len(self._buf)
+        while len(self._buf) < size and self._fill(): pass
+        out, self._buf = self._buf[:size], self._buf[size:]
+        return out
+
+class FileLoaderThread(QThread):
+    finished_signal = pyqtSignal(object)
+    partial_signal = pyqtSignal(object)   # 渐进显示: {'columns': {列名: 数组视图}, 'rows': 行数, 'progress': 0~1}
+    format_signal = pyqtSignal(str)       # 格式识别结果 (显示在状态栏)
+    error_signal = pyqtSignal(str)
+    info_signal = pyqtSignal(str)
+
+    def __init__(self, file_path, cache=None, out_of_core=False, fmt=None, usecols=None, row_range=None, line_index=None):
+        super().__init__()
+        self.file_path = file_path
+        self.cache = cache
+        self.out_of_core = out_of_core
+        self.fmt = fmt           # 已在界面线程识别过的格式 (None 则在线程内识别)
+        self.usecols = usecols   # 只解析这些列 (None 为全部)
+        self.row_range = row_range     # 区间加载: (起始行, 结束行)，不含结束行
+        self.line_index = line_index
+        self.cache_meta = None   # 命中缓存时保存界面元数据，供主窗口恢复
+        self.data_end = None     # 已解析文本的结束字节 (最后一个完整行的换行之后)，跟随模式从这里继续读
+        self.data_ready = False
+
+    def _parse_csv_chunked(self, file_path, start_pos=0, end_pos=None, **read_kwargs):
+        """ 解析普通文本文件的 start_pos ~ end_pos 字节 (区间加载时从 start_pos 开始读)，进度按该字节跨度计算 """
+        if end_pos is None: end_pos = os.path.getsize(file_path)
+        span = max(1, end_pos - start_pos)
+        with open(file_path, 'rb') as fh:
+            fh.seek(start_pos)
+            stream = BufferedReader(FileRange(fh, end_pos))
+            return self._parse_stream(stream, lambda: min(1.0, (fh.tell() - start_pos) / span), **read_kwargs)
+
+    def _parse_text_source(self, source, **read_kwargs):
+        """ 解密来源的文本边产出边解析，不写临时文件；返回 (store, 分隔符) """
+        stream = TextSourceStream(source)
+        try:
+            sep = sniff_separator(stream.peek(SNIFF_HEAD_BYTES))
+            store = self._parse_stream(stream, lambda: stream.progress, label="正在解密并解析",
+                                       sep=sep, on_bad_lines='skip', **read_kwargs)
+        finally:
+            source.close()
+        return store, sep
+
+    def _parse_stream(self, fh, progress_fn, label="正在读取", **read_kwargs):
+        """
+        分块解析 CSV 流：
+        1. 每块只做 to_numeric + 类型收窄，随即写入列缓冲区，文本 DataFrame 用完即弃。
+        2. 峰值内存 ≈ 单块文本 + 最终的原生类型列数组。
+        3. 按间隔通过 partial_signal 发出已读部分，界面可边读边显示。
+        4. 外存模式下块数据直接追加到磁盘文件，结果为内存映射的 ChannelStore。
+        fh 可以是二进制文件或 TextSourceStream，progress_fn() 返回 0~1 的进度。
+        """
+        store = ChannelStore.create_spill() if self.out_of_core else ChannelStore()
+        names = None
+        buffers = {}
+        has_data = {}
+        rows = 0
+        last_emit = 0.0
+
+        try:
+            reader = pd.read_csv(fh, chunksize=CSV_CHUNK_ROWS, engine='c', **read_kwargs)
+            for chunk in reader:
+                if names is None:
+                    names = [str(c).strip() for c in chunk.columns]
+                    has_data = {n: False for n in names}
+
+                for name, col in zip(names, chunk.columns):
+                    raw = chunk[col]
+                    if not has_data[name] and raw.notna().any():
+                        has_data[name] = True
+                    block = to_native_array(raw)
+                    buf = buffers.get(name)
+                    if buf is None:
+                        if store.out_of_core:
+                            buf = SpillColumnBuffer(lambda: store.spill_path('col'), block.dtype)
+                        else:
+                            buf = ColumnBuffer(block.dtype)
+                        buffers[name] = buf
+                    else:
+                        dtype = widen_dtype(buf.dtype, block.dtype)
+                        if dtype != buf.dtype: buf.widen(dtype)
+                    buf.append(block)
+                rows += len(chunk)
+                del chunk
+
+                # 按已读比例预估总行数，提前一次性扩容
+                progress = progress_fn()
+                if 0 < progress < 1:
+                    estimate = int(rows / progress * 1.05)
+                    for buf in buffers.values(): buf.reserve(estimate)
+
+                self.info_signal.emit(f"{label}: {int(progress * 100)}%")
+                now = time.time()
+                if now - last_emit >= PARTIAL_EMIT_INTERVAL:
+                    last_emit = now
+                    self.partial_signal.emit({
+                        'columns': {n: buffers[n].view() for n in names if has_data[n]},
+                        'rows': rows,
+                        'progress': progress,
+                        'spill_dir': store.spill_dir,
+                    })
+        except Exception:
+            if store.out_of_core:
+                for buf in buffers.values(): buf.close()
+            store.close()
+            raise
+
+        if store.out_of_core:
+            for buf in buffers.values(): buf.close()
+        if not names or rows == 0:
+            store.close()
+            return None
+        # 删除全空列 (与整表读取时的 dropna(how='all', axis=1) 等价)
+        for n in names:
+            if has_data[n]: store.add(n, buffers[n].view())
+            elif store.out_of_core: os.remove(buffers[n].path)
+        return store
+
+    def run(self):
+        try:
+            store = None
+
+            # --- 0. 命中二进制缓存则直接映射，跳过解析 ---
+            hit = self.cache.lookup(self.file_path, self.usecols) if self.cache and self.row_range is None else None
+            if hit is not None:
+                meta, columns = hit
+                self.cache_meta = meta
+                self.data_end = meta.get('data_end')
+                self.format_signal.emit(f"缓存命中 · {meta.get('info', '')}".rstrip(' ·'))
+                self.data_ready = True
+                store = ChannelStore.create_spill() if self.out_of_core else ChannelStore()
+                for name, arr in columns.items(): store.add(name, arr)
+                self.finished_signal.emit(store)
+                return
+            
+            # --- 1. 采样识别编码与分隔符，只做一次解析 ---
+            fmt = self.fmt
+            if fmt is None:
+                self.info_signal.emit("正在识别文件格式...")
+                fmt = sniff_text_format(self.file_path)
+            self.format_signal.emit(fmt['desc'])
+            info = fmt['desc']
+
+            usecols_kwargs = {}
+            if self.usecols is not None:
+                # 列投影：C 引擎只转换选中的列
+                wanted = set(self.usecols)
+                usecols_kwargs['usecols'] = lambda c: str(c).strip() in wanted
+
+            source_cls = text_source_class()
+            forced = source_cls is not None and os.environ.get('WAVE_TEXT_SOURCE')
+            if fmt['kind'] == 'text' and not (forced and self.row_range is None):
+                read_kwargs = dict(encoding=fmt['encoding'], sep=fmt['sep'], encoding_errors='replace',
+                                   on_bad_lines='skip', **usecols_kwargs)
+                if self.row_range is not None:
+                    # 区间加载：跳到最近的索引行，再跳过零头行数，只解析所需行数
+                    start, end = self.row_range
+                    pos, skip = self.line_index.locate(start)
+                    read_kwargs.update(header=None, names=read_header_columns(self.file_path, fmt), skiprows=skip,
+                                       nrows=end - start, start_pos=pos, end_pos=self.line_index.byte_pos(end))
+                elif not fmt['encoding'].startswith('utf-16'):
+                    # 只解析到最后一个换行：正在写入的文件末尾半行不读入，跟随时从这里接着读
+                    self.data_end = read_kwargs['end_pos'] = last_line_end(self.file_path)
+                try:
+                    store = self._parse_csv_chunked(self.file_path, **read_kwargs)
+                except Exception as e:
+                    print(f"常规解析失败: {e}")
+
+            # --- 2. 判断是否需要解密 ---
+            # 如果读出来是空，或者列很少，说明可能被加密了
+            is_invalid = (store is None) or (len(store) == 0) or (len(store.columns) < 1)
+            
+            if is_invalid and source_cls is not None and self.row_range is None:
+                if fmt['kind'] == 'text' and not forced: self.format_signal.emit(f"{fmt['desc']} 失败 → {source_cls.name}")
+                self.info_signal.emit("常规解析失败，准备解密...")
+                # --- 3. 解密文本直接流入分块解析 ---
+                self.data_end = None   # 解密文本与文件字节位置无法对应，不支持跟随
+                try:
+                    store, sep = self._parse_text_source(source_cls(self.file_path, self.info_signal.emit), **usecols_kwargs)
+                    info = f"{source_cls.name} · {SEP_NAMES[sep]}分隔 · C 引擎分块解析"
+                    self.format_signal.emit(info)
+                except Exception as e:
+                    print(f"[!] {source_cls.name}失败: {e}")
+
+            # --- 4. 交付数据 ---
+            if store is not None and len(store) > 0:
+                self.data_ready = True
+                self.finished_signal.emit(store)
+
+                # 写入缓存在后台线程完成，不耽误界面显示
+                if self.cache and self.row_range is None:
+                    try:
+                        self.cache.store(self.file_path, {c: store.values(c) for c in store.columns},
+                                         info=info, selection=self.usecols, data_end=self.data_end)
+                    except Exception as e:
+                        print(f"缓存写入失败: {e}")
+            else:
+                extra_msg = "" if HAS_WIN32 else "\n(未检测到 pywin32，无法使用 Word 解密)"
+                raise Exception(f"无法读取文件，可能格式错误或加密无法解析。{extra_msg}")
+
+        except Exception as e:
+            self.error_signal.emit(f"加载异常: {str(e)}")
+
+# === 多级 min/max 金字塔 (LOD) ===
+def reduce_buckets(values, bucket, func):
+    """ 每 bucket 个点归约为一个 (末尾不足一桶的单独归约)，func 为 np.fmin / np.fmax，忽略空值 """
+    values = np.asarray(values)
+    full = len(values) // bucket * bucket
+    out = func.reduce(values[:full].reshape(-1, bucket), axis=1)
+    if full < len(values): out = np.append(out, func.reduce(values[full:]))
+    return out
+
+class MinMaxPyramid:
+    """
+    单通道的多级 min/max 金字塔：
+    1. 第 k 级每桶 LOD_BASE_BUCKET * LOD_LEVEL_FACTOR^k 个点，保存桶内最小/最大值 (原生类型，空值忽略)。
+    2. 第 0 级按块从通道数据生成 (外存模式下落在磁盘上)，更粗的级别由上一级归约，体积逐级缩小。
+    3. query() 按可视行范围挑选每像素约一个桶的级别，返回交错的 min/max 折线，
+       绘制开销只与屏幕宽度有关，与采样点数无关；范围足够小时直接返回原始点。
+    """
+    def __init__(self, levels, rows):
+        self.levels = levels   # [(桶大小, mins, maxs), ...]，由细到粗
+        self.rows = rows
+
+    @classmethod
+    def build(cls, store, name, stop=None):
+        """ stop() 返回 True 时在块之间中止，返回 None """
+        rows = len(store)
+        levels = []
+        if rows < LOD_BASE_BUCKET * LOD_MIN_BUCKETS: return cls(levels, rows)
+
+        bucket = LOD_BASE_BUCKET
+        count = -(-rows // bucket)
+        mins = store.allocate('lod', store.dtype(name), count)
+        maxs = store.allocate('lod', store.dtype(name), count)
+        for start, block in store.iter_chunks(name):   # STORE_CHUNK_ROWS 是桶大小的整数倍
+            if stop is not None and stop(): return None
+            b0 = start // bucket
+            lo = reduce_buckets(block, bucket, np.fmin)
+            mins[b0:b0 + len(lo)] = lo
+            maxs[b0:b0 + len(lo)] = reduce_buckets(block, bucket, np.fmax)
+        levels.append((bucket, mins, maxs))
+
+        while count // LOD_LEVEL_FACTOR >= LOD_MIN_BUCKETS:
+            bucket *= LOD_LEVEL_FACTOR
+            mins = reduce_buckets(mins, LOD_LEVEL_FACTOR, np.fmin)
+            maxs = reduce_buckets(maxs, LOD_LEVEL_FACTOR, np.fmax)
+            count = len(mins)
+            levels.append((bucket, mins, maxs))
+        return cls(levels, rows)
+
+    def query(self, time_base, values, start, end, buckets):
+        """ 返回行范围 [start, end) 内约 buckets 个桶的 (x, y) """
+        start, end = max(0, start), min(self.rows, end)
+        if end - start <= buckets * 2 or not self.levels:
+            return time_base.take(start, end), values[start:end]
+        for bucket, mins, maxs in self.levels:
+            if (end - start) / bucket <= buckets: break
+        b0, b1 = start // bucket, -(-end // bucket)
+        y = np.empty(2 * (b1 - b0), dtype=mins.dtype)
+        y[0::2] = mins[b0:b1]
+        y[1::2] = maxs[b0:b1]
+        x = np.repeat(time_base.take(b0 * bucket, min(b1 * bucket, self.rows), bucket), 2)
+        return x, y
+
+# === 区间统计索引 (视图统计表) ===
+def summarize(values):
+    """
+    原始数据的 (有效点数, 最小, 最大, 均值, 离差平方和 M2)，空值忽略；没有有效点时最小/最大为 None。
+    M2 按“先求均值再累加离差平方”两遍计算，带大偏置的信号 (如 1e9 ± 2) 也不会相消。
+    """
+    values = np.asarray(values)
+    if values.dtype.kind == 'f':
+        valid = values[~np.isnan(values)]
+    else:
+        valid = values
+    if len(valid) == 0: return 0, None, None, 0.0, 0.0
+    f = valid.astype(np.float64)
+    mean = float(f.mean())
+    d = f - mean
+    return len(valid), valid.min(), valid.max(), mean, float(np.dot(d, d))
+
+def merge_moments(a, b):
+    """ 合并两段的 (点数, 均值, M2) (Chan 并行公式) """
+    na, ma, qa = a
+    nb, mb, qb = b
+    if na == 0: return b
+    if nb == 0: return a
+    n = na + nb
+    delta = mb - ma
+    return n, ma + delta * nb / n, qa + qb + delta * delta * na * nb / n
+
+def block_sums(values, block, ref):
+    """
+    每 block 个点的 (有效点数, Σ(x - ref), 块内 M2, 点数 × 块均值偏差²)，末尾不足一块的单独计算。
+    块内离差按块均值计算，块间部分只含块均值相对参考值 ref 的偏差，两者都不受信号偏置影响。
+    """
+    f = np.asarray(values, dtype=np.float64) - ref
+    pad = -len(f) % block
+    if pad: f = np.concatenate([f, np.full(pad, np.nan)])
+    f = f.reshape(-1, block)
+    valid = ~np.isnan(f)
+    count = valid.sum(axis=1)
+    total = np.where(valid, f, 0.0).sum(axis=1)
+    mean = total / np.maximum(count, 1)
+    d = np.where(valid, f - mean[:, None], 0.0)
+    return count, total, np.einsum('ij,ij->i', d, d), total * mean
+
+class RangeStats:
+    """
+    单通道的区间统计索引，任意宽度的行区间都是常数时间：
+    1. 按 STATS_BLOCK 行分块，块 min/max 建稀疏表 (第 k 层为连续 2^k 块的极值)，整块部分查两次表。
+    2. 均值/RMS/标准差用的矩按块保存为前缀和 (见 block_sums)：数值先减去通道的参考值 (首个有效采样)，
+       块内离差平方和按块均值计算，大偏置信号的标准差不会因 Σx² - (Σx)²/n 相消而失真。
+    3. 区间两端不满一块的部分 (各不足 STATS_BLOCK 行) 从原始数据直接计算，按 merge_moments 合并。
+    """
+    def __init__(self, mins, maxs, prefix, ref, rows):
+        self.mins = mins       # 稀疏表: [第 0 层, 第 1 层, ...]
+        self.maxs = maxs
+        self.prefix = prefix   # block_sums 四项各自的前缀和 (长度为块数 + 1)
+        self.ref = ref         # 参考值
+        self.rows = rows
+
+    @classmethod
+    def build(cls, store, name, stop=None):
+        """ stop() 返回 True 时在块之间中止，返回 None """
+        rows = len(store)
+        count = -(-rows // STATS_BLOCK)
+        mins = np.empty(count, dtype=store.dtype(name))
+        maxs = np.empty(count, dtype=store.dtype(name))
+        sums = [np.zeros(count + 1) for _ in range(4)]
+        ref = None
+        for start, block in store.iter_chunks(name):
+            if stop is not None and stop(): return None
+            b0 = start // STATS_BLOCK
+            lo = reduce_buckets(block, STATS_BLOCK, np.fmin)
+            mins[b0:b0 + len(lo)] = lo
+            maxs[b0:b0 + len(lo)] = reduce_buckets(block, STATS_BLOCK, np.fmax)
+            if ref is None:
+                # 之前的块都没有有效点 (各项为 0)，参考值可以从这里才确定
+                f = np.asarray(block, dtype=np.float64)
+                f = f[~np.isnan(f)]
+                if len(f): ref = float(f[0])
+            for acc, part in zip(sums, block_sums(block, STATS_BLOCK, ref or 0.0)):
+                acc[b0 + 1:b0 + 1 + len(part)] = part
+        prefix = tuple(np.cumsum(acc) for acc in sums)
+
+        min_levels, max_levels = [mins], [maxs]
+        span = 1
+        while span * 2 <= count:
+            lo, hi = min_levels[-1], max_levels[-1]
+            min_levels.append(np.fmin(lo[:-span], lo[span:]))
+            max_levels.append(np.fmax(hi[:-span], hi[span:]))
+            span *= 2
+        return cls(min_levels, max_levels, prefix, ref or 0.0, rows)
+
+    def query(self, values, start, end):
+        """ 行区间 [start, end) 的 (有效点数, 最小, 最大, 均值, M2)，含义同 summarize() """
+        start, end = max(0, int(start)), min(self.rows, int(end))
+        b0, b1 = -(-start // STATS_BLOCK), end // STATS_BLOCK
+        if b1 - b0 < 1: return summarize(values[start:end])
+
+        k = (b1 - b0).bit_length() - 1
+        lo = np.fmin(self.mins[k][b0], self.mins[k][b1 - (1 << k)])
+        hi = np.fmax(self.maxs[k][b0], self.maxs[k][b1 - (1 << k)])
+        n, total, within, between = (float(p[b1] - p[b0]) for p in self.prefix)
+        n = int(n)
+        moments = (n, self.ref + total / n, within + max(0.0, between - total * total / n)) if n else (0, 0.0, 0.0)
+        for edge in (values[start:b0 * STATS_BLOCK], values[b1 * STATS_BLOCK:end]):
+            en, emin, emax, emean, em2 = summarize(edge)
+            if en == 0: continue
+            moments = merge_moments(moments, (en, emean, em2))
+            lo, hi = np.fmin(lo, emin), np.fmax(hi, emax)
+        if moments[0] == 0: return 0, None, None, 0.0, 0.0
+        return moments[0], lo, hi, moments[1], moments[2]
+
+# === 逻辑分析仪位通道 (状态字/控制字按位显示) ===
+def name_words(name):
+    """ 名称按字母数字拆成大写的词 (符号、空格、中文都作分隔)，如 "Drive.POS_ZSW1" -> ['DRIVE', 'POS', 'ZSW1'] """
+    return re.findall(r'[A-Z0-9]+', name.upper())
+
+def panel_key(name):
+    """
+    通道名对应的 PANEL_CONFIGS 报文，不是状态字/控制字时返回 None：
+    去掉符号后与报文名相同，或名称中有连续的整词与报文名相同 (STW10 不算 STW1)；多个匹配时取最长的。
+    """
+    words = name_words(name)
+    def hit(key):
+        kw = name_words(key)
+        if not kw: return False
+        if ''.join(kw) == ''.join(words): return True
+        return any(words[i:i + len(kw)] == kw for i in range(len(words) - len(kw) + 1))
+    matches = [k for k in PANEL_CONFIGS if hit(k)]
+    return max(matches, key=lambda k: len(''.join(name_words(k)))) if matches else None
+
+def word_bits(dtype):
+    """ 按位展开时的字宽：32 位及以上的整数列按 32 位，其余按 16 位 """
+    return 32 if dtype.kind in 'iu' and dtype.itemsize >= 4 else 16
+
+def word_lane_specs(name, bits=16):
+    """
+    通道名 -> 位通道列表 [(标题, 起始位, 位数, 恒定时可省略)]：
+    1. 按名称整词匹配 PANEL_CONFIGS (见 panel_key，POS_ZSW1 优先于 ZSW1)，沿用监控界面的位说明与多位字段。
+    2. 没有匹配的通道逐位显示 Bit0 ~ Bit(bits-1)；超过 16 位时全程不变的位不显示。
+    """
+    key = panel_key(name)
+    if key is None:
+        return [(f"Bit{i}", i, 1, bits > 16) for i in range(bits)]
+    lanes = []
+    for bit, text in enumerate(PANEL_CONFIGS[key]['texts']):
+        if text is None: continue
+        if isinstance(text, tuple): lanes.append((text[0], bit, text[1], False))
+        else: lanes.append((f"{bit}: {text}", bit, 1, text == "保留"))
+    return lanes
+
+class LogicLanes:
+    """
+    状态字/控制字的位通道 (游程编码)：
+    1. extend() 按块做一次异或扫描 (每行与前一行异或)，只在字发生变化的行上取值；跟随模式只扫描新增行。
+    2. 每条位通道 (单个位或多位字段) 保存为 starts (各段起始行) + values (该段取值)，由字变化行按位掩码一次筛出。
+    3. steps() 只取可视区内的跳变，绘图开销与跳变数成正比，与采样点数无关。
+    4. 各段起始行即跳变位置，transitions()/edges() 按跳变方向筛出升序行号，供事件导航二分查找。
+    """
+    def __init__(self, store, name, lanes, stop=None):
+        self.store = store
+        self.name = name
+        self.lanes = lanes
+        self.version = store.version(name)
+        self.rows = 0
+        self.last = 0        # 已扫描部分最后一行的字值
+        self.runs = [(np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)) for _ in lanes]
+        self._edges = {}     # (通道序号, 跳变方向) -> (生成时的行数, 行号数组)
+        self.extend(stop)
+
+    @classmethod
+    def for_channel(cls, store, name, stop=None):
+        """ 按通道名与数据类型确定位通道划分 (见 word_lane_specs) 并整列扫描，中止时返回 None """
+        lanes = cls(store, name, word_lane_specs(name, word_bits(store.dtype(name))), stop)
+        return lanes if lanes.rows == len(store) else None
+
+    def extend(self, stop=None):
+        """ 扫描新增的行，返回是否有新数据；stop() 返回 True 时在块之间中止，已有的索引不变 """
+        rows = len(self.store)
+        if rows <= self.rows: return False
+        change_rows, change_vals, change_xor = [], [], []
+        last = self.last
+        for start in range(self.rows, rows, STORE_CHUNK_ROWS):
+            if stop is not None and stop(): return False
+            v = integer_words(self.store.slice(self.name, start, min(rows, start + STORE_CHUNK_ROWS)))
+            x = np.empty_like(v)
+            # 第 0 行作为一次“全位跳变”，各通道的首段由它给出
+            x[0] = ~np.int64(0) if start == 0 else v[0] ^ last
+            x[1:] = v[1:] ^ v[:-1]
+            idx = np.flatnonzero(x)
+            change_rows.append(idx + start)
+            change_vals.append(v[idx])
+            change_xor.append(x[idx])
+            last = int(v[-1])
+        self.last = last
+        rows_at, vals, xors = (np.concatenate(parts) for parts in (change_rows, change_vals, change_xor))
+        for i, (_, lsb, width, _) in enumerate(self.lanes):
+            mask = (1 << width) - 1
+            hit = ((xors >> lsb) & mask) != 0
+            starts, values = self.runs[i]
+            self.runs[i] = (np.concatenate([starts, rows_at[hit]]),
+                            np.concatenate([values, (vals[hit] >> lsb) & mask]))
+        self.rows = rows
+        return True
+
+    def shown_lanes(self):
+        """ 需要显示的位通道序号 (标为可省略且全程不变的除外) """
+        return [i for i, lane in enumerate(self.lanes) if not (lane[3] and len(self.runs[i][0]) <= 1)]
+
+    def steps(self, i, start, end, buckets):
+        """
+        行范围 [start, end) 内第 i 条通道的 (各段起始行, 取值)。
+        跳变多于 buckets * 2 时按桶合并，每桶只保留最小与最大值 (密集翻转显示为实心带)。
+        """
+        starts, values = self.runs[i]
+        a = max(0, int(np.searchsorted(starts, start, side='right')) - 1)
+        b = int(np.searchsorted(starts, end, side='left'))
+        s, v = starts[a:b].copy(), values[a:b]
+        if len(s) == 0: return s, v
+        s[0] = max(s[0], start)
+        if len(s) > buckets * 2:
+            bucket_id = (s - start) * buckets // max(1, end - start)
+            first = np.concatenate([[0], np.flatnonzero(np.diff(bucket_id)) + 1])
+            lo = np.minimum.reduceat(v, first)
+            hi = np.maximum.reduceat(v, first)
+            s = np.repeat(s[first], 2)
+            v = np.column_stack([lo, hi]).ravel()
+        return s, v
+
+    def transitions(self, i, kind='any'):
+        """
+        第 i 条通道的跳变 (行号, 原值, 新值)，行号升序 (首段起点不算跳变)：
+        rise 为 0 变为非 0，fall 为非 0 变为 0，any 为任意变化 (多位字段的取值变化)。
+        """
+        starts, values = self.runs[i]
+        rows, old, new = starts[1:], values[:-1], values[1:]
+        if kind == 'rise': hit = (old == 0) & (new != 0)
+        elif kind == 'fall': hit = (old != 0) & (new == 0)
+        else: return rows, old, new
+        return rows[hit], old[hit], new[hit]
+
+    def edges(self, i, kind='any'):
+        """ 第 i 条通道的跳变行号 (升序)，按需筛出后缓存，跟随模式下行数变化时重新筛选 """
+        cached = self._edges.get((i, kind))
+        if cached is None or cached[0] != self.rows:
+            cached = (self.rows, self.transitions(i, kind)[0])
+            self._edges[(i, kind)] = cached
+        return cached[1]
+
+class LaneIndexThread(QThread):
+    """ 后台为若干通道建立位通道索引 (LogicLanes)，每建好一个通道发一次 """
+    progress_signal = pyqtSignal(int, int, str)   # 已完成数, 总数, 正在处理的通道
+    lanes_signal = pyqtSignal(str, object)
+    error_signal = pyqtSignal(str)
+
+    def __init__(self, store, names):
+        super().__init__()
+        self.store = store
+        self.names = names
+
+    def run(self):
+        built = 0
+        for k, name in enumerate(self.names):
+            self.progress_signal.emit(k, len(self.names), name)
+            try:
+                lanes = LogicLanes.for_channel(self.store, name, self.isInterruptionRequested)
+            except Exception as e:
+                self.error_signal.emit(f"通道 {name} 的位跳变索引建立失败: {e}")
+                continue
+            if lanes is None: return
+            self.lanes_signal.emit(name, lanes)
+            built += 1
+        self.progress_signal.emit(built, built, "")   # 完成时只报告建成的通道数，失败原因见状态栏
+
+# === 触发搜索 (示波器式触发条件，整段分块扫描) ===
+# 条件函数把一块数据映射为状态码：1 条件成立，0 不成立，-1 保持前一状态 (回差带内或空值)
+def trigger_code(on, off):
+    return np.where(on, 1, np.where(off, 0, -1)).astype(np.int8)
+
+def trigger_level(block, level=0.0, hysteresis=0.0, edge='rise'):
+    """
+    电平穿越 (状态为“高于电平”)，回差按示波器习惯放在预备一侧：
+    上升沿须先低于 level - hysteresis 再到达 level，下降沿须先高于 level + hysteresis 再回到 level，双沿时回差带以 level 为中心。
+    """
+    v = np.asarray(block, dtype=np.float64)
+    if edge == 'rise': return trigger_code(v >= level, v < level - hysteresis)
+    if edge == 'fall': return trigger_code(v > level + hysteresis, v <= level)
+    return trigger_code(v >= level + hysteresis / 2, v < level - hysteresis / 2)
+
+def trigger_bit(block, bit=0, edge='rise'):
+    """ 位跳变沿 (状态为该位的值，空值按 0 处理) """
+    return ((integer_words(block) >> bit) & 1).astype(np.int8)
+
+def trigger_window(block, low=0.0, high=0.0, inside=True, min_width=0.0):
+    """ 值在窗口 [low, high] 内 (inside=False 时为窗口外) """
+    v = np.asarray(block, dtype=np.float64)
+    hit = (v >= low) & (v <= high)
+    miss = ~hit & ~np.isnan(v)
+    return trigger_code(hit, miss) if inside else trigger_code(miss, hit)
+
+def trigger_pulse(block, level=0.0, polarity='high', min_width=0.0):
+    """ 脉冲 (高脉冲为不低于 level 的段，低脉冲为低于 level 的段) """
+    v = np.asarray(block, dtype=np.float64)
+    high, low = v >= level, v < level
+    return trigger_code(high, low) if polarity == 'high' else trigger_code(low, high)
+
+# 触发类型: label 界面名称; func(块, **params) 状态码; mode 为 edge 时取状态跳变 (params['edge'] 指定方向)，
+# 为 run 时取状态成立的各段，宽度 (ms) 超过 params['min_width'] 的才算一次触发
+TRIGGER_TYPES = {
+    'level':  {'label': '电平穿越 (带回差)', 'func': trigger_level, 'mode': 'edge'},
+    'bit':    {'label': '位跳变沿', 'func': trigger_bit, 'mode': 'edge'},
+    'window': {'label': '值在窗口内/外', 'func': trigger_window, 'mode': 'run'},
+    'pulse':  {'label': '脉宽大于', 'func': trigger_pulse, 'mode': 'run'},
+}
+
+def trigger_spec(kind, channel, **params):
+    return {'type': kind, 'channel': channel, 'params': params}
+
+class TriggerScanner:
+    """
+    触发条件的分块扫描：
+    1. 状态码中的 -1 向量化前向填充 (回差带内沿用最近一次确定的状态)，块间只传递上一块末尾的状态与未结束的段，
+       结果与整列一次扫描相同。
+    2. 跳变类 (电平、位) 的触发点为状态 0→1 / 1→0 的行；持续类 (窗口、脉宽) 为状态成立的各段起点，结束行一并记录。
+    """
+    def __init__(self, spec, time_base):
+        kind = TRIGGER_TYPES[spec['type']]
+        self.func, self.mode = kind['func'], kind['mode']
+        self.params = spec['params']
+        self.time_base = time_base
+        self.state = -1          # 已扫描部分末尾的状态 (-1 为尚未确定)
+        self.run_start = None    # 跨块尚未结束的段的起始行
+        self.starts, self.ends = [], []
+
+    def feed(self, start, block):
+        if len(block) == 0: return
+        code = self.func(block, **self.params)
+        if (code < 0).any():
+            pos = np.where(code >= 0, np.arange(len(code)), -1)
+            np.maximum.accumulate(pos, out=pos)
+            code = np.where(pos >= 0, code[np.maximum(pos, 0)], self.state).astype(np.int8)
+        prev = np.empty_like(code)
+        prev[0] = self.state
+        prev[1:] = code[:-1]
+        self.state = int(code[-1])
+        if self.mode == 'edge':
+            edge = self.params.get('edge', 'rise')
+            if edge == 'rise': hit = (prev == 0) & (code == 1)
+            elif edge == 'fall': hit = (prev == 1) & (code == 0)
+            else: hit = (prev >= 0) & (prev != code)
+            rows = np.flatnonzero(hit) + start
+            self.starts.append(rows)
+            self.ends.append(rows)
+            return
+        up = np.flatnonzero((prev != 1) & (code == 1)) + start
+        down = np.flatnonzero((prev == 1) & (code != 1)) + start
+        if self.run_start is not None: up = np.concatenate([[self.run_start], up])
+        self.run_start = int(up[-1]) if len(up) > len(down) else None
+        self.keep_runs(up[:len(down)], down, down)
 
-class FileLoaderThread(QThread):
-    finished_signal = pyqtSignal(object)
+    def keep_runs(self, starts, ends, width_ends):
+        """ 段宽 = 结束处与起始处的时间差，只保留超过 min_width 的段 """
+        min_width = self.params.get('min_width', 0.0)
+        if min_width > 0 and len(starts):
+            keep = self.time_base.time_at(width_ends) - self.time_base.time_at(starts) > min_width
+            starts, ends = starts[keep], ends[keep]
+        self.starts.append(starts)
+        self.ends.append(ends)
+
+    def finish(self, rows):
+        """ 返回 (各次触发的起始行, 结束行)；数据末尾仍未结束的段按已有长度计算宽度 """
+        if self.run_start is not None and rows > 0:
+            start = np.array([self.run_start], dtype=np.int64)
+            self.keep_runs(start, np.array([rows], dtype=np.int64), np.array([rows - 1], dtype=np.int64))
+            self.run_start = None
+        empty = np.empty(0, dtype=np.int64)
+        return (np.concatenate(self.starts).astype(np.int64) if self.starts else empty,
+                np.concatenate(self.ends).astype(np.int64) if self.ends else empty)
+
+class TriggerSearchThread(QThread):
+    progress_signal = pyqtSignal(int)            # 已扫描的百分比
+    result_signal = pyqtSignal(object, object)   # (各次触发的起始行, 结束行)
     error_signal = pyqtSignal(str)
-    info_signal = pyqtSignal(str)
 
-    def __init__(self, file_path):
+    def __init__(self, store, time_base, spec):
         super().__init__()
-        self.file_path = file_path
-
-    def _read_via_word_chunked(self, file_path):
-        """ 
-        优化版：
-        1. 细化了加载状态提示，让你知道程序卡在哪一步。
-        2. 禁用了 Word 的拼写/语法检查，加速大文件打开。
-        3. 保持分块读取和进度条功能。
-        """
-        word_app = None
-        doc = None
-        temp_save_path = file_path + "_decrypted.txt"
-        CHUNK_SIZE = 50000 
+        self.store = store
+        self.time_base = time_base
+        self.spec = spec
 
+    def run(self):
         try:
-            # --- 步骤 1: 启动 Word ---
-            self.info_signal.emit("正在启动引擎...")
-            pythoncom.CoInitialize()
-            word_app = win32.DispatchEx("Word.Application")
-            word_app.Visible = False
-            word_app.DisplayAlerts = False
-            
-            # [关键优化] 禁用拼写和语法检查，显著提高打开大文件的速度
-            word_app.Options.CheckSpellingAsYouType = False
-            word_app.Options.CheckGrammarAsYouType = False
-            word_app.Options.CheckGrammarWithSpelling = False
-
-            # --- 步骤 2: 打开文件 (最耗时的一步) ---
-            file_abs_path = os.path.abspath(file_path)
-            file_size_mb = os.path.getsize(file_abs_path) / (1024 * 1024)
-            
-            # 根据文件大小给出不同提示
-            if file_size_mb > 50:
-                self.info_signal.emit(f"正在载入大文件 ({file_size_mb:.1f}MB)，请耐心等待...")
-            else:
-                self.info_signal.emit("正在打开文件...")
-
-            # 这里是阻塞的，Word 正在解析文件，程序会在此暂停直到打开完成
-            doc = word_app.Documents.Open(
-                FileName=file_abs_path, 
-                ConfirmConversions=False, 
-                ReadOnly=True, 
-                AddToRecentFiles=False
-            )
-            
-            # --- 步骤 3: 准备读取 ---
-            self.info_signal.emit("文件打开成功，正在分析结构...")
-            total_chars = doc.Content.End
-            
-            # --- 步骤 4: 分块解密 ---
-            with open(temp_save_path, 'w', encoding='utf-8') as f_out:
-                start_index = 0
-                while start_index < total_chars:
-                    end_index = min(start_index + CHUNK_SIZE, total_chars)
-                    
-                    rng = doc.Range(Start=start_index, End=end_index)
-                    chunk_text = rng.Text
-                    
-                    if chunk_text:
-                        chunk_text = chunk_text.replace('\r', '\n').replace('\x0b', '').replace('\x00', '')
-                        f_out.write(chunk_text)
-                    
-                    # 更新进度条
-                    if total_chars > 0:
-                        percent = (end_index / total_chars) * 100
-                        self.info_signal.emit(f"正在解密: {int(percent)}%")
-                    
-                    start_index = end_index
-
-            print(f"[+] 解密完成: {temp_save_path}")
-            return temp_save_path
-
+            rows = len(self.store)   # 跟随模式下只搜索开始时已有的行
+            scanner = TriggerScanner(self.spec, self.time_base)
+            for start in range(0, rows, STORE_CHUNK_ROWS):
+                if self.isInterruptionRequested(): return
+                end = min(rows, start + STORE_CHUNK_ROWS)
+                scanner.feed(start, self.store.slice(self.spec['channel'], start, end))
+                self.progress_signal.emit(end * 100 // rows)
+            self.result_signal.emit(*scanner.finish(rows))
         except Exception as e:
-            print(f"[!] Word 处理失败: {e}")
-            if os.path.exists(temp_save_path):
-                try: os.remove(temp_save_path)
-                except: pass
-            return None
+            self.error_signal.emit(str(e))
 
-        finally:
-            if doc:
-                try: doc.Close(SaveChanges=0)
-                except: pass
-            if word_app:
-                try: word_app.Quit()
-                except: pass
-            pythoncom.CoUninitialize()
+class PyramidBuilderThread(QThread):
+    pyramid_signal = pyqtSignal(str, object)   # 每建好一个通道发一次，界面逐通道切换
+    stats_signal = pyqtSignal(str, object)     # 同一遍中建立的区间统计索引
+    error_signal = pyqtSignal(str)
+
+    def __init__(self, store, names):
+        super().__init__()
+        self.store = store
+        self.names = names
 
     def run(self):
-        temp_file_path = None
-        try:
-            df = None
-            
-            # --- 1. 尝试常规读取 ---
+        # 在通道之间与块之间检查中止请求：强行终止可能停在持有存储缓存锁 (或 GIL) 的位置
+        for name in self.names:
             try:
-                df = pd.read_csv(self.file_path, encoding='utf-8', low_memory=False, engine='c')
-            except Exception:
-                try:
-                    df = pd.read_csv(self.file_path, encoding='gbk', on_bad_lines='skip', low_memory=False, engine='c')
-                except Exception:
-                    pass
-
-            # --- 2. 判断是否需要解密 ---
-            # 如果读出来是空，或者列很少，说明可能被加密了
-            is_invalid = (df is None) or (len(df) == 0) or (len(df.columns) < 1)
-            
-            if is_invalid and HAS_WIN32:
-                self.info_signal.emit("常规解析失败，准备解密...")
-                
-                # 调用分块读取方法，直接返回生成的文件路径
-                temp_file_path = self._read_via_word_chunked(self.file_path)
-            
-            # --- 3. 读取解密后的临时文件 ---
-            # 如果 temp_file_path 存在，说明是通过 Word 解密生成的
-            if temp_file_path and os.path.exists(temp_file_path):
-                self.info_signal.emit("解密完成，正在加载数据...")
-                try:
-                    # 读取生成的临时文件
-                    df = pd.read_csv(temp_file_path, sep=None, engine='python', encoding='utf-8')
-                except Exception as e:
-                    print(f"临时文件解析失败: {e}")
-                
-                # 读取完后清理临时文件
-                try:
-                    os.remove(temp_file_path)
-                except:
-                    pass
-
-            # --- 4. 数据最终处理 ---
-            if df is not None and len(df) > 0:
-                # 删除全空列
-                df.dropna(how='all', axis=1, inplace=True)
-                # 强制转数值
-                for col in df.columns:
-                    df[col] = pd.to_numeric(df[col], errors='coerce')
-                # 压缩内存
-                df = df.astype(np.float32)
-                # 清理列名空格
-                df.columns = df.columns.str.strip()
-                
-                self.finished_signal.emit(df)
-            else:
-                extra_msg = "" if HAS_WIN32 else "\n(未检测到 pywin32，无法使用 Word 解密)"
-                raise Exception(f"无法读取文件，可能格式错误或加密无法解析。{extra_msg}")
+                stats = RangeStats.build(self.store, name, self.isInterruptionRequested)
+                if stats is None: return
+                self.stats_signal.emit(name, stats)
+                pyramid = MinMaxPyramid.build(self.store, name, self.isInterruptionRequested)
+                if pyramid is None: return
+                self.pyramid_signal.emit(name, pyramid)
+            except Exception as e:
+                # 单个通道失败不影响其余通道，该通道继续用整列数据绘制
+                self.error_signal.emit(f"通道 {name} 的 LOD 构建失败: {e}")
 
-        except Exception as e:
-            self.error_signal.emit(f"加载异常: {str(e)}")
-            # 异常时清理残留文件
-            if temp_file_path and os.path.exists(temp_file_path):
-                try: os.remove(temp_file_path)
-                except: pass
-
-# === 线程: 后台数据点优化 ===
+# === 线程: 后台数据点 (只取可视区内的真实采样点) ===
 class DotPreparerThread(QThread):
-    finished_signal = pyqtSignal(dict)
+    finished_signal = pyqtSignal(dict, object)
+    error_signal = pyqtSignal(str)
 
-    def __init__(self, df, time_axis):
+    def __init__(self, store, time_base, start, end, names):
         super().__init__()
-        self.df = df
-        self.time_axis = time_axis
+        self.store = store
+        self.time_base = time_base
+        self.window = (start, end)
+        self.names = names
 
     def run(self):
         try:
+            start, end = self.window
             dots_data = {}
-            total_rows = len(self.df)
-            target_points = 80000 
-            step = max(1, total_rows // target_points)
-            indices = np.arange(0, total_rows, step)
-            x_downsampled = self.time_axis[indices]
-            
-            for col in self.df.columns:
-                y_downsampled = self.df[col].values[indices]
-                dots_data[col] = (x_downsampled, y_downsampled)
-            
-            self.finished_signal.emit(dots_data)
-        except Exception:
-            pass
+            x = self.time_base.take(start, end)
+            # 外存模式下切片仍是映射，拷贝一次让读盘留在后台线程
+            for col in self.names:
+                dots_data[col] = (x, np.array(self.store.slice(col, start, end)))
+            self.finished_signal.emit(dots_data, self.window)
+        except Exception as e:
+            self.error_signal.emit(f"数据点计算失败: {e}")
 
 # === 主窗口 ===
 class ProOscilloscope(QMainWindow):
@@ -542,8 +3158,8 @@ class ProOscilloscope(QMainWindow):
 
         self.apply_stylesheet()
 
-        self.df = None
-        self.time_axis = None
+        self.store = None
+        self.time_base = None
         self.dots_cache = None 
         self.main_vb = None 
         self.overlay_views = [] 
@@ -565,6 +3181,58 @@ class ProOscilloscope(QMainWindow):
         self.proxy = None 
         self.loader = None
         self.dot_worker = None
+        self.load_info = ""
+        self.current_file = None
+        self.row_offset = 0     # 区间加载时首行在文件中的行号，时间轴从该行起算
+        self.row_range = None
+        self.index_worker = None
+        self.follow = None       # 跟随模式状态: 读取位置、表头、格式
+        self.time_buffer = None  # 按需生成的整列时间 (只在无金字塔、整列画曲线时使用)
+        self.follow_timer = QTimer(self)
+        self.follow_timer.timeout.connect(self.follow_tick)
+        self.lod_pyramids = {}   # 通道名 -> MinMaxPyramid
+        self.range_stats = {}    # 通道名 -> RangeStats
+        self.lod_worker = None
+        self.lod_timer = QTimer(self)
+        self.lod_timer.setSingleShot(True)
+        self.lod_timer.setInterval(LOD_REFRESH_MS)
+        self.lod_timer.timeout.connect(self.refresh_lod)
+        self.dots_window = None     # dots_cache 对应的行范围
+        self.dots_timer = QTimer(self)
+        self.dots_timer.setSingleShot(True)
+        self.dots_timer.setInterval(DOTS_REFRESH_MS)
+        self.dots_timer.timeout.connect(self.refresh_dots)
+        self.stats_refresh = RefreshScheduler(self.update_stats_table, self.stats_key, parent=self)
+        self.trace_cache = TraceCache()
+        self.settings = QSettings("FB284Tools", "WaveformAnalyzer")
+        cleanup_stale_spill()
+        self._plot_busy = False
+        self._plot_pending = None   # 绘图期间被推迟的请求: (rebuild, refresh_data)
+        self.plot_config = None     # 已建好的图形对应的配置，用于增量比较
+        self._stats_frozen = False
+        self.hidden_traces = OrderedDict()   # 已隐藏但仍保留图元的通道，按隐藏先后排列
+        self.logic_cols = []        # 按位显示 (逻辑分析仪) 的通道，按开启先后排列
+        self.logic_lanes = {}       # 通道名 -> LogicLanes
+        self.logic_plot = None      # 主图下方的位通道区域
+        self.logic_panel_cols = []  # logic_plot 中已建立的通道
+        self.logic_items = []       # 各行的曲线与标签
+        self.logic_timer = QTimer(self)
+        self.logic_timer.setSingleShot(True)
+        self.logic_timer.setInterval(LOD_REFRESH_MS)
+        self.logic_timer.timeout.connect(self.refresh_logic)
+        self.lane_worker = None     # 后台建立位跳变索引的线程
+        self.lane_queue = []        # 等待建立索引的通道
+        self.event_dialog = None    # 事件导航窗口 (非模态)
+        self.event_marker = None    # 当前事件的竖线标记
+        self.trigger_worker = None  # 后台触发搜索线程
+        self.trigger_hits = None    # 触发搜索结果: (起始行, 结束行)，行号升序
+        self.trigger_spec = None    # trigger_hits 对应的触发条件
+        self.trigger_dialog = None  # 触发搜索窗口 (非模态)
+        self.trigger_markers = None # 主视图中可视区内各次触发的竖线
+        self.marker_timer = QTimer(self)
+        self.marker_timer.setSingleShot(True)
+        self.marker_timer.setInterval(MARKER_REFRESH_MS)
+        self.marker_timer.timeout.connect(self.refresh_trigger_markers)
 
         # === UI 构建 ===
         central = QWidget()
@@ -591,6 +3259,12 @@ class ProOscilloscope(QMainWindow):
         self.spin_rate.setFixedWidth(70)
         self.spin_rate.valueChanged.connect(self.recalc_time)
         top_layout.addWidget(self.spin_rate)
+
+        self.combo_time = QComboBox()
+        self.combo_time.setToolTip("时间轴来源：固定采样周期，或文件中的时间戳列 (单位 ms，须递增)")
+        self.combo_time.addItem("固定周期", None)
+        self.combo_time.currentIndexChanged.connect(self.on_time_column_changed)
+        top_layout.addWidget(self.combo_time)
         
         self.chk_separate = QCheckBox("分轴")
         self.chk_separate.setChecked(True) 
@@ -605,6 +3279,11 @@ class ProOscilloscope(QMainWindow):
         self.chk_measure.toggled.connect(self.toggle_measure)
         top_layout.addWidget(self.chk_measure)
 
+        self.chk_cursor_stats = QCheckBox("区间统计")
+        self.chk_cursor_stats.setToolTip("统计表改为 X1~X2 之间的点数、最小、最大、均值、RMS、标准差与积分，拖动光标实时更新")
+        self.chk_cursor_stats.toggled.connect(self.toggle_cursor_stats)
+        top_layout.addWidget(self.chk_cursor_stats)
+
         self.chk_dots = QCheckBox("数据点")
         self.chk_dots.setEnabled(False)
         self.chk_dots.toggled.connect(self.update_plot_wrapper)
@@ -613,11 +3292,35 @@ class ProOscilloscope(QMainWindow):
         self.chk_antialias = QCheckBox("抗锯齿")
         self.chk_antialias.toggled.connect(self.toggle_antialias)
         top_layout.addWidget(self.chk_antialias)
+
+        self.chk_out_of_core = QCheckBox("外存")
+        self.chk_out_of_core.setToolTip("通道数据保存为磁盘映射文件，用于超出内存的大文件 (下次导入生效)")
+        top_layout.addWidget(self.chk_out_of_core)
+
+        self.chk_follow = QCheckBox("跟随")
+        self.chk_follow.setToolTip("持续读取文件新追加的行并延长波形 (用于仍在记录中的文件)")
+        self.chk_follow.toggled.connect(self.toggle_follow)
+        top_layout.addWidget(self.chk_follow)
                 
-        self.btn_merge = QPushButton("🔗 合并数据")
+        self.btn_merge = QPushButton("🔗 派生通道")
         self.btn_merge.clicked.connect(self.open_merge_manager)
         self.btn_merge.setStyleSheet("background-color: #98C379; color: #282C34; font-weight: bold;")
         top_layout.addWidget(self.btn_merge)
+
+        self.btn_export = QPushButton("💾 导出")
+        self.btn_export.setToolTip("把当前可视区内正在显示的通道导出为 CSV (含时间列)")
+        self.btn_export.clicked.connect(self.export_view)
+        top_layout.addWidget(self.btn_export)
+
+        self.btn_events = QPushButton("🧭 事件")
+        self.btn_events.setToolTip("按位跳变查找事件 (如 ZSW1 有故障位上升沿)，逐个跳转或列出全部")
+        self.btn_events.clicked.connect(self.open_event_navigator)
+        top_layout.addWidget(self.btn_events)
+
+        self.btn_trigger = QPushButton("🎯 触发")
+        self.btn_trigger.setToolTip("按触发条件 (电平穿越、位跳变沿、窗口、脉宽) 搜索整段数据，标记并逐个查看")
+        self.btn_trigger.clicked.connect(self.open_trigger_dialog)
+        top_layout.addWidget(self.btn_trigger)
         
         top_layout.addStretch() 
 
@@ -632,17 +3335,31 @@ class ProOscilloscope(QMainWindow):
         self.btn_reset.clicked.connect(self.reset_views)
         top_layout.addWidget(self.btn_reset)
 
+        self.btn_clear_cache = QPushButton("🗑 清缓存")
+        self.btn_clear_cache.setToolTip("清除已导入文件的二进制缓存")
+        self.btn_clear_cache.clicked.connect(self.clear_cache)
+        top_layout.addWidget(self.btn_clear_cache)
+
         self.btn_load = QPushButton("📂 导入")
         self.btn_load.clicked.connect(self.load_file)
         self.btn_load.setStyleSheet("background-color: #98C379; color: #282C34; font-weight: bold;")
         top_layout.addWidget(self.btn_load)
 
+        self.btn_window = QPushButton("⏱ 区间导入")
+        self.btn_window.setToolTip("建立行索引后只加载指定的行号/时间区间 (索引保存在文件旁，重复使用无需重扫)")
+        self.btn_window.clicked.connect(self.load_window)
+        self.btn_window.setStyleSheet("background-color: #98C379; color: #282C34; font-weight: bold;")
+        top_layout.addWidget(self.btn_window)
+
         main_layout.addWidget(top_container)
 
         # 2. 绘图区
         self.plot_layout = pg.GraphicsLayoutWidget()
         self.plot_layout.ci.layout.setContentsMargins(0, 0, 0, 0)
         main_layout.addWidget(self.plot_layout)
+        self.readout = CrosshairReadout(self.plot_layout)
+        self.readout_idx = None     # 读数当前对应的行与通道，未变化时只移动浮层
+        self.readout_cache = None   # 按行排列的读数缓存块
         
         # 3. 底部图例栏
         self.legend_frame = QFrame()
@@ -658,7 +3375,9 @@ class ProOscilloscope(QMainWindow):
         main_layout.addWidget(self.legend_frame)
 
         # 4. 统计表格
-        self.stats_table = QTableWidget()
+        self.stats_table = QTableView()
+        self.stats_model = StatsTableModel(self.format_val, self)
+        self.stats_table.setModel(self.stats_model)
         self.setup_stats_table()
         main_layout.addWidget(self.stats_table)
         
@@ -682,69 +3401,163 @@ class ProOscilloscope(QMainWindow):
         super().resizeEvent(event)
 
     def closeEvent(self, event):
+        self.stop_follow()
         if self.loader and self.loader.isRunning(): self.loader.terminate(); self.loader.wait()
         if self.dot_worker and self.dot_worker.isRunning(): self.dot_worker.terminate(); self.dot_worker.wait()
+        self.drop_lod()
+        self.drop_lane_index()
+        self.drop_trigger_search()
+        if self.index_worker and self.index_worker.isRunning(): self.index_worker.terminate(); self.index_worker.wait()
+        self.release_store()
         event.accept()
 
+    def release_store(self):
+        """ 释放当前数据 (外存模式下同时删除临时文件) """
+        self.drop_lod()
+        store, self.store = self.store, None
+        self.time_base = None
+        self.drop_time_buffer()
+        self.dots_cache = None
+        if store is not None: store.close()
+
+    def drop_time_buffer(self):
+        if isinstance(self.time_buffer, SpillColumnBuffer): self.time_buffer.close()
+        self.time_buffer = None
+
+    def time_axis(self):
+        """
+        整列时间数组 (pyqtgraph 画整列曲线时需要 x 数组)：
+        1. 只在首次需要时按块生成，外存模式下写在磁盘上。
+        2. 数据增长 (渐进加载/跟随) 时只补上新增的行。
+        """
+        rows = len(self.store)
+        if self.time_buffer is not None and self.time_buffer.size > rows: self.drop_time_buffer()
+        if self.time_buffer is None:
+            store = self.store
+            if store.out_of_core:
+                self.time_buffer = SpillColumnBuffer(lambda: store.spill_path('time'), np.float64)
+            else:
+                self.time_buffer = ColumnBuffer(np.float64, rows)
+        for start in range(self.time_buffer.size, rows, STORE_CHUNK_ROWS):
+            self.time_buffer.append(self.time_base.take(start, min(start + STORE_CHUNK_ROWS, rows)))
+        return self.time_buffer.view()
+
+    def view_rows(self, x0=None, x1=None):
+        """ 时间区间 (默认为当前可视区) 对应的行范围 [start, end) """
+        if x0 is None: x0, x1 = self.main_vb.viewRange()[0]
+        return self.time_base.index_range(x0, x1, len(self.store))
+
     def open_merge_manager(self):
-        if self.df is None:
+        if self.store is None:
             QMessageBox.warning(self, "提示", "请先导入数据文件！")
             return
+        if self.is_loading():
+            QMessageBox.warning(self, "提示", "文件仍在加载中，请稍候再配置派生通道。")
+            return
         
-        dialog = MergeManagerDialog(self.df, self)
+        dialog = MergeManagerDialog(self.store, self)
         if dialog.exec_() == QDialog.Accepted:
             need_refresh = False
             for col in dialog.removed_cols:
-                if col in self.df.columns:
-                    self.df.drop(columns=[col], inplace=True)
-                    if col in self.col_formats: del self.col_formats[col]
+                # 依赖被删通道的派生通道一并删除
+                for name in self.store.drop(col):
+                    self.lod_pyramids.pop(name, None)
+                    self.range_stats.pop(name, None)
+                    self.col_formats.pop(name, None)
                     need_refresh = True
             
-            if dialog.pending_merges:
-                self.loading_overlay.start("正在计算合并数据...")
-                QApplication.processEvents()
+            # 只登记规则，数据在绘图、统计用到时按块计算
+            for spec in dialog.pending_specs:
                 try:
-                    for name, h_col, l_col in dialog.pending_merges:
-                        low_vals = self.df[l_col].fillna(0).astype(np.int64).values
-                        high_vals = self.df[h_col].fillna(0).astype(np.int64).values
-                        merged = (high_vals << 16) | (low_vals & 0xFFFF)
-                        mask = merged >= 0x80000000
-                        merged[mask] -= 0x100000000
-                        self.df[name] = merged.astype(np.float32)
-                        self.hidden_cols.add(h_col)
-                        self.hidden_cols.add(l_col)
+                    self.apply_derived(spec)
                     need_refresh = True
-                except Exception as e:
-                    self.loading_overlay.stop()
-                    QMessageBox.critical(self, "合并失败", f"数据转换错误：\n{str(e)}")
-                finally:
-                    self.loading_overlay.stop()
+                except ValueError as e:
+                    QMessageBox.critical(self, "派生通道无效", str(e))
             
             if need_refresh:
-                self.recalc_time() 
+                self.save_cache_meta()
+                time_col = self.combo_time.currentData()
+                self.reset_time_columns(self.store.base_columns)
+                time_lost = time_col is not None and time_col not in self.store
+                if time_lost:
+                    # 作为时间轴的列被删除，改回固定周期
+                    self.time_base = self.make_time_base()
+                    self.drop_time_buffer()
+                # 只增删变化的通道，新通道的数据点与金字塔在后台补算
+                self.update_plot(refresh_data=time_lost)
+                self.start_dot_worker()
+                if self.event_dialog is not None and self.event_dialog.isVisible(): self.event_dialog.refresh_channels()
+
+    def apply_derived(self, spec):
+        """ 登记派生通道 (不占用整列内存)，字合并后隐藏参与合并的源通道 """
+        self.store.add_derived(spec)
+        if spec['op'] == 'words': self.hidden_cols.update(spec['inputs'])
+
+    def save_cache_meta(self):
+        """ 把显示格式、派生通道规则写回缓存条目，下次打开同一文件时自动恢复 """
+        if not self.current_file or self.is_loading(): return
+        self.trace_cache.update_meta(self.current_file, col_formats=self.col_formats,
+                                     derived=self.store.derived_specs(), merges=[],
+                                     hidden_cols=sorted(self.hidden_cols), logic_cols=self.logic_cols)
+
+    def clear_cache(self):
+        size_mb = self.trace_cache.total_size() / (1024 * 1024)
+        ret = QMessageBox.question(self, "清除缓存", f"当前缓存占用 {size_mb:.1f} MB，确定全部清除？")
+        if ret != QMessageBox.Yes: return
+        self.trace_cache.clear()
+        self.status_label.setText(" 缓存已清除")
+
+    def export_view(self):
+        """ 导出可视区数据：按块写出，时间列由行号换算，不依赖整列时间数组 """
+        if self.store is None or self.main_vb is None or self.is_loading(): return
+        start, end = self.view_rows()
+        cols = [c for c in self.store.columns if c in self.trace_dict and self.trace_dict[c]['visible']]
+        if end <= start or not cols:
+            QMessageBox.warning(self, "提示", "可视区内没有可导出的数据")
+            return
+        base = os.path.splitext(self.current_file)[0] if self.current_file else "wave"
+        offset = self.time_base.offset
+        fname, _ = QFileDialog.getSaveFileName(self, "导出可视区数据", f"{base}_{offset + start}-{offset + end}.csv", "CSV Files (*.csv)")
+        if not fname: return
+        try:
+            with open(fname, 'w', encoding='utf-8-sig', newline='') as f:
+                f.write(",".join(["Time(ms)"] + cols) + "\n")
+                for s0 in range(start, end, STORE_CHUNK_ROWS):
+                    s1 = min(s0 + STORE_CHUNK_ROWS, end)
+                    frame = pd.DataFrame({c: self.store.slice(c, s0, s1) for c in cols})
+                    frame.insert(0, "Time(ms)", self.time_base.take(s0, s1))
+                    frame.to_csv(f, header=False, index=False)
+            self.status_label.setText(f" 已导出 {end - start} 行 × {len(cols)} 通道 → {os.path.basename(fname)}")
+        except Exception as e:
+            QMessageBox.critical(self, "导出失败", str(e))
 
     def format_val(self, col_name, val):
-        if np.isnan(val): return "NaN"
+        if is_nan(val): return "NaN"
         fmt = self.col_formats.get(col_name, 'dec') 
+        dtype = self.store.dtype(col_name) if self.store is not None and col_name in self.store else None
         if fmt == 'hex':
             try:
                 int_val = int(val)
-                return f"0x{int_val & 0xFFFFFFFF:X}"
+                # 整数通道按自身位宽取补码 (int16 的 -1 显示为 0xFFFF)
+                bits = dtype.itemsize * 8 if dtype is not None and dtype.kind in 'iu' else 32
+                return f"0x{int_val & ((1 << bits) - 1):X}"
             except: return "Err"
         else:
-            return f"{val:.0f}"
+            if isinstance(val, (int, np.integer)): return f"{int(val)}"
+            # 整数通道取整显示，浮点通道 (物理量等) 保留 6 位有效数字，避免 12.5 mm/s 显示成 12
+            if dtype is not None and dtype.kind in 'iub': return f"{val:.0f}"
+            return f"{val:.6g}"
 
     def set_col_format(self, col_name, fmt):
         self.col_formats[col_name] = fmt
-        self.update_stats_table()
+        self.readout_idx = None
+        self.save_cache_meta()
+        self.stats_refresh.request(force=True)
 
     def setup_stats_table(self):
-        cols = ["波形名称", "Ymin", "Ymax", "Y_Vpp", "Ymean", "Y1", "Y2", "ΔY"]
-        self.stats_table.setColumnCount(len(cols))
-        self.stats_table.setHorizontalHeaderLabels(cols)
         self.stats_table.verticalHeader().setVisible(False) 
-        self.stats_table.setEditTriggers(QTableWidget.NoEditTriggers)
-        self.stats_table.setSelectionMode(QTableWidget.NoSelection)
+        self.stats_table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.stats_table.setSelectionMode(QAbstractItemView.NoSelection)
         self.stats_table.setFixedHeight(120 if self.height() < 800 else 150)
         
         header = self.stats_table.horizontalHeader()
@@ -752,20 +3565,31 @@ class ProOscilloscope(QMainWindow):
         header.setSectionResizeMode(0, QHeaderView.ResizeToContents)
         
         self.stats_table.setStyleSheet("""
-            QTableWidget { background-color: #21252B; color: #DCDFE4; gridline-color: #3B4048; border-top: 1px solid #181A1F; font-family: Consolas; font-size: 12px; }
+            QTableView { background-color: #21252B; color: #DCDFE4; gridline-color: #3B4048; border-top: 1px solid #181A1F; font-family: Consolas; font-size: 12px; }
             QHeaderView::section { background-color: #282C34; color: #E5C07B; padding: 4px; border: 1px solid #181A1F; font-weight: bold; }
         """)
 
+    def stats_key(self):
+        """ 统计表的全部输入：数据、时间轴、可视行范围、显示的通道与 Y 光标 (分轴时还有各视图的 Y 范围) """
+        if self.store is None or self.main_vb is None or self._stats_frozen: return None
+        visible = tuple(c for c, t in self.trace_dict.items() if t['visible'])
+        cursors = None
+        if self.cursor_y1 is not None and self.cursor_y2 is not None:
+            cursors = (self.cursor_y1.value(), self.cursor_y2.value(),
+                       tuple(tuple(v.viewRange()[1]) for v in self.all_views))
+        interval = self.cursor_rows() if self.cursor_stats_active() else None
+        return (id(self.store), len(self.store), id(self.time_base), id(self.main_vb),
+                self.view_rows(), visible, cursors, interval)
+
     def update_stats_table(self):
-        if self.df is None or self.main_vb is None: return
+        if self.store is None or self.main_vb is None or self._stats_frozen: return
+        self.stats_table.setToolTip(self.stats_refresh.report())
+        if self.cursor_stats_active(): return self.update_cursor_stats()
         try:
             x_min_view, x_max_view = self.main_vb.viewRange()[0]
         except: return
 
-        idx_start = np.searchsorted(self.time_axis, x_min_view, side='left')
-        idx_end = np.searchsorted(self.time_axis, x_max_view, side='right')
-        idx_start = max(0, idx_start)
-        idx_end = min(len(self.df), idx_end)
+        idx_start, idx_end = self.view_rows(x_min_view, x_max_view)
         
         has_cursor_y = (self.cursor_y1 is not None and self.cursor_y2 is not None)
         y1_raw = 0
@@ -775,27 +3599,29 @@ class ProOscilloscope(QMainWindow):
             y1_raw = self.cursor_y1.value()
             y2_raw = self.cursor_y2.value()
 
-        visible_cols = [c for c in self.df.columns if self.trace_dict.get(c, {}).get('visible', False)]
-        self.stats_table.setRowCount(len(visible_cols))
+        all_cols = self.store.columns
+        visible_cols = [c for c in all_cols if self.trace_dict.get(c, {}).get('visible', False)]
+        values = np.zeros((len(visible_cols), len(StatsTableModel.VIEW_COLUMNS)), dtype=object)
         
         for row_idx, col_name in enumerate(visible_cols):
-            if idx_start < idx_end:
-                d = self.df[col_name].values[idx_start:idx_end]
-                if len(d) > 0:
-                    y_min, y_max, y_mean = np.nanmin(d), np.nanmax(d), np.nanmean(d)
-                    y_vpp = y_max - y_min
-                else:
-                    y_min = y_max = y_mean = y_vpp = 0
+            n, y_min, y_max, y_mean, _ = self.range_summary(col_name, idx_start, idx_end)
+            if n > 0:
+                if self.store.dtype(col_name).kind in 'iu':
+                    # 整数通道转成 Python int 再相减，避免 int8/uint16 标量溢出；
+                    # 均值取整并限制在 min~max 内 (64 位字的 float64 均值可能越界，如全 1 字得到 2^64)
+                    y_min, y_max = int(y_min), int(y_max)
+                    y_mean = min(max(int(round(y_mean)), y_min), y_max)
+                y_vpp = y_max - y_min
             else:
-                y_min = y_max = y_mean = y_vpp = 0
+                # 区间内全为空值时显示 NaN，区间为空时显示 0
+                y_min = y_max = y_mean = y_vpp = np.nan if idx_start < idx_end else 0
 
             val_at_y1 = 0
             val_at_y2 = 0
             diff_y = 0
             
             if has_cursor_y:
-                curve_item = self.trace_dict[col_name]['curve']
-                target_vb = curve_item.getViewBox()
+                target_vb = self.trace_dict[col_name]['view']
                 
                 if target_vb == self.main_vb:
                     val_at_y1 = y1_raw
@@ -810,32 +3636,52 @@ class ProOscilloscope(QMainWindow):
                 
                 diff_y = val_at_y2 - val_at_y1
 
-            c_idx = list(self.df.columns).index(col_name)
-            color = QColor(WAVE_COLORS[c_idx % len(WAVE_COLORS)])
-            
-            item_nm = QTableWidgetItem(f"■ {col_name}")
-            item_nm.setForeground(QBrush(color))
-            item_nm.setFont(QFont("Microsoft YaHei", 9, QFont.Bold))
-            self.stats_table.setItem(row_idx, 0, item_nm)
-            
-            for c, val in enumerate([y_min, y_max, y_vpp, y_mean], 1):
-                it = QTableWidgetItem(self.format_val(col_name, val))
-                it.setTextAlignment(Qt.AlignCenter) 
-                self.stats_table.setItem(row_idx, c, it)
-                
-            if has_cursor_y:
-                vals = [val_at_y1, val_at_y2, diff_y]
-                for i, val in enumerate(vals):
-                    it = QTableWidgetItem(self.format_val(col_name, val))
-                    it.setTextAlignment(Qt.AlignCenter) 
-                    self.stats_table.setItem(row_idx, 5 + i, it)
-            else:
-                for c in range(5, 8):
-                    it = QTableWidgetItem("--")
-                    it.setTextAlignment(Qt.AlignCenter) 
-                    self.stats_table.setItem(row_idx, c, it)
+            values[row_idx] = (y_min, y_max, y_vpp, y_mean, val_at_y1, val_at_y2, diff_y)
+
+        self.stats_model.update(visible_cols, [self.channel_color(c) for c in visible_cols],
+                                [self.col_formats.get(c, 'dec') for c in visible_cols], values, has_cursor_y,
+                                StatsTableModel.VIEW_COLUMNS)
 
-    def add_legend_item(self, name, color, index, checked=True):
+    # === 光标区间统计 ===
+    def toggle_cursor_stats(self, enabled):
+        if enabled and not self.chk_measure.isChecked(): self.chk_measure.setChecked(True)
+        self.stats_refresh.request(force=True)
+
+    def cursor_stats_active(self):
+        return self.chk_cursor_stats.isChecked() and self.cursor_x1 is not None and self.cursor_x2 is not None
+
+    def cursor_rows(self):
+        """ X1~X2 之间 (含恰好落在光标上的采样点) 的行范围 """
+        v1, v2 = sorted((self.cursor_x1.value(), self.cursor_x2.value()))
+        return self.view_rows(v1, v2)
+
+    def update_cursor_stats(self):
+        """
+        X1~X2 区间统计，基于区间统计索引，区间多宽都是常数时间：
+        1. 点数、最小、最大直接来自索引；均值、RMS、标准差 (总体) 由均值与离差平方和 M2 算出，空值不计。
+        2. 积分按矩形法 Σy·周期；时间戳列为时间轴时按 均值 × 区间时长 近似。
+        """
+        start, end = self.cursor_rows()
+        cols = [c for c in self.store.columns if self.trace_dict.get(c, {}).get('visible', False)]
+        values = np.full((len(cols), len(StatsTableModel.CURSOR_COLUMNS)), np.nan, dtype=object)
+        for row_idx, col_name in enumerate(cols):
+            n, lo, hi, mean, m2 = self.range_summary(col_name, start, end)
+            values[row_idx, 0] = n
+            if n == 0: continue
+            if self.store.dtype(col_name).kind in 'iu': lo, hi = int(lo), int(hi)
+            var = m2 / n
+            rms = np.sqrt(mean * mean + var)
+            values[row_idx, 1:] = (lo, hi, mean, rms, np.sqrt(var), self.interval_integral(mean * n, mean, start, end))
+        self.stats_model.update(cols, [self.channel_color(c) for c in cols],
+                                [self.col_formats.get(c, 'dec') for c in cols], values, True,
+                                StatsTableModel.CURSOR_COLUMNS)
+
+    def interval_integral(self, total, mean, start, end):
+        tb = self.time_base
+        if isinstance(tb, IndexedTimeBase): return mean * (tb.time_at(end - 1) - tb.time_at(start))
+        return total * tb.period
+
+    def add_legend_item(self, name, color, checked=True):
         container = QWidget()
         layout = QHBoxLayout(container)
         layout.setContentsMargins(0, 0, 0, 0)
@@ -865,9 +3711,22 @@ class ProOscilloscope(QMainWindow):
         btn_fmt.clicked.connect(lambda _, col=name, b=btn_fmt: self.toggle_col_format_btn(col, b))
         layout.addWidget(btn_fmt)
 
-        row = index // 4
-        col = index % 4
-        self.legend_layout.addWidget(container, row, col)
+        btn_bits = QPushButton("BIT")
+        btn_bits.setFixedSize(36, 22)
+        btn_bits.setCheckable(True)
+        btn_bits.setChecked(name in self.logic_cols)
+        btn_bits.setToolTip("按位显示 (逻辑分析仪)")
+        btn_bits.setStyleSheet("""
+            QPushButton { 
+                background-color: #3B4048; color: #ABB2BF; border: 1px solid #5C6370; 
+                border-radius: 3px; font-size: 11px; font-weight: bold; 
+            }
+            QPushButton:checked { background-color: #C678DD; color: #282C34; border: 1px solid #C678DD; }
+            QPushButton:hover { background-color: #61AFEF; color: white; }
+        """)
+        btn_bits.clicked.connect(lambda _, col=name, b=btn_bits: self.toggle_logic(col, b))
+        layout.addWidget(btn_bits)
+        return container
 
     def toggle_col_format_btn(self, col_name, btn_obj):
         old_fmt = self.col_formats.get(col_name, 'dec')
@@ -881,9 +3740,21 @@ class ProOscilloscope(QMainWindow):
 
     def on_wave_toggle(self, state, col):
         is_visible = (state == Qt.Checked)
+        if is_visible: self.hidden_cols.discard(col)
+        else: self.hidden_cols.add(col)
         objs = self.trace_dict.get(col)
         if objs:
             objs['visible'] = is_visible
+            if is_visible:
+                # 首次显示 (或图元已被释放) 的通道此时才创建曲线
+                self.hidden_traces.pop(col, None)
+                self.materialize_trace(col)
+                self.schedule_lod_refresh()
+                self.schedule_dots_refresh()
+            else:
+                self.hidden_traces[col] = True
+                while len(self.hidden_traces) > HIDDEN_TRACE_KEEP:
+                    self.release_trace_items(self.hidden_traces.popitem(last=False)[0])
             for key in ['curve', 'scatter', 'axis']:
                 item = objs.get(key)
                 if item is not None:
@@ -891,7 +3762,7 @@ class ProOscilloscope(QMainWindow):
                         item.setVisible(is_visible)
                     except RuntimeError:
                         pass
-        self.update_stats_table()
+        self.stats_refresh.request()
 
     def apply_stylesheet(self):
         self.setStyleSheet("""
@@ -915,6 +3786,43 @@ class ProOscilloscope(QMainWindow):
         pg.setConfigOptions(antialias=enabled)
         self.update_plot_wrapper() 
 
+    # === 时间轴来源 ===
+    def reset_time_columns(self, columns):
+        """ 重新填充时间列选项，原来选中的列仍存在时保持选中 """
+        current = self.combo_time.currentData()
+        self.combo_time.blockSignals(True)
+        self.combo_time.clear()
+        self.combo_time.addItem("固定周期", None)
+        for col in columns: self.combo_time.addItem(f"⏲ {col}", col)
+        idx = self.combo_time.findData(current) if current in columns else 0
+        self.combo_time.setCurrentIndex(max(0, idx))
+        self.combo_time.blockSignals(False)
+        self.spin_rate.setEnabled(self.combo_time.currentData() is None)
+
+    def on_time_column_changed(self, idx):
+        self.spin_rate.setEnabled(self.combo_time.currentData() is None)
+        if self.store is not None and not self.is_loading(): self.recalc_time()
+
+    def make_time_base(self):
+        """ 按界面选择生成时间轴：固定周期的 TimeBase，或按时间戳列二分查找的 IndexedTimeBase """
+        name = self.combo_time.currentData()
+        if name is not None and name in self.store:
+            try:
+                return IndexedTimeBase(self.store, name, self.row_offset)
+            except ValueError as e:
+                QMessageBox.warning(self, "时间列无效", f"{e}\n已改回固定采样周期。")
+                self.reset_time_columns([])
+                self.reset_time_columns(self.store.base_columns)
+        return TimeBase(self.row_offset, self.spin_rate.value())
+
+    def time_base_info(self):
+        """ 状态栏中的时间轴说明，时间戳列有缺口时一并提示 """
+        tb = self.time_base
+        if not isinstance(tb, IndexedTimeBase): return ""
+        info = f" | 时间列 {tb.name} (典型周期 {tb.period:g} ms)"
+        if tb.gaps: info += f" | ⚠ {len(tb.gaps)} 处缺口"
+        return info
+
     def toggle_measure(self, enabled):
         if enabled: self.setup_cursors()
         else: self.remove_cursors()
@@ -951,19 +3859,19 @@ class ProOscilloscope(QMainWindow):
         self.cursor_y2.sigPositionChanged.connect(self.update_cursors_label)
         
         self.update_cursors_label()
-        self.update_stats_table()
+        self.stats_refresh.request()
 
     def update_cursors_label(self):
         if self.cursor_x1 and self.cursor_x2:
             v1 = self.cursor_x1.value()
             v2 = self.cursor_x2.value()
             diff = v2 - v1
+            # 两光标之间的实际采样点数 (时间戳列不均匀时与 ΔX / 周期 不同)
+            start, end = self.view_rows(min(v1, v2), max(v1, v2)) if self.store is not None else (0, 0)
             self.cursor_x1.label.setFormat(f"X1: {v1:.1f}")
-            self.cursor_x2.label.setFormat(f"X2: {v2:.1f}\nΔX: {diff:.1f}")
-            self.update_stats_table() 
-            
-        if self.cursor_y1 and self.cursor_y2:
-            self.update_stats_table()
+            self.cursor_x2.label.setFormat(f"X2: {v2:.1f}\nΔX: {diff:.1f}  N: {end - start}")
+        # 是否需要重算由刷新调度按输入判断 (仅移动 X 光标且未开区间统计时跳过)
+        self.stats_refresh.request()
 
     def remove_cursors(self):
         if self.main_vb:
@@ -973,7 +3881,7 @@ class ProOscilloscope(QMainWindow):
             if self.cursor_y2: self.main_vb.removeItem(self.cursor_y2)
             self.cursor_x1 = None; self.cursor_x2 = None
             self.cursor_y1 = None; self.cursor_y2 = None
-        self.update_stats_table()
+        self.stats_refresh.request()
 
     def on_view_dragged(self, pos, last_pos):
         if not self.main_vb: return
@@ -984,6 +3892,8 @@ class ProOscilloscope(QMainWindow):
             v.translateBy(y=-(v.mapToView(pos) - v.mapToView(last_pos)).y())
 
     def reset_views(self):
+        # LOD 曲线只含可视区附近的数据，复位前先换回全局概览，autoRange 才能覆盖整个文件
+        self.refresh_lod(full=True)
         if self.main_vb: self.main_vb.autoRange()
         for v in self.overlay_views: v.autoRange()
         self.status_label.setText(" 视图已复位")
@@ -999,67 +3909,713 @@ class ProOscilloscope(QMainWindow):
             menu.addAction(a)
         menu.exec_(QCursor.pos())
 
+    def pick_channels(self, fname, fmt):
+        """
+        导入前通道选择：只读表头，列数较多时弹出选择框。
+        选择按表头布局记忆，同样布局的文件下次自动预选。
+        返回列名列表 (None 为全部列, False 为取消导入)。
+        """
+        header = read_header_columns(fname, fmt)
+        if not header or len(header) < CHANNEL_PICKER_MIN_COLS: return None
+        key = f"channel_selection/{layout_key(header)}"
+        try:
+            saved = json.loads(self.settings.value(key, "") or "null")
+        except ValueError:
+            saved = None
+        dialog = ChannelPickerDialog(header, saved if saved else header, self)
+        if dialog.exec_() != QDialog.Accepted: return False
+        cols = dialog.selected_columns()
+        self.settings.setValue(key, json.dumps(cols, ensure_ascii=False))
+        return cols if len(cols) < len(header) else None
+
     def load_file(self):
         fname, _ = QFileDialog.getOpenFileName(self, "选择文件", "", "Data (*.csv *.txt)")
         if not fname: return
+        fmt = sniff_text_format(fname)
+        usecols = self.pick_channels(fname, fmt)
+        if usecols is False: return
+        self.start_loader(fname, fmt, usecols)
+
+    def load_window(self):
+        """ 区间导入：首次对文件建立行偏移索引，之后只解析选定区间的行 """
+        fname, _ = QFileDialog.getOpenFileName(self, "选择文件", "", "Data (*.csv *.txt)")
+        if not fname: return
+        fmt = sniff_text_format(fname)
+        if fmt['kind'] != 'text' or fmt['encoding'].startswith('utf-16'):
+            QMessageBox.warning(self, "提示", "区间导入仅支持 UTF-8 / GBK 文本文件！")
+            return
+        index = LineIndex.load(fname)
+        if index is not None:
+            self.on_line_index_ready(fname, fmt, index)
+            return
+        self.loading_overlay.start("正在建立行索引...")
+        self.set_load_buttons_enabled(False)
+        self.index_worker = LineIndexThread(fname)
+        self.index_worker.info_signal.connect(self.loading_overlay.start)
+        self.index_worker.finished_signal.connect(lambda index: self.on_line_index_ready(fname, fmt, index))
+        self.index_worker.error_signal.connect(self.on_line_index_error)
+        self.index_worker.start()
+
+    def on_line_index_ready(self, fname, fmt, index):
+        self.loading_overlay.stop()
+        self.set_load_buttons_enabled(True)
+        if index.rows == 0:
+            QMessageBox.warning(self, "提示", "文件中没有数据行！")
+            return
+        dialog = WindowLoadDialog(index.rows, self.spin_rate.value(), self)
+        if dialog.exec_() != QDialog.Accepted: return
+        row_range = dialog.row_range()
+        usecols = self.pick_channels(fname, fmt)
+        if usecols is False: return
+        self.start_loader(fname, fmt, usecols, row_range=row_range, line_index=index)
+
+    def on_line_index_error(self, msg):
+        """ 建立行索引失败：当前显示的数据不受影响，只提示并恢复导入按钮 """
+        self.loading_overlay.stop()
+        self.set_load_buttons_enabled(True)
+        QMessageBox.critical(self, "区间导入失败", msg)
+
+    def set_load_buttons_enabled(self, enabled):
+        self.btn_load.setEnabled(enabled)
+        self.btn_window.setEnabled(enabled)
+
+    def start_loader(self, fname, fmt, usecols, row_range=None, line_index=None):
+        self.stop_follow()
+        self.uncheck_follow()
         self.loading_overlay.start("正在读取文件...")
-        self.btn_load.setEnabled(False)
+        self.set_load_buttons_enabled(False)
         self.chk_dots.setEnabled(False)
         self.status_label.setText(f" 读取: {os.path.basename(fname)}")
         self.cleanup_plot() 
         self.dots_cache = None
         self.col_formats = {} 
         self.hidden_cols = set() 
-        self.loader = FileLoaderThread(fname)
+        self.logic_cols = []
+        self.logic_lanes = {}
+        self.drop_lane_index()
+        self.drop_trigger_search()
+        self.load_info = ""
+        self.current_file = fname
+        self.row_range = row_range
+        self.row_offset = row_range[0] if row_range else 0
+        self.reset_time_columns([])
+        self.release_store()
+        out_of_core = self.chk_out_of_core.isChecked() or os.path.getsize(fname) > OUT_OF_CORE_AUTO_BYTES
+        self.loader = FileLoaderThread(fname, cache=self.trace_cache, out_of_core=out_of_core, fmt=fmt, usecols=usecols,
+                                       row_range=row_range, line_index=line_index)
         self.loader.finished_signal.connect(self.on_loaded)
+        self.loader.partial_signal.connect(self.on_partial_loaded)
         self.loader.error_signal.connect(self.on_error)
-        self.loader.info_signal.connect(lambda msg: self.loading_overlay.start(msg))
+        self.loader.info_signal.connect(self.on_loader_info)
+        self.loader.format_signal.connect(self.on_loader_format)
         self.loader.start()
 
-    def on_loaded(self, df):
-        self.df = df
+    def is_loading(self):
+        # 数据交付后加载线程可能还在写缓存，此时已不算"加载中"
+        return self.loader is not None and self.loader.isRunning() and not self.loader.data_ready
+
+    def on_loader_info(self, msg):
+        # 渐进显示开始后遮罩已撤下，进度改到状态栏显示
+        if self.store is None: self.loading_overlay.start(msg)
+        else: self.status_label.setText(f" {msg}")
+
+    def on_worker_error(self, msg):
+        """ 后台线程 (LOD、位跳变索引、数据点等) 失败不影响已显示的数据，只在状态栏提示 """
+        self.status_label.setText(f" {msg}")
+
+    def on_loader_format(self, desc):
+        self.load_info = desc
+        self.status_label.setText(f" {self.load_info}")
+
+    def on_partial_loaded(self, block):
+        """ 渐进显示：首块到达即绘图，后续块只更新曲线数据，不重建视图。 """
+        if not self.is_loading(): return
+        cols = block['columns']
+        if not cols: return
+        # 外存模式下预览存储与加载线程共用临时目录，按需生成的时间数组等也写在磁盘上
+        self.store = ChannelStore(cols, spill_dir=block.get('spill_dir'))
+        self.time_base = TimeBase(self.row_offset, self.spin_rate.value())
+        if self.trace_dict and list(self.trace_dict.keys()) == list(cols.keys()):
+            for col in cols: self.set_trace_data(col)
+            self.stats_refresh.request()
+        else:
+            self.update_plot(refresh_data=True)
+            self.loading_overlay.stop()
+        self.status_label.setText(f" 已读取 {block['rows']} 行 ({int(block['progress'] * 100)}%)，继续加载中...")
+
+    def on_loaded(self, store):
+        self.store = store
+        self.reset_time_columns(store.base_columns)
+        meta = self.loader.cache_meta if self.loader else None
+        if meta:
+            # 恢复上次的显示格式与派生通道 (旧版本记录的 merges 按有符号 32 位字合并处理)
+            self.col_formats = dict(meta.get('col_formats', {}))
+            self.hidden_cols = set(meta.get('hidden_cols', []))
+            self.logic_cols = list(meta.get('logic_cols', []))
+            specs = list(meta.get('derived', []))
+            specs += [derived_spec(n, 'words', [h, l], bits=32, signed=True) for n, h, l in meta.get('merges', [])]
+            for spec in specs:
+                try: self.apply_derived(spec)
+                except (ValueError, KeyError): pass   # 输入通道本次未加载
         self.loading_overlay.start("正在渲染图形...")
-        QTimer.singleShot(50, self.recalc_time)
+        # 从缓存恢复了隐藏列等设置时整体重建，否则沿用渐进预览已建好的图形
+        QTimer.singleShot(50, lambda: self.recalc_time(rebuild=bool(meta)))
 
     def on_error(self, msg):
+        if self._plot_busy:
+            # 渐进预览仍在绘制，等本轮结束再清理
+            QTimer.singleShot(50, lambda: self.on_error(msg))
+            return
         self.loading_overlay.stop()
-        self.btn_load.setEnabled(True)
+        self.set_load_buttons_enabled(True)
+        if self.store is not None:
+            # 丢弃渐进显示的半成品
+            self.cleanup_plot(); self.store = None
         QMessageBox.critical(self, "错误", msg)
 
-    def recalc_time(self):
-        if self.df is None: return
+    def recalc_time(self, *args, rebuild=False):
+        if self.store is None: return
         try:
-            rate = self.spin_rate.value()
-            self.time_axis = np.arange(len(self.df), dtype=np.float32) * rate
-            self.update_plot()
-            self.btn_load.setEnabled(True)
-            self.chk_dots.setEnabled(False)
-            if self.dot_worker and self.dot_worker.isRunning(): self.dot_worker.terminate(); self.dot_worker.wait()
-            self.dot_worker = DotPreparerThread(self.df, self.time_axis)
-            self.dot_worker.finished_signal.connect(self.on_dots_prepared)
-            self.dot_worker.start()
-            self.loading_overlay.start("正在后台优化数据点...")
+            # 只换算系数，不再生成时间数组，任意文件大小都是即时的
+            self.time_base = self.make_time_base()
+            self.drop_time_buffer()
+            self.update_plot(rebuild=rebuild, refresh_data=True)
+            if self.is_loading(): return
+            self.set_load_buttons_enabled(True)
+            if self.follow: return
+            self.start_dot_worker()
         except Exception as e:
             self.loading_overlay.stop()
             QMessageBox.critical(self, "计算错误", str(e))
 
-    def on_dots_prepared(self, dots_data):
-        self.dots_cache = dots_data
+    def start_dot_worker(self):
+        """ 数据就绪：后台建立 LOD 金字塔，数据点按当前视图重新计算 """
+        self.dots_cache = {}
+        self.dots_window = None
         self.chk_dots.setEnabled(True)
-        self.status_label.setText(f" 就绪 | {len(self.df)} 行")
+        self.show_ready_status()
         self.loading_overlay.stop()
+        self.start_lod_worker()
+        self.schedule_dots_refresh()
 
-    def cleanup_plot(self):
+    def schedule_dots_refresh(self, *args):
+        if self.dots_cache is not None and self.chk_dots.isChecked(): self.dots_timer.start()
+
+    def dots_range(self):
+        """ 可视区对应的行范围；采样点比 DOTS_MAX_DENSITY 更密时返回空范围 (不画点) """
+        start, end = self.view_rows()
+        if end - start > max(1.0, self.main_vb.width()) * DOTS_MAX_DENSITY: return 0, 0
+        return start, end
+
+    def refresh_dots(self):
+        """
+        按当前视图重新取数据点：
+        1. 可视区足够稀疏时显示每一个真实采样点，过密时整体隐藏。
+        2. 取数在后台线程进行，上一轮未结束时等它结束后再补算一次。
+        """
+        if self.store is None or self.main_vb is None or self.dots_cache is None or self.follow: return
+        if not (self.plot_config and self.plot_config['dots']): return
+        if self.dot_worker and self.dot_worker.isRunning():
+            self.dots_timer.start()
+            return
+        window = self.dots_range()
+        names = [c for c, t in self.trace_dict.items() if t['visible'] and t['curve'] is not None]
+        if window == self.dots_window and (window[0] == window[1] or all(c in self.dots_cache for c in names)): return
+        if window[0] == window[1]:
+            self.set_dots({}, window)
+            return
+        self.dot_worker = DotPreparerThread(self.store, self.time_base, window[0], window[1], names)
+        self.dot_worker.finished_signal.connect(self.on_dots_prepared)
+        self.dot_worker.error_signal.connect(self.on_worker_error)
+        self.dot_worker.start()
+
+    # === LOD: 按可视范围从金字塔取曲线数据 ===
+    def start_lod_worker(self):
+        names = [c for c in self.store.columns if c not in self.lod_pyramids or c not in self.range_stats]
+        if not names: return
+        self.stop_lod_worker()
+        self.lod_worker = PyramidBuilderThread(self.store, names)
+        self.lod_worker.pyramid_signal.connect(self.on_pyramid_ready)
+        self.lod_worker.stats_signal.connect(self.on_range_stats_ready)
+        self.lod_worker.error_signal.connect(self.on_worker_error)
+        self.lod_worker.start()
+
+    def drop_lod(self):
+        """ 丢弃金字塔 (数据将被替换或开始增长时)，曲线回到整列数据 """
+        self.stop_lod_worker()
+        self.lod_worker = None
+        self.lod_pyramids = {}
+        self.range_stats = {}
+        for trace in self.trace_dict.values(): trace.pop('lod_window', None)
+
+    def stop_lod_worker(self):
+        """ 请求中止并等待线程结束 (构建在块之间检查中止请求) """
+        if self.lod_worker and self.lod_worker.isRunning():
+            self.lod_worker.requestInterruption(); self.lod_worker.wait()
+
+    def on_pyramid_ready(self, name, pyramid):
+        if self.sender() is not self.lod_worker or self.store is None or name not in self.store: return
+        self.lod_pyramids[name] = pyramid
+        self.refresh_lod(cols=[name])
+
+    def on_range_stats_ready(self, name, stats):
+        if self.sender() is not self.lod_worker or self.store is None or name not in self.store: return
+        self.range_stats[name] = stats
+
+    def range_summary(self, col, start, end):
+        """ 区间统计：有索引时为常数时间，否则 (加载/跟随中) 直接扫描可视数据 """
+        stats = self.range_stats.get(col)
+        if stats is not None and stats.rows == len(self.store):
+            return stats.query(self.store.values(col), start, end)
+        return summarize(self.store.slice(col, start, end))
+
+    def schedule_lod_refresh(self, *args):
+        if self.lod_pyramids: self.lod_timer.start()
+
+    def lod_window(self, full=False):
+        """ 当前取数的行范围与桶数：可视区两侧各加 LOD_VIEW_MARGIN，桶数约为每像素一个 """
+        width = max(200, int(self.main_vb.width()))
+        if full: return 0, len(self.store), width
+        x0, x1 = self.main_vb.viewRange()[0]
+        margin = (x1 - x0) * LOD_VIEW_MARGIN
+        start, end = self.view_rows(x0 - margin, x1 + margin)
+        return start, end, int(width * (1 + 2 * LOD_VIEW_MARGIN))
+
+    def lod_curve_data(self, col, window):
+        pyramid = self.lod_pyramids.get(col)
+        if pyramid is None or pyramid.rows != len(self.store): return None
+        start, end, buckets = window
+        return pyramid.query(self.time_base, self.store.values(col), start, end, buckets)
+
+    def refresh_lod(self, full=False, cols=None):
+        """ 可见通道按当前视图重新取 LOD 数据；范围与级别不变的曲线跳过 """
+        if self.store is None or self.main_vb is None or self.time_base is None or not self.lod_pyramids: return
+        if self._plot_busy or self.follow: return
+        window = self.lod_window(full)
+        for col in (cols or list(self.trace_dict)):
+            trace = self.trace_dict.get(col)
+            if trace is None or not trace['visible'] or trace.get('lod_window') == window: continue
+            if col in self.lod_pyramids: self.set_trace_data(col, window)
+
+    # === 逻辑分析仪 (位通道) ===
+    def toggle_logic(self, col, btn):
+        if col in self.logic_cols: self.logic_cols.remove(col)
+        else: self.logic_cols.append(col)
+        btn.setChecked(col in self.logic_cols)
+        self.save_cache_meta()
+        self.build_logic_panel()
+
+    def ready_lanes(self, col):
+        """ 已建好的位通道索引 (跟随模式下补扫新增行)；尚未建立或通道已被替换时返回 None """
+        lanes = self.logic_lanes.get(col)
+        if lanes is None or lanes.store is not self.store or col not in self.store: return None
+        if lanes.version != self.store.version(col): return None
+        lanes.extend()
+        return lanes
+
+    def get_logic_lanes(self, col):
+        """ 通道的位通道数据：首次使用或通道被替换时整列扫描一次，之后只扫描新增行 """
+        lanes = self.ready_lanes(col)
+        if lanes is not None: return lanes
+        big = len(self.store) > STORE_CHUNK_ROWS
+        if big:
+            self.loading_overlay.start("正在解析位通道...")
+            QApplication.processEvents()
+        try:
+            lanes = LogicLanes.for_channel(self.store, col)
+        finally:
+            if big: self.loading_overlay.stop()
+        self.logic_lanes[col] = lanes
+        return lanes
+
+    def build_logic_panel(self):
+        """ 在主图下方建立位通道区域：每个按位显示的通道一组 (标题行 + 各位)，X 轴与主视图联动 """
+        if self.logic_plot is not None:
+            self.plot_layout.removeItem(self.logic_plot)
+        self.logic_plot = None
+        self.logic_items = []
+        cols = [c for c in self.logic_cols if self.store is not None and c in self.store]
+        self.logic_panel_cols = cols
+        if not cols or self.main_vb is None: return
+
+        vb = pg.ViewBox(enableMenu=False)
+        vb.setMouseEnabled(x=True, y=False)
+        plot = self.plot_layout.addPlot(row=1, col=0, colspan=max(1, self.plot_layout.ci.layout.columnCount()), viewBox=vb)
+        plot.hideAxis('bottom'); plot.hideButtons(); plot.setMenuEnabled(False)
+        plot.getAxis('left').setStyle(showValues=False)
+        plot.getAxis('left').setTicks([[]])
+        plot.showGrid(x=True, y=False, alpha=0.3)
+        label_fill = pg.mkBrush(33, 37, 43, 200)
+        row = 0
+        for col in cols:
+            lanes = self.get_logic_lanes(col)
+            color = self.channel_color(col)
+            header = pg.TextItem(f"■ {col}", color=color, anchor=(0, 0.5), fill=label_fill)
+            vb.addItem(header, ignoreBounds=True)
+            self.logic_items.append({'col': col, 'lane': None, 'curve': None, 'label': header, 'base': -row})
+            row += 1
+            for i in lanes.shown_lanes():
+                title, _, width, _ = lanes.lanes[i]
+                curve = pg.PlotCurveItem(pen=pg.mkPen(color, width=1))
+                vb.addItem(curve)
+                label = pg.TextItem(title, color='#ABB2BF', anchor=(0, 0.5), fill=label_fill)
+                vb.addItem(label, ignoreBounds=True)
+                self.logic_items.append({'col': col, 'lane': i, 'curve': curve, 'label': label,
+                                         'base': -row, 'scale': LOGIC_BAR / ((1 << width) - 1)})
+                row += 1
+        vb.setYRange(-(row - 1) - 0.2, LOGIC_BAR + 0.2, padding=0)
+        # 空间充足时每行 LOGIC_LANE_PX，窗口较矮时与主图按 3:2 分配高度
+        plot.setMinimumHeight(min(60, row * LOGIC_LANE_PX))
+        plot.setMaximumHeight(min(LOGIC_MAX_HEIGHT, row * LOGIC_LANE_PX + 10))
+        grid = self.plot_layout.ci.layout
+        grid.setRowStretchFactor(0, 3)
+        grid.setRowStretchFactor(1, 2)
+        vb.setXLink(self.main_vb)
+        vb.sigResized.connect(self.update_logic_geometry)
+        vb.sigResized.connect(self.schedule_logic_refresh)
+        self.logic_plot = plot
+        self.update_logic_geometry()
+        self.refresh_logic()
+
+    def update_logic_geometry(self):
+        """ 调整位通道区域左侧留白，使其绘图区与主视图左右对齐 (分轴时左侧有多根坐标轴) """
+        if self.logic_plot is None or self.main_vb is None: return
+        axis = self.logic_plot.getAxis('left')
+        offset = self.main_vb.sceneBoundingRect().left() - self.logic_plot.vb.sceneBoundingRect().left()
+        if abs(offset) > 0.5: axis.setWidth(max(0, axis.width() + offset))
+
+    def schedule_logic_refresh(self, *args):
+        if self.logic_items: self.logic_timer.start()
+
+    def refresh_logic(self):
+        """ 按可视区重取各位通道的跳变 (两侧各留 LOD_VIEW_MARGIN)，标签贴在可视区左缘 """
+        if not self.logic_items or self.main_vb is None or self.store is None: return
+        x0, x1 = self.main_vb.viewRange()[0]
+        margin = (x1 - x0) * LOD_VIEW_MARGIN
+        start, end = self.view_rows(x0 - margin, x1 + margin)
+        buckets = max(200, int(self.main_vb.width() * (1 + 2 * LOD_VIEW_MARGIN)))
+        lanes_by_col = {col: self.get_logic_lanes(col) for col in self.logic_panel_cols}
+        # 窗口较矮、行高不足一行文字时只保留通道标题
+        roomy = self.logic_plot.vb.height() / len(self.logic_items) >= 12
+        for item in self.logic_items:
+            item['label'].setPos(x0, item['base'] + LOGIC_BAR / 2)
+            item['label'].setVisible(roomy or item['curve'] is None)
+            if item['curve'] is None: continue
+            s, v = lanes_by_col[item['col']].steps(item['lane'], start, end, buckets)
+            if end <= start or len(s) == 0:
+                item['curve'].clear()
+                continue
+            x = self.time_base.time_at(np.append(s, end - 1))
+            item['curve'].setData(x=x, y=item['base'] + item['scale'] * v, stepMode='center')
+
+    # === 事件导航 (位跳变索引) ===
+    def open_event_navigator(self):
+        if self.store is None:
+            QMessageBox.warning(self, "提示", "请先导入数据文件！")
+            return
+        if self.is_loading():
+            QMessageBox.warning(self, "提示", "文件仍在加载中，请稍候再查找事件。")
+            return
+        if self.event_dialog is None:
+            self.event_dialog = EventNavigatorDialog(self)
+        self.event_dialog.refresh_channels()
+        self.event_dialog.show()
+        self.event_dialog.raise_()
+        self.event_dialog.activateWindow()
+
+    def start_lane_index(self, names):
+        """ 在后台为通道建立位跳变索引，已有线程在运行时排队 """
+        running = self.lane_worker is not None and self.lane_worker.isRunning()
+        busy = set(self.lane_queue) | set(self.lane_worker.names if running else [])
+        self.lane_queue += [c for c in names if c not in busy and self.ready_lanes(c) is None]
+        if not running: self.run_lane_queue()
+
+    def run_lane_queue(self):
+        if not self.lane_queue or self.store is None: return
+        names, self.lane_queue = self.lane_queue, []
+        self.lane_worker = LaneIndexThread(self.store, names)
+        self.lane_worker.lanes_signal.connect(self.on_lanes_ready)
+        self.lane_worker.progress_signal.connect(self.on_lane_progress)
+        self.lane_worker.error_signal.connect(self.on_worker_error)
+        self.lane_worker.finished.connect(self.run_lane_queue)
+        self.lane_worker.start()
+
+    def drop_lane_index(self):
+        """ 请求中止并等待线程结束 (扫描在块之间检查中止请求) """
+        if self.lane_worker and self.lane_worker.isRunning():
+            self.lane_worker.requestInterruption(); self.lane_worker.wait()
+        self.lane_worker = None
+        self.lane_queue = []
+        if self.event_dialog is not None: self.event_dialog.close()
+
+    def on_lanes_ready(self, name, lanes):
+        if self.sender() is not self.lane_worker or lanes.store is not self.store or name not in self.store: return
+        if lanes.version != self.store.version(name): return
+        self.logic_lanes[name] = lanes
+        if self.event_dialog is not None: self.event_dialog.on_lanes_ready(name)
+
+    def on_lane_progress(self, done, total, name):
+        if self.sender() is not self.lane_worker or self.event_dialog is None: return
+        self.event_dialog.show_progress(done, total, name)
+
+    def step_event(self, rows, current, direction):
+        """
+        在升序行号 rows 中取下一个 (direction > 0) 或上一个事件，二分查找：
+        起点为当前事件 (已移出视图时改用视图中心)；没有更多事件时返回 None。
+        """
+        if self.main_vb is None or len(rows) == 0: return None
+        x0, x1 = self.main_vb.viewRange()[0]
+        start, end = self.view_rows(x0, x1)
+        ref = current if current is not None and start <= current < end else self.time_base.nearest((x0 + x1) / 2, len(self.store))
+        if direction > 0: k = int(np.searchsorted(rows, ref, side='right'))
+        else: k = int(np.searchsorted(rows, ref, side='left')) - 1
+        return int(rows[k]) if 0 <= k < len(rows) else None
+
+    def jump_to_row(self, row):
+        """ 保持当前缩放，把第 row 行移到视图中央并用竖线标记 """
+        if self.main_vb is None: return
+        t = float(self.time_base.time_at(row))
+        x0, x1 = self.main_vb.viewRange()[0]
+        half = (x1 - x0) / 2
+        self.main_vb.setXRange(t - half, t + half, padding=0)
+        if self.event_marker is None:
+            self.event_marker = pg.InfiniteLine(angle=90, movable=False, pen=pg.mkPen('#C678DD', width=1, style=Qt.DashLine))
+            self.main_vb.addItem(self.event_marker, ignoreBounds=True)
+        self.event_marker.setValue(t)
+
+    # === 触发搜索 ===
+    def open_trigger_dialog(self):
+        if self.store is None:
+            QMessageBox.warning(self, "提示", "请先导入数据文件！")
+            return
+        if self.is_loading():
+            QMessageBox.warning(self, "提示", "文件仍在加载中，请稍候再搜索触发。")
+            return
+        if self.trigger_dialog is None:
+            self.trigger_dialog = TriggerDialog(self)
+        self.trigger_dialog.refresh_channels()
+        self.trigger_dialog.show()
+        self.trigger_dialog.raise_()
+        self.trigger_dialog.activateWindow()
+
+    def start_trigger_search(self, spec):
+        self.stop_trigger_search()
+        self.trigger_worker = TriggerSearchThread(self.store, self.time_base, spec)
+        self.trigger_worker.progress_signal.connect(self.on_trigger_progress)
+        self.trigger_worker.result_signal.connect(self.on_trigger_found)
+        self.trigger_worker.error_signal.connect(self.on_trigger_error)
+        self.trigger_worker.start()
+
+    def stop_trigger_search(self):
+        """ 中止正在进行的搜索 (扫描在块之间检查中止请求) """
+        if self.trigger_worker and self.trigger_worker.isRunning():
+            self.trigger_worker.requestInterruption(); self.trigger_worker.wait()
+        self.trigger_worker = None
+
+    def drop_trigger_search(self):
+        self.stop_trigger_search()
+        self.clear_trigger_hits()
+        if self.trigger_dialog is not None: self.trigger_dialog.close()
+
+    def on_trigger_progress(self, percent):
+        if self.sender() is not self.trigger_worker or self.trigger_dialog is None: return
+        self.trigger_dialog.show_progress(percent)
+
+    def on_trigger_found(self, starts, ends):
+        if self.sender() is not self.trigger_worker: return
+        self.trigger_hits = (starts, ends)
+        self.trigger_spec = self.trigger_worker.spec
+        self.refresh_trigger_markers()
+        if self.trigger_dialog is not None: self.trigger_dialog.on_results()
+
+    def on_trigger_error(self, msg):
+        """ 搜索异常 (如所搜通道已被删除)：清除旧结果并恢复对话框，否则对话框一直停在"搜索中" """
+        if self.sender() is not self.trigger_worker: return
+        self.clear_trigger_hits()
+        QMessageBox.critical(self, "触发搜索失败", msg)
+
+    def clear_trigger_hits(self):
+        self.trigger_hits = None
+        self.trigger_spec = None
+        self.refresh_trigger_markers()
+        if self.trigger_dialog is not None: self.trigger_dialog.on_results()
+
+    def schedule_trigger_markers(self, *args):
+        if self.trigger_hits is not None or self.trigger_markers is not None: self.marker_timer.start()
+
+    def refresh_trigger_markers(self):
+        """ 可视区内的触发位置画成贯穿视图的竖线，过密时每像素只保留一条 """
+        if self.main_vb is None: return
+        if self.trigger_hits is None or self.store is None:
+            if self.trigger_markers is not None: self.trigger_markers.setData([], [])
+            return
+        if self.trigger_markers is None:
+            self.trigger_markers = pg.PlotCurveItem(pen=pg.mkPen('#D19A66', width=1), connect='pairs')
+            self.main_vb.addItem(self.trigger_markers, ignoreBounds=True)
+        (x0, x1), (y0, y1) = self.main_vb.viewRange()
+        start, end = self.view_rows(x0, x1)
+        starts = self.trigger_hits[0]
+        rows = starts[np.searchsorted(starts, start):np.searchsorted(starts, end)]
+        t = self.time_base.time_at(rows)
+        width = max(1, int(self.main_vb.width()))
+        if len(t) > width:
+            px = ((t - x0) * (width / max(x1 - x0, 1e-12))).astype(np.int64)
+            t = t[np.unique(px, return_index=True)[1]]
+        self.trigger_markers.setData(np.repeat(t, 2), np.tile([y0, y1], len(t)))
+
+    # === 跟随模式 (文件仍在写入时持续追加) ===
+    def toggle_follow(self, enabled):
+        if enabled: self.start_follow()
+        else: self.stop_follow(refresh_dots=True)
+
+    def uncheck_follow(self):
+        self.chk_follow.blockSignals(True)
+        self.chk_follow.setChecked(False)
+        self.chk_follow.blockSignals(False)
+
+    def reject_follow(self, msg):
+        self.uncheck_follow()
+        QMessageBox.warning(self, "提示", msg)
+
+    def start_follow(self):
+        """
+        开启跟随：
+        1. 定位已加载行之后的字节位置，之后每次轮询只解析新追加的完整行。
+        2. 通道与时间轴换成可增长缓冲区，新行直接追加，不复制历史数据。
+        3. 曲线只 setData 更新，不经过 update_plot 重建视图；数据点显示暂停。
+        """
+        if self.store is None or self.current_file is None or self.is_loading():
+            return self.reject_follow("请先导入数据文件并等待加载完成！")
+        if self.row_range:
+            return self.reject_follow("区间导入的数据不支持跟随，请使用完整导入。")
+        fmt = sniff_text_format(self.current_file)
+        if fmt['kind'] != 'text' or fmt['encoding'].startswith('utf-16'):
+            return self.reject_follow("跟随模式仅支持 UTF-8 / GBK 文本文件！")
+        header = read_header_columns(self.current_file, fmt)
+        raw_cols = [c for c in self.store.columns if c in header]
+        if not raw_cols or set(raw_cols) != set(self.store.base_columns):
+            return self.reject_follow("当前通道无法与文件表头对应，不能跟随。")
+
+        pos = self.loader.data_end if self.loader else None
+        if pos is None:
+            return self.reject_follow("无法确定已读取到的文件位置，请清除缓存后重新导入。")
+        self.follow = {
+            'pos': pos,   # 加载时解析到的最后一个完整行之后
+            'fmt': fmt, 'header': header, 'raw_cols': raw_cols,
+        }
+        if self.chk_dots.isChecked(): self.chk_dots.setChecked(False)
+        self.chk_dots.setEnabled(False)
+        self.drop_lod()   # 数据开始增长，金字塔在停止跟随后重建
+        self.follow_timer.start(FOLLOW_INTERVAL_MS)
+        self.status_label.setText(f" 跟随中 | {len(self.store)} 行")
+
+    def stop_follow(self, refresh_dots=False):
+        if self.follow is None: return
+        self.follow_timer.stop()
+        self.follow = None
+        if refresh_dots and self.store is not None: self.start_dot_worker()
+
+    def read_appended_rows(self):
+        """ 读取上次位置之后新增的完整行，返回 {列名: 数组}，没有新行时返回 None """
+        f = self.follow
+        size = os.path.getsize(self.current_file)
+        if size < f['pos']:
+            raise OSError("文件被截断或替换")
+        if size == f['pos']: return None
+        with open(self.current_file, 'rb') as fh:
+            fh.seek(f['pos'])
+            data = fh.read(min(size - f['pos'], FOLLOW_MAX_BYTES))
+        cut = data.rfind(b'\n') + 1
+        if cut == 0: return None   # 最后一行还没写完
+        f['pos'] += cut
+        chunk = pd.read_csv(BytesIO(data[:cut]), header=None, names=f['header'], usecols=f['raw_cols'],
+                            sep=f['fmt']['sep'], encoding=f['fmt']['encoding'], encoding_errors='replace',
+                            on_bad_lines='skip', engine='c')
+        if len(chunk) == 0: return None
+        # 派生通道不需要追加，读取时按块重算末尾变化的部分
+        return {c: to_native_array(chunk[c]) for c in f['raw_cols']}
+
+    def follow_tick(self):
+        if self.follow is None or self.store is None or self._plot_busy: return
+        try:
+            blocks = self.read_appended_rows()
+        except Exception as e:
+            self.chk_follow.setChecked(False)
+            QMessageBox.warning(self, "跟随停止", str(e))
+            return
+        if blocks is None: return
+
+        store = self.store
+        old_rows = len(store)
+        store.append_rows(blocks)
+        if isinstance(self.time_base, IndexedTimeBase):
+            try:
+                self.time_base.extend()
+            except ValueError as e:
+                self.chk_follow.setChecked(False)
+                QMessageBox.warning(self, "跟随停止", str(e))
+                return
+        rate = self.time_base.period
+
+        for col in self.trace_dict: self.set_trace_data(col)
+        if self.logic_items: self.refresh_logic()
+        # 视图右边界在原数据末尾附近时，随新数据一起平移
+        if self.main_vb is not None and old_rows > 0:
+            x0, x1 = self.main_vb.viewRange()[0]
+            last_old = self.time_base.time_at(old_rows - 1)
+            if x1 >= last_old - rate:
+                shift = self.time_base.time_at(len(store) - 1) - last_old
+                self.main_vb.setXRange(x0 + shift, x1 + shift, padding=0)
+        self.stats_refresh.request()
+        self.status_label.setText(f" 跟随中 | {len(store)} 行 (+{len(store) - old_rows}){self.time_base_info()}")
+
+    def on_dots_prepared(self, dots_data, window):
+        worker = self.sender()
+        if worker is not self.dot_worker or worker.store is not self.store or self.dots_cache is None: return
+        self.set_dots(dots_data, window)
+
+    def set_dots(self, dots_data, window):
+        """ 更新已有散点的数据，缺少散点的可见通道补建 """
+        self.dots_cache = dots_data
+        self.dots_window = window
+        for col, trace in self.trace_dict.items():
+            if trace['scatter'] is None: continue
+            dx, dy = dots_data.get(col, ((), ()))
+            trace['scatter'].setData(x=dx, y=dy)
+        if self.plot_config and self.plot_config['dots']: self.apply_dots(True)
+
+    def show_ready_status(self):
+        info = f" | {self.load_info}" if self.load_info else ""
+        mode = " | 外存模式" if self.store.out_of_core else ""
+        if self.row_range: mode += f" | 区间 {self.row_offset}~{self.row_offset + len(self.store)} 行"
+        self.status_label.setText(f" 就绪 | {len(self.store)} 行{mode}{self.time_base_info()}{info}")
+        tb = self.time_base
+        self.status_label.setToolTip(tb.gap_summary() if isinstance(tb, IndexedTimeBase) and tb.gaps else "")
+
+    def reset_layout(self):
+        """ 清除视图、坐标轴与光标 (曲线对象由 trace_dict 保留) """
         if self.proxy: 
             try: self.proxy.disconnect()
             except: pass
         self.proxy = None
+        self.readout.hide(); self.readout_idx = None; self.readout_cache = None
         self.v_line = None; self.h_line = None; self.crosshair_label = None
         self.cursor_x1 = None; self.cursor_x2 = None; self.cursor_y1 = None; self.cursor_y2 = None
         for v in self.overlay_views: 
             if v.scene(): v.scene().removeItem(v)
-        self.overlay_views.clear(); self.all_views.clear(); self.trace_dict.clear()
-        self.plot_layout.clear(); self.stats_table.clearContents(); self.stats_table.setRowCount(0)
+        self.overlay_views.clear(); self.all_views.clear()
+        self.plot_layout.clear()
+        self.main_vb = None
+        self.logic_plot = None; self.logic_items = []; self.logic_panel_cols = []
+        self.event_marker = None; self.trigger_markers = None
+
+    def cleanup_plot(self):
+        self.reset_layout()
+        self.trace_dict.clear()
+        self.hidden_traces.clear()
+        self.plot_config = None
+        self.stats_refresh.invalidate()
+        self.stats_model.clear()
         while self.legend_layout.count():
             item = self.legend_layout.takeAt(0)
             if item.widget(): item.widget().deleteLater()
@@ -1092,7 +4648,7 @@ class ProOscilloscope(QMainWindow):
         vb = CustomViewBox()
         vb.sigDragEvent.connect(self.on_view_dragged)
         vb.sigRightClickDouble.connect(self.reset_views) 
-        vb.sigXRangeChanged.connect(self.update_stats_table) 
+        vb.sigXRangeChanged.connect(self.stats_refresh.request)
         vb.sigRightClick.connect(self.show_context_menu)
         vb.sigZoomEvent.connect(self.on_global_zoom)
         vb.sigRectZoom.connect(self.on_rect_zoom)
@@ -1102,101 +4658,266 @@ class ProOscilloscope(QMainWindow):
         self.loading_overlay.start("正在刷新视图...")
         QTimer.singleShot(20, self.update_plot)
 
-    def update_plot(self):
+    def plot_config_request(self):
+        """ 界面当前要求的绘图配置 """
+        return {
+            'separate': self.chk_separate.isChecked(),
+            'dots': self.chk_dots.isChecked() and self.dots_cache is not None,
+            'antialias': self.chk_antialias.isChecked(),
+            'columns': list(self.store.columns),
+        }
+
+    def update_plot(self, rebuild=False, refresh_data=False):
+        """
+        保留式绘图：把界面要求的配置与已建好的图形比较，只改动不同的部分。
+        1. 新增通道只建它自己的曲线和图例，删除的通道只释放它自己的图元。
+        2. 数据点、抗锯齿只增删散点或修改画笔，不动曲线。
+        3. 切换分轴 (或分轴下通道增删) 只重建轻量的视图与坐标轴，已有曲线原样挪过去。
+        4. rebuild=True 时整体重建；refresh_data=True 时已有曲线重新取数 (数据或时间轴已变)。
+        """
+        # draw() 内部会 processEvents，渐进加载时可能被重入，重入请求推迟到本轮绘制结束后执行
+        if self._plot_busy:
+            r, d = self._plot_pending or (False, False)
+            self._plot_pending = (r or rebuild, d or refresh_data)
+            return
+        self._plot_busy = True
         try:
-            if self.df is None: return
-            self.cleanup_plot() 
-            cols = self.df.columns
-            separate = self.chk_separate.isChecked()
-            show_dots = self.chk_dots.isChecked() and (self.dots_cache is not None)
-            
-            self.main_vb = self.create_view_box()
-            self.all_views.append(self.main_vb)
-            
-            def draw(target_plot, col, color, visible=True):
-                QApplication.processEvents()
-                curve = pg.PlotCurveItem(x=self.time_axis, y=self.df[col].values, pen=pg.mkPen(color, width=1), connect='finite')
-                if hasattr(curve, 'setDownsampling'): curve.setDownsampling(auto=True, method='peak')
-                if hasattr(curve, 'setClipToView'): curve.setClipToView(True)
-                
-                curve.setVisible(visible)
-                target_plot.addItem(curve)
-                
-                scatter = None
-                if show_dots:
-                    dx, dy = self.dots_cache[col]
-                    scatter = pg.ScatterPlotItem(x=dx, y=dy, pen=None, brush=color, size=5, symbol='o')
-                    scatter.setVisible(visible) 
-                    target_plot.addItem(scatter)
-                    
-                self.trace_dict[col] = {'curve': curve, 'scatter': scatter, 'axis': None, 'visible': visible}
-                return curve, scatter
-
-            if not separate:
-                p = self.plot_layout.addPlot(row=0, col=0, viewBox=self.main_vb)
-                p.setLabel('bottom', "Time", units='ms'); p.getAxis('bottom').enableAutoSIPrefix(False)
-                p.showGrid(x=True, y=True, alpha=0.3); p.setMenuEnabled(False)
-                
-                for i, col in enumerate(cols):
-                    c = WAVE_COLORS[i % len(WAVE_COLORS)]
-                    is_visible = col not in self.hidden_cols
-                    draw(p, col, c, visible=is_visible)
-                    self.add_legend_item(col, c, i, checked=is_visible)
+            if self.store is None: return
+            want = self.plot_config_request()
+            self.readout_idx = None; self.readout_cache = None   # 通道数据可能已被合并替换
+            have = None if rebuild else self.plot_config
+            if have is None: self.cleanup_plot()
+            cols = want['columns']
+            old_cols = have['columns'] if have else []
+
+            for col in old_cols:
+                if col not in cols: self.release_trace(col)
+            if refresh_data:
+                for col in self.trace_dict: self.set_trace_data(col)
+            if have and have['antialias'] != want['antialias']: self.apply_antialias(want['antialias'])
+            if have and have['dots'] != want['dots']: self.apply_dots(want['dots'])
+
+            if have is None or have['separate'] != want['separate'] or (want['separate'] and old_cols != cols):
+                self.build_layout(want)
             else:
-                p_main = self.plot_layout.addPlot(row=0, col=len(cols), viewBox=self.main_vb)
-                p_main.showAxis('left', False); p_main.showGrid(x=True, y=False, alpha=0.3)
-                p_main.setLabel('bottom', "Time", units='ms'); p_main.getAxis('bottom').enableAutoSIPrefix(False)
-                p_main.setMenuEnabled(False); self.main_vb.sigResized.connect(self.update_views_geometry)
-                
-                for i, col in enumerate(cols):
-                    c = WAVE_COLORS[i % len(WAVE_COLORS)]
-                    is_visible = col not in self.hidden_cols
-                    
-                    ax = SmartAxisItem(orientation='left')
-                    ax.setPen(c); ax.setTextPen(c)
-                    
-                    current_fmt = self.col_formats.get(col, 'dec')
-                    ax.set_format(current_fmt)
-                    ax.setVisible(is_visible) 
-                    
-                    self.plot_layout.addItem(ax, row=0, col=i)
-                    if i==0: view = self.main_vb
-                    else:
-                        view = self.create_view_box(); view.enableAutoRange(axis=pg.ViewBox.XYAxes, enable=True)
-                        p_main.scene().addItem(view); view.setXLink(self.main_vb)
-                        self.overlay_views.append(view); self.all_views.append(view)
-                        view.setVisible(is_visible)
-
-                    ax.linkToView(view)
-                    draw(view, col, c, visible=is_visible)
-                    self.trace_dict[col]['axis'] = ax 
-                    
-                    self.add_legend_item(col, c, i, checked=is_visible)
-                    
-                self.update_views_geometry()
-            
+                for col in cols:
+                    if col not in self.trace_dict: self.attach_trace(col, self.main_vb, want)
+            self.pack_legend()
+            self.plot_config = want
+            if self.logic_panel_cols != [c for c in self.logic_cols if c in self.store]: self.build_logic_panel()
+            elif refresh_data: self.refresh_logic()
+            if want['dots']: self.schedule_dots_refresh()
+            # 显示状态以 hidden_cols 为准 (合并会隐藏源通道)，不一致的通道通过图例勾选同步
+            for col in cols:
+                trace = self.trace_dict[col]
+                if trace['visible'] == (col in self.hidden_cols):
+                    trace['legend'].findChild(QCheckBox).setChecked(col not in self.hidden_cols)
+
             if self.chk_crosshair.isChecked(): self.setup_crosshair()
             if self.chk_measure.isChecked(): self.setup_cursors()
-            self.update_stats_table()
+            self.stats_refresh.request(force=True)
         except Exception as e:
             import traceback
             traceback.print_exc()
             QMessageBox.critical(self, "绘图错误", str(e))
         finally:
+            self._plot_busy = False
+            if self._plot_pending:
+                pending, self._plot_pending = self._plot_pending, None
+                QTimer.singleShot(0, lambda: self.update_plot(*pending))
             if not (self.dot_worker and self.dot_worker.isRunning()): self.loading_overlay.stop()
 
+    def build_layout(self, want):
+        """ 重建视图与坐标轴 (开销很小)，已有曲线/散点先从旧视图摘下，再挂到新视图上 """
+        for trace in self.trace_dict.values():
+            for key in ('curve', 'scatter'):
+                if trace[key] is not None and trace['view'] is not None: trace['view'].removeItem(trace[key])
+            trace['view'] = None
+            trace['axis'] = None
+        self.reset_layout()
+        cols = want['columns']
+        # 新视图逐个加入布局时会连锁触发 X 范围变化，统计表等布局完成后统一刷新一次
+        self._stats_frozen = True
+        try:
+            self._build_views(want, cols)
+        finally:
+            self._stats_frozen = False
+
+    def _build_views(self, want, cols):
+        self.main_vb = self.create_view_box()
+        self.main_vb.sigXRangeChanged.connect(self.schedule_lod_refresh)
+        self.main_vb.sigResized.connect(self.schedule_lod_refresh)
+        self.main_vb.sigXRangeChanged.connect(self.schedule_dots_refresh)
+        self.main_vb.sigResized.connect(self.schedule_dots_refresh)
+        self.main_vb.sigXRangeChanged.connect(self.schedule_logic_refresh)
+        self.main_vb.sigResized.connect(self.update_logic_geometry)
+        self.main_vb.sigRangeChanged.connect(self.schedule_trigger_markers)
+        self.all_views.append(self.main_vb)
+
+        if not want['separate']:
+            p = self.plot_layout.addPlot(row=0, col=0, viewBox=self.main_vb)
+            p.setLabel('bottom', "Time", units='ms'); p.getAxis('bottom').enableAutoSIPrefix(False)
+            p.showGrid(x=True, y=True, alpha=0.3); p.setMenuEnabled(False)
+            for col in cols: self.attach_trace(col, self.main_vb, want)
+        else:
+            p_main = self.plot_layout.addPlot(row=0, col=len(cols), viewBox=self.main_vb)
+            p_main.showAxis('left', False); p_main.showGrid(x=True, y=False, alpha=0.3)
+            p_main.setLabel('bottom', "Time", units='ms'); p_main.getAxis('bottom').enableAutoSIPrefix(False)
+            p_main.setMenuEnabled(False); self.main_vb.sigResized.connect(self.update_views_geometry)
+
+            for i, col in enumerate(cols):
+                c = self.channel_color(col)
+                trace = self.trace_dict.get(col)
+                is_visible = trace['visible'] if trace else col not in self.hidden_cols
+
+                ax = SmartAxisItem(orientation='left')
+                ax.setPen(c); ax.setTextPen(c)
+                ax.set_format(self.col_formats.get(col, 'dec'))
+                ax.setVisible(is_visible)
+
+                self.plot_layout.addItem(ax, row=0, col=i)
+                if i==0: view = self.main_vb
+                else:
+                    view = self.create_view_box(); view.enableAutoRange(axis=pg.ViewBox.XYAxes, enable=True)
+                    p_main.scene().addItem(view); view.setXLink(self.main_vb)
+                    self.overlay_views.append(view); self.all_views.append(view)
+                    view.setVisible(is_visible)
+
+                ax.linkToView(view)
+                self.attach_trace(col, view, want)['axis'] = ax
+
+            self.update_views_geometry()
+        self.build_logic_panel()
+        self.schedule_trigger_markers()
+
+    def channel_color(self, col):
+        trace = self.trace_dict.get(col)
+        if trace: return trace['color']
+        return WAVE_COLORS[self.store.columns.index(col) % len(WAVE_COLORS)]
+
+    def attach_trace(self, col, view, want):
+        """ 把通道挂到视图上：曲线与图例只在第一次需要时创建，之后在各种布局间复用 """
+        trace = self.trace_dict.get(col)
+        if trace is None:
+            color = self.channel_color(col)
+            visible = col not in self.hidden_cols
+            trace = {'curve': None, 'scatter': None, 'axis': None, 'view': None, 'visible': visible,
+                     'color': color, 'legend': self.add_legend_item(col, color, checked=visible)}
+            self.trace_dict[col] = trace
+        elif trace.get('lod_window') is not None:
+            # 新视图会自动缩放到全局，LOD 曲线先换回全局概览
+            self.set_trace_data(col)
+        trace['view'] = view
+        if trace['curve'] is not None:
+            view.addItem(trace['curve'])
+            if want['dots']:
+                if trace['scatter'] is None: trace['scatter'] = self.make_scatter(col, trace)
+                if trace['scatter'] is not None: view.addItem(trace['scatter'])
+        elif trace['visible']:
+            # 隐藏通道只建图例，勾选显示时再创建曲线
+            self.materialize_trace(col, want['dots'])
+        return trace
+
+    def materialize_trace(self, col, dots=None):
+        """ 为通道创建曲线 (及数据点) 并挂到它的视图上，已存在时不做任何事 """
+        trace = self.trace_dict.get(col)
+        if trace is None or trace['curve'] is not None or trace['view'] is None: return
+        curve = pg.PlotCurveItem(pen=pg.mkPen(trace['color'], width=1), connect='finite')
+        if hasattr(curve, 'setDownsampling'): curve.setDownsampling(auto=True, method='peak')
+        if hasattr(curve, 'setClipToView'): curve.setClipToView(True)
+        curve.opts['antialias'] = self.chk_antialias.isChecked()
+        curve.setVisible(trace['visible'])
+        trace['curve'] = curve
+        self.set_trace_data(col)
+        trace['view'].addItem(curve)
+        if dots is None: dots = bool(self.plot_config and self.plot_config['dots'])
+        if dots:
+            trace['scatter'] = self.make_scatter(col, trace)
+            if trace['scatter'] is not None: trace['view'].addItem(trace['scatter'])
+
+    def release_trace_items(self, col):
+        """ 释放隐藏通道的曲线与数据点，图例和通道数据保留 """
+        trace = self.trace_dict.get(col)
+        if trace is None or trace['visible']: return
+        for key in ('curve', 'scatter'):
+            if trace[key] is not None and trace['view'] is not None: trace['view'].removeItem(trace[key])
+            trace[key] = None
+        trace['lod_window'] = None
+
+    def set_trace_data(self, col, window=None):
+        """ 给曲线设置数据：有金字塔时按 window 取 LOD 数据 (None 为全局概览)，否则用整列数据 """
+        trace = self.trace_dict[col]
+        if trace['curve'] is None: return
+        if window is None and self.lod_pyramids and self.main_vb is not None: window = self.lod_window(full=True)
+        data = self.lod_curve_data(col, window) if window else None
+        if data is None:
+            values, window = self.store.values(col), None
+            if isinstance(values, DerivedColumn) and len(values) > DERIVED_PREVIEW_ROWS:
+                # 派生通道的金字塔还在后台建立：按固定步长抽样预览，不把整列计算进内存
+                step = -(-len(values) // DERIVED_PREVIEW_ROWS)
+                data = (self.time_base.take(0, len(values), step), values[::step])
+            else:
+                data = (self.time_axis(), np.asarray(values))
+        trace['curve'].setData(x=data[0], y=data[1], connect='finite')
+        trace['lod_window'] = window
+
+    def make_scatter(self, col, trace):
+        if not self.dots_cache or col not in self.dots_cache: return None
+        dx, dy = self.dots_cache[col]
+        scatter = pg.ScatterPlotItem(x=dx, y=dy, pen=None, brush=trace['color'], size=5, symbol='o')
+        scatter.setVisible(trace['visible'])
+        return scatter
+
+    def apply_dots(self, enabled):
+        """ 只增删散点，曲线不动 """
+        for col, trace in self.trace_dict.items():
+            if enabled:
+                if trace['scatter'] is None and trace['curve'] is not None and trace['view'] is not None:
+                    trace['scatter'] = self.make_scatter(col, trace)
+                    if trace['scatter'] is not None: trace['view'].addItem(trace['scatter'])
+            elif trace['scatter'] is not None:
+                if trace['view'] is not None: trace['view'].removeItem(trace['scatter'])
+                trace['scatter'] = None
+
+    def apply_antialias(self, enabled):
+        """ 只修改已有图元的抗锯齿选项并重绘 """
+        for trace in self.trace_dict.values():
+            for key in ('curve', 'scatter'):
+                item = trace[key]
+                if item is not None:
+                    item.opts['antialias'] = enabled
+                    item.update()
+
+    def release_trace(self, col):
+        """ 释放单个通道的曲线、散点与图例 (坐标轴随布局重建) """
+        trace = self.trace_dict.pop(col, None)
+        self.hidden_traces.pop(col, None)
+        if trace is None: return
+        for key in ('curve', 'scatter'):
+            if trace[key] is not None and trace['view'] is not None: trace['view'].removeItem(trace[key])
+        self.legend_layout.removeWidget(trace['legend'])
+        trace['legend'].deleteLater()
+
+    def pack_legend(self):
+        """ 图例按通道顺序每行 4 个重新排布 """
+        cols = [c for c in self.store.columns if c in self.trace_dict]
+        for i, col in enumerate(cols):
+            widget = self.trace_dict[col]['legend']
+            self.legend_layout.removeWidget(widget)
+            self.legend_layout.addWidget(widget, i // 4, i % 4)
+
     def toggle_crosshair(self, enabled):
         if enabled: self.setup_crosshair()
         else: self.remove_crosshair()
 
     def setup_crosshair(self):
-        if self.df is None or not self.main_vb: return
+        if self.store is None or not self.main_vb: return
         if self.crosshair_label: return
         self.v_line = pg.InfiniteLine(angle=90, movable=False, pen=pg.mkPen('#FFFFFF', width=1, style=Qt.DashLine))
         self.h_line = pg.InfiniteLine(angle=0, movable=False, pen=pg.mkPen('#FFFFFF', width=1, style=Qt.DashLine))
         self.main_vb.addItem(self.v_line); self.main_vb.addItem(self.h_line)
-        self.crosshair_label = pg.TextItem(anchor=(0, 1), color='#DCDFE4', fill=QColor(40, 44, 52, 200))
-        self.main_vb.addItem(self.crosshair_label)
+        self.crosshair_label = self.readout
+        self.readout_idx = None; self.readout_cache = None
         self.proxy = pg.SignalProxy(self.plot_layout.scene().sigMouseMoved, rateLimit=60, slot=self.on_mouse_move)
 
     def remove_crosshair(self):
@@ -1207,35 +4928,60 @@ class ProOscilloscope(QMainWindow):
         if self.main_vb:
             if self.v_line: self.main_vb.removeItem(self.v_line)
             if self.h_line: self.main_vb.removeItem(self.h_line)
-            if self.crosshair_label: self.main_vb.removeItem(self.crosshair_label)
+        self.readout.hide(); self.readout_idx = None; self.readout_cache = None
         self.v_line = None; self.h_line = None; self.crosshair_label = None
 
     def on_mouse_move(self, evt):
-        if self.df is None or not self.crosshair_label: return
+        if self.store is None or not self.crosshair_label: return
         if not self.chk_crosshair.isChecked(): return
         try:
             pos = evt[0]
             if self.main_vb.sceneBoundingRect().contains(pos):
                 pt = self.main_vb.mapSceneToView(pos)
                 final_x = pt.x(); final_y = pt.y()
-                rate = self.spin_rate.value() 
-                idx = int(round(final_x / rate))
-                if idx < 0: idx = 0
-                if idx >= len(self.df): idx = len(self.df) - 1
-                final_x = self.time_axis[idx]
-                if self.v_line: self.v_line.setPos(final_x)
+                idx = self.time_base.nearest(final_x, len(self.store))
+                final_x = self.time_base.time_at(idx)
                 if self.h_line: self.h_line.setPos(final_y)
-                info = f"<span style='color: #ABB2BF'>Time: {final_x:.1f} ms</span><br>"
-                for i, col in enumerate(self.df.columns):
-                    if not self.trace_dict[col]['visible']: continue
-                    c = WAVE_COLORS[i % len(WAVE_COLORS)]
-                    v = self.df.iloc[idx, i]
-                    val_str = self.format_val(col, v) 
-                    info += f'<span style="color:{c}">■ {col}: {val_str}</span><br>'
-                self.crosshair_label.setHtml(f'<div style="font-family: Consolas, sans-serif; font-size:12px">{info}</div>')
-                self.crosshair_label.setPos(final_x, final_y)
+                names = tuple(c for c, t in self.trace_dict.items() if t['visible'])
+                if (idx, names, len(self.store)) != self.readout_idx:
+                    # 采样点变化时才取值、格式化并更新文字
+                    self.readout_idx = (idx, names, len(self.store))
+                    if self.v_line: self.v_line.setPos(final_x)
+                    row = self.readout_row(idx, names)
+                    self.readout.set_channels(names, [self.trace_dict[c]['color'] for c in names])
+                    self.readout.set_values(f"Time: {final_x:.1f} ms",
+                                            [f"■ {c}: {self.format_val(c, v)}" for c, v in zip(names, row)])
+                self.readout.place(self.plot_layout.mapFromScene(pos))
+                self.readout.show()
+            else:
+                self.readout.hide()
         except Exception: pass
 
+    def readout_row(self, idx, names):
+        """
+        光标所在行全部显示通道的值：从按行排列的缓存块中一次取出整行，移出缓存块时重新取 READOUT_BLOCK 行。
+        有符号/无符号整数通道分别放在 int64 / uint64 块中，64 位字的读数与 Hex 显示保持精确。
+        """
+        cache = self.readout_cache
+        if cache is None or cache['store'] is not self.store or cache['names'] != names \
+                or not cache['start'] <= idx < cache['end']:
+            start = max(0, min(idx - READOUT_BLOCK // 2, len(self.store) - READOUT_BLOCK))
+            end = min(len(self.store), start + READOUT_BLOCK)
+            groups = {}
+            for j, col in enumerate(names):
+                kind = self.store.dtype(col).kind
+                groups.setdefault(np.uint64 if kind == 'u' else np.int64 if kind in 'ib' else np.float64, []).append(j)
+            blocks = []
+            for dtype, cols in groups.items():
+                block = np.empty((end - start, len(cols)), dtype=dtype)
+                for k, j in enumerate(cols): block[:, k] = self.store.slice(names[j], start, end)
+                blocks.append((cols, block))
+            cache = self.readout_cache = {'store': self.store, 'names': names, 'start': start, 'end': end, 'blocks': blocks}
+        row = [None] * len(names)
+        for cols, block in cache['blocks']:
+            for j, v in zip(cols, block[idx - cache['start']]): row[j] = v
+        return row
+
 if __name__ == "__main__":
     if hasattr(Qt, 'AA_EnableHighDpiScaling'): QApplication.setAttribute(Qt.AA_EnableHighDpiScaling, True)
     if hasattr(Qt, 'AA_UseHighDpiPixmaps'): QApplication.setAttribute(Qt.AA_UseHighDpiPixmaps, True)
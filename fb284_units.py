@@ -0,0 +1,95 @@
+"""
+FB284 (报文 111) 物理单位换算，EPOS 计算器与波形分析器共用同一套公式：
+1. 只用四则运算，参数为标量时得到标量 (计算器)，为 NumPy 数组时整段一次算完 (波形分析器)。
+2. 参数集为普通字典 (键见 PARAM_KEYS)，计算器可导出到 PARAMS_FILE，波形分析器导入后生成物理量通道。
+"""
+import json
+import os
+
+NIST_B_FULL_SCALE = 1073741824.0   # NIST_B / NSOLL_B: 0x40000000 对应额定转速
+PARAMS_FILE = os.path.join(os.environ.get('LOCALAPPDATA') or os.path.expanduser('~'), 'WaveformAnalyzer', 'fb284_params.json')
+PARAM_KEYS = ('ratio_n', 'ratio_d', 'enc_res', 'rated_spd', 'gear_n', 'gear_d', 'linear_lead', 'mech_type')
+
+# === 单项换算 ===
+def nist_to_rpm(code, rated_spd):
+    """ 速度字 -> 电机转速 (RPM)：额定转速 * (输入值 / 1073741824) """
+    return rated_spd * (code / NIST_B_FULL_SCALE)
+
+def motor_to_load_rpm(rpm, gear_n, gear_d):
+    """ 电机转速 -> 负载转速，gear_n / gear_d 为减速比 (电机 / 负载) """
+    return rpm * (gear_d / gear_n)
+
+def load_rpm_to_speed(load_rpm, mech_type, lead):
+    """ 负载转速 -> 旋转机构 °/s 或线性机构 mm/s """
+    return load_rpm * 6.0 if mech_type == 'rotary' else load_rpm / 60.0 * lead
+
+def lu_per_motor_rev(ratio_n, ratio_d, enc_res):
+    """ 电机单圈位置指令 (LU/圈)，ratio_n / ratio_d 为电子齿轮比 """
+    return ratio_d * enc_res / ratio_n
+
+def lu_per_load_rev(ratio_n, ratio_d, enc_res, gear_n, gear_d):
+    """ 负载单圈位置指令 (LU/圈) = 电机单圈 LU × 减速比 """
+    return lu_per_motor_rev(ratio_n, ratio_d, enc_res) * (gear_n / gear_d)
+
+def setpoint_to_rpm(velocity, override, enc_res, ratio_n, ratio_d):
+    """ EPOS 速度设定 (1000 LU/min) 与速度倍率 (%) -> 电机转速 (RPM) """
+    return velocity * 1000 * (override / 100) / enc_res * (ratio_n / ratio_d)
+
+def rated_velocity(rated_spd, override, enc_res, ratio_n, ratio_d):
+    """ 额定电机转速对应的 EPOS 速度 (1000 LU/min) """
+    return rated_spd * ratio_d * enc_res * 100 / (ratio_n * 1000 * override)
+
+def speed_unit(mech_type):
+    return '°/s' if mech_type == 'rotary' else 'mm/s'
+
+def position_unit(mech_type):
+    return '°' if mech_type == 'rotary' else 'mm'
+
+# === 按参数集整段换算 (波形分析器) ===
+# 物理量: (界面名称, 是否需要机械参数)
+QUANTITIES = {
+    'motor_rpm': ('速度字 → 电机转速', False),
+    'load_speed': ('速度字 → 负载速度', True),
+    'load_position': ('位置 (LU) → 负载位置', True),
+}
+
+def check_params(params, quantity):
+    """ 校验换算所需的参数，不合法时抛出 ValueError """
+    for key in ('ratio_n', 'ratio_d', 'enc_res', 'rated_spd'):
+        if not params.get(key): raise ValueError('关键 EPOS 参数不能为 0')
+    if QUANTITIES[quantity][1]:
+        if not params.get('gear_n') or not params.get('gear_d'):
+            raise ValueError('请先在计算器中填写机械减速比')
+        if params.get('mech_type') != 'rotary' and not params.get('linear_lead'):
+            raise ValueError('线性机构的导程不能为 0')
+
+def quantity_unit(quantity, params):
+    if quantity == 'motor_rpm': return 'RPM'
+    if quantity == 'load_speed': return speed_unit(params.get('mech_type'))
+    return position_unit(params.get('mech_type'))
+
+def convert(values, quantity, params):
+    """ 原始数据 (标量或 float64 数组) -> 物理量 """
+    p = params
+    if quantity == 'motor_rpm':
+        return nist_to_rpm(values, p['rated_spd'])
+    if quantity == 'load_speed':
+        load_rpm = motor_to_load_rpm(nist_to_rpm(values, p['rated_spd']), p['gear_n'], p['gear_d'])
+        return load_rpm_to_speed(load_rpm, p['mech_type'], p['linear_lead'])
+    # 负载一圈对应 360° 或一个导程
+    lu_load = lu_per_load_rev(p['ratio_n'], p['ratio_d'], p['enc_res'], p['gear_n'], p['gear_d'])
+    per_rev = 360.0 if p['mech_type'] == 'rotary' else p['linear_lead']
+    return values * (per_rev / lu_load)
+
+# === 参数集导入导出 ===
+def save_params(params, path=PARAMS_FILE):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({k: params.get(k) for k in PARAM_KEYS}, f, ensure_ascii=False, indent=1)
+
+def load_params(path=PARAMS_FILE):
+    """ 读取导出的参数集，文件不存在时返回 None """
+    if not os.path.exists(path): return None
+    with open(path, encoding='utf-8') as f:
+        data = json.load(f)
+    return {k: data.get(k) for k in PARAM_KEYS}
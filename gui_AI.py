@@ -307,6 +307,110 @@ MODE_NAMES = {
     8: "模式8: JOG 增量模式"
 }
 
+# 各报文字每一位的含义: 元组 (文字, 位数) 为多位字段，其后被占用的位为 None (波形分析器的位通道显示也使用本表)
+PANEL_CONFIGS = {
+    "STW1": {
+        "title": "STW1", "icon": "⚙️", 
+        "texts": [
+            "OFF1 减速停机↑", "OFF2 自由停机", "OFF3 紧急停机", "允许运行", 
+            "不拒绝任务", "不暂停任务", "激活运行任务↑", "复位故障↑", 
+            "JOG1 点动", "JOG2 点动", "PLC 控制", "开始回原点", 
+            "保留", "外部程序段切换↑", "切换至转矩模式", "保留"
+        ]
+    },
+    "POS_STW1": {
+        "title": "POS_STW1 ", "icon": "⚙️", 
+        "texts": [
+            ("运行程序段选择 (Bit0-3)", 4), None, None, None, 
+            "保留", "保留", "保留", "保留", 
+            "定位模式 1=绝对/0=相对", 
+            ("定位方向 1=正向/2=负向", 2), None, 
+            "保留", "连续传输", "保留", "信号选择(Mode=3)", "MDI 选择"
+        ]
+    },
+    "POS_STW2": {
+        "title": "POS_STW2 ", "icon": "⚙️", 
+        "texts": [
+            "保留", "设置参考点", "参考点挡块激活", "保留", 
+            "保留", "点动模式 1=位置/0=速度", "保留", "保留", 
+            "保留", "回原方向 (0=正/1=负)", "保留", "保留", 
+            "保留", "保留", "激活软件限位", "激活硬件限位"
+        ]
+    },
+    "STW2": {
+        "title": "STW2 ", "icon": "⚙️", 
+        "texts": [
+            "保留", "保留", "保留", "保留", 
+            "保留", "保留", "保留", "保留", 
+            "运行至固定停止点", "保留", "保留", "保留", 
+            "主站心跳 Bit0", "主站心跳 Bit1", "主站心跳 Bit2", "主站心跳 Bit3"
+        ]
+    },
+    "ZSW1": {
+        "title": "ZSW1 ", "icon": "⚙️", 
+        "texts": [
+            "准备开启", "准备就绪", "运行使能", "有故障", 
+            "OFF2 无效", "OFF3 无效", "禁止接通", "有报警", 
+            "无位置偏差故障", "PLC 控制请求", "到达目标位置", "已完成回参考点", 
+            "程序段应答", "驱动器静止", "转矩控制有效", "保留"
+        ]
+    },
+    "ZSW2": {
+        "title": "ZSW2 ", "icon": "⚙️", 
+        "texts": [
+            "保留", "保留", "保留", "保留", 
+            "保留", "保留", "保留", "保留", 
+            "运行至固定停止点", "保留", "保留", "保留", 
+            "生命信号 Bit0", "生命信号 Bit1", "生命信号 Bit2", "生命信号 Bit3"
+        ]
+    },
+    "POS_ZSW1": {
+        "title": "POS_ZSW1 ", "icon": "⚙️", 
+        "texts": [
+            ("激活程序段0-15(Bit0-3)", 4), None, None, None, 
+            "保留", "保留", "保留", "保留", 
+            "负向硬限位触发", "正向硬限位触发", "JOG 模式激活", "回原模式激活", 
+            "保留", "程序段模式激活", "保留", "MDI 模式激活"
+        ]
+    },
+    "POS_ZSW2": {
+        "title": "POS_ZSW2", "icon": "⚙️", 
+        "texts": [
+            "保留", "到达速度限制", "保留", "保留", 
+            "轴正向移动", "轴负向移动", "负向软限位触发", "正向软限位触发", 
+            "保留", "保留", "保留", "保留", 
+            "到达固定停止点", "达到夹紧转矩", "固定停止点功能激活", "保留"
+        ]
+    },
+    "MELDW": {
+        "title": "MELDW ", "icon": "⚙️", 
+        "texts": [
+            "保留", "未到达转矩限制", "保留", "保留", 
+            "保留", "保留", "保留", "保留", 
+            "保留", "保留", "保留", "驱动器使能", 
+            "运行准备好", "驱动器运行", "保留", "保留"
+        ]
+    },
+    "EposALWord Lo": {
+        "title": "EposALWord Lo", "icon": "⚙️", 
+        "texts": [
+            "MDI触发位", "多段触发位", "Home触发 关联STW1.11", "Jog1触发位", 
+            "Jog2触发位", "保留", "任务取消位", "任务暂停位", 
+            "Jog模式 0速度/1位置", "位置到达标志", "Home完成", "参考点已设置P01.90", 
+            "上电后编码器初始化完成", "MDI触发 0手动/1连续", "正向硬件限位状态", "负向硬件限位状态"
+        ]
+    },
+    "EposALWord Ho": {
+        "title": "EposALWord Ho", "icon": "⚙️", 
+        "texts": [
+            "最小软件限位状态", "最大软件限位状态", ("轴实际方向 0停1正2负", 2), None, 
+            "到达速度限值标志", "保留", "保留", "保留", 
+            "保留", "保留", "保留", "保留", 
+            "保留", "保留", "保留", "保留"
+        ]
+    }
+}
+
 # --- 资源辅助 ---
 ICON_FILE = 'svg_code_to_png.ico'
 
@@ -1488,108 +1592,7 @@ class ProDriveDashboard(tk.Toplevel):
         
         self.vars = {} 
 
-        self.panel_configs = {
-            "STW1": {
-                "title": "STW1", "icon": "⚙️", 
-                "texts": [
-                    "OFF1 减速停机↑", "OFF2 自由停机", "OFF3 紧急停机", "允许运行", 
-                    "不拒绝任务", "不暂停任务", "激活运行任务↑", "复位故障↑", 
-                    "JOG1 点动", "JOG2 点动", "PLC 控制", "开始回原点", 
-                    "保留", "外部程序段切换↑", "切换至转矩模式", "保留"
-                ]
-            },
-            "POS_STW1": {
-                "title": "POS_STW1 ", "icon": "⚙️", 
-                "texts": [
-                    ("运行程序段选择 (Bit0-3)", 4), None, None, None, 
-                    "保留", "保留", "保留", "保留", 
-                    "定位模式 1=绝对/0=相对", 
-                    ("定位方向 1=正向/2=负向", 2), None, 
-                    "保留", "连续传输", "保留", "信号选择(Mode=3)", "MDI 选择"
-                ]
-            },
-            "POS_STW2": {
-                "title": "POS_STW2 ", "icon": "⚙️", 
-                "texts": [
-                    "保留", "设置参考点", "参考点挡块激活", "保留", 
-                    "保留", "点动模式 1=位置/0=速度", "保留", "保留", 
-                    "保留", "回原方向 (0=正/1=负)", "保留", "保留", 
-                    "保留", "保留", "激活软件限位", "激活硬件限位"
-                ]
-            },
-            "STW2": {
-                "title": "STW2 ", "icon": "⚙️", 
-                "texts": [
-                    "保留", "保留", "保留", "保留", 
-                    "保留", "保留", "保留", "保留", 
-                    "运行至固定停止点", "保留", "保留", "保留", 
-                    "主站心跳 Bit0", "主站心跳 Bit1", "主站心跳 Bit2", "主站心跳 Bit3"
-                ]
-            },
-            "ZSW1": {
-                "title": "ZSW1 ", "icon": "⚙️", 
-                "texts": [
-                    "准备开启", "准备就绪", "运行使能", "有故障", 
-                    "OFF2 无效", "OFF3 无效", "禁止接通", "有报警", 
-                    "无位置偏差故障", "PLC 控制请求", "到达目标位置", "已完成回参考点", 
-                    "程序段应答", "驱动器静止", "转矩控制有效", "保留"
-                ]
-            },
-            "ZSW2": {
-                "title": "ZSW2 ", "icon": "⚙️", 
-                "texts": [
-                    "保留", "保留", "保留", "保留", 
-                    "保留", "保留", "保留", "保留", 
-                    "运行至固定停止点", "保留", "保留", "保留", 
-                    "生命信号 Bit0", "生命信号 Bit1", "生命信号 Bit2", "生命信号 Bit3"
-                ]
-            },
-            "POS_ZSW1": {
-                "title": "POS_ZSW1 ", "icon": "⚙️", 
-                "texts": [
-                    ("激活程序段0-15(Bit0-3)", 4), None, None, None, 
-                    "保留", "保留", "保留", "保留", 
-                    "负向硬限位触发", "正向硬限位触发", "JOG 模式激活", "回原模式激活", 
-                    "保留", "程序段模式激活", "保留", "MDI 模式激活"
-                ]
-            },
-            "POS_ZSW2": {
-                "title": "POS_ZSW2", "icon": "⚙️", 
-                "texts": [
-                    "保留", "到达速度限制", "保留", "保留", 
-                    "轴正向移动", "轴负向移动", "负向软限位触发", "正向软限位触发", 
-                    "保留", "保留", "保留", "保留", 
-                    "到达固定停止点", "达到夹紧转矩", "固定停止点功能激活", "保留"
-                ]
-            },
-            "MELDW": {
-                "title": "MELDW ", "icon": "⚙️", 
-                "texts": [
-                    "保留", "未到达转矩限制", "保留", "保留", 
-                    "保留", "保留", "保留", "保留", 
-                    "保留", "保留", "保留", "驱动器使能", 
-                    "运行准备好", "驱动器运行", "保留", "保留"
-                ]
-            },
-            "EposALWord Lo": {
-                "title": "EposALWord Lo", "icon": "⚙️", 
-                "texts": [
-                    "MDI触发位", "多段触发位", "Home触发 关联STW1.11", "Jog1触发位", 
-                    "Jog2触发位", "保留", "任务取消位", "任务暂停位", 
-                    "Jog模式 0速度/1位置", "位置到达标志", "Home完成", "参考点已设置P01.90", 
-                    "上电后编码器初始化完成", "MDI触发 0手动/1连续", "正向硬件限位状态", "负向硬件限位状态"
-                ]
-            },
-            "EposALWord Ho": {
-                "title": "EposALWord Ho", "icon": "⚙️", 
-                "texts": [
-                    "最小软件限位状态", "最大软件限位状态", ("轴实际方向 0停1正2负", 2), None, 
-                    "到达速度限值标志", "保留", "保留", "保留", 
-                    "保留", "保留", "保留", "保留", 
-                    "保留", "保留", "保留", "保留"
-                ]
-            }
-        }
+        self.panel_configs = PANEL_CONFIGS
         
         self.visible_keys = ["STW1", "ZSW1", "POS_STW1", "POS_STW2"] 
         self.panels = {}
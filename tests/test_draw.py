@@ -0,0 +1,256 @@
+"""
+波形分析器 (draw.py) 数值部分的回归测试：
+1. 只测不依赖界面的函数与类，不创建 QApplication。
+2. 在仓库根目录运行: python -m pytest -q
+"""
+import os
+import sys
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import draw
+
+
+# === 区间统计 (RangeStats) ===
+def test_range_stats_large_offset():
+    """ 大偏置信号 (1e9 ± 2) 的均值与标准差不因平方和相消而失真 """
+    rows = 10_000_000
+    values = 1e9 + np.where(np.arange(rows) % 2 == 0, 2.0, -2.0)
+    store = draw.ChannelStore({'x': values})
+    stats = draw.RangeStats.build(store, 'x')
+    for start, end in ((0, rows), (123, rows - 4567), (5, 5 + draw.STATS_BLOCK * 3 + 17)):
+        n, lo, hi, mean, m2 = stats.query(store.values('x'), start, end)
+        ref = values[start:end]
+        assert n == end - start
+        assert lo == ref.min() and hi == ref.max()
+        assert abs(mean - ref.mean()) < 1e-6
+        assert abs(np.sqrt(m2 / n) - ref.std()) < 1e-6
+
+
+def test_range_stats_matches_summarize_with_nan():
+    rng = np.random.default_rng(0)
+    values = (rng.normal(0, 1, 50_000) * 1000 + 3.6e6).astype(np.float64)
+    values[rng.integers(0, len(values), 500)] = np.nan
+    store = draw.ChannelStore({'x': values})
+    stats = draw.RangeStats.build(store, 'x')
+    for start, end in ((0, 50_000), (1000, 1001), (777, 40_001)):
+        n, lo, hi, mean, m2 = stats.query(store.values('x'), start, end)
+        rn, rlo, rhi, rmean, rm2 = draw.summarize(values[start:end])
+        assert n == rn and lo == rlo and hi == rhi
+        assert abs(mean - rmean) < 1e-6
+        assert abs(m2 - rm2) <= 1e-9 * max(1.0, rm2)
+
+
+# === 通道数据类型推断 (narrowest_dtype) ===
+def test_narrowest_dtype_keeps_decimal_resolution():
+    """ 3.6e6 ms 附近、0.1 ms 分辨率的时间列不能收窄为 float32 """
+    values = 3.6e6 + np.arange(1000) * 0.1
+    dtype = draw.narrowest_dtype(values)
+    assert dtype == np.float64
+    assert np.array_equal(values.astype(dtype), values)
+    assert draw.narrowest_dtype(np.array([12345.6, 20000.25])) == np.float64
+
+
+def test_narrowest_dtype_exact_demotions():
+    assert draw.narrowest_dtype(np.array([0.0, 16384.0, 65535.0])) == np.uint16
+    assert draw.narrowest_dtype(np.array([-1.0, 2.0 ** 40])) == np.int64
+    # 能被 float32 精确表示的小数 (含空值) 才收窄
+    assert draw.narrowest_dtype(np.array([0.5, 1.25, np.nan])) == np.float32
+    assert draw.narrowest_dtype(np.array([1.0, np.nan, 3.0])) == np.float32
+
+
+def test_narrowest_dtype_keeps_inf_and_huge_values_in_float():
+    """ ±inf 与超出 int64 的整数值不能收窄为整数类型 """
+    assert draw.narrowest_dtype(np.array([1.0, np.inf, 3.0])) == np.float32
+    assert draw.narrowest_dtype(np.array([-np.inf, 0.0])) == np.float32
+    assert draw.narrowest_dtype(np.array([0.0, 1e30])) == np.float64
+    assert draw.narrowest_dtype(np.array([0.0, 2.0 ** 64])) == np.float32
+    assert draw.narrowest_dtype(np.array([-2.0 ** 63, 2.0 ** 62])) == np.int64
+
+
+# === 时间戳列 (IndexedTimeBase) ===
+def test_indexed_time_base_is_float64():
+    """ 时间列即使以 float32 读入，时间轴也按 float64 保存，缺口时长不被量化 """
+    times = 1e5 + np.arange(2000) * 0.5
+    times[1000:] += 101.0
+    store = draw.ChannelStore({'t': times.astype(np.float32), 'x': np.zeros(2000)})
+    tb = draw.IndexedTimeBase(store, 't')
+    assert store.dtype('t') == np.float64
+    assert tb.time_at(1999) == times[1999]
+    assert len(tb.gaps) == 1 and tb.gaps[0][0] == 1000
+    assert tb.gaps[0][1] == 101.5
+
+    decimal = 3.6e6 + np.arange(2000) * 0.1
+    decimal[1500:] += 101.0
+    store = draw.ChannelStore({'t': decimal.astype(draw.narrowest_dtype(decimal))})
+    tb = draw.IndexedTimeBase(store, 't')
+    assert tb.gaps[0][0] == 1500 and abs(tb.gaps[0][1] - 101.1) < 1e-6
+
+
+# === 数值显示 (format_val) ===
+def test_format_val_keeps_float_resolution():
+    """ 浮点通道 (物理量) 保留小数，整数通道仍取整显示 """
+    store = draw.ChannelStore({'v': np.array([12.5, 0.5]), 'w': np.array([1, 2], dtype=np.int16)})
+    scope = SimpleNamespace(store=store, col_formats={})
+    fmt = lambda name, val: draw.ProOscilloscope.format_val(scope, name, val)
+    assert fmt('v', 12.5) == "12.5"
+    assert fmt('v', np.float32(0.001234)) == "0.001234"
+    assert fmt('w', 2.4) == "2"
+    assert fmt('w', np.int16(-3)) == "-3"
+    assert fmt('v', float('nan')) == "NaN"
+
+
+# === 跟随模式 (加载结束位置) ===
+def load_text(path, **kwargs):
+    """ 在当前线程运行加载线程的 run()，返回 (loader, store) """
+    loader = draw.FileLoaderThread(path, **kwargs)
+    result = []
+    loader.finished_signal.connect(result.append)
+    loader.error_signal.connect(lambda msg: result.append(msg))
+    loader.run()
+    return loader, result[0]
+
+
+def test_follow_resumes_after_partial_last_line(tmp_path):
+    """ 文件以未写完的行结尾：加载时不读入半行，补全后跟随读到完整的一行且不重复 """
+    path = tmp_path / 'log.csv'
+    path.write_bytes(b'a,b,c\n1,2,3\n\n4,5')
+    loader, store = load_text(str(path))
+    assert len(store) == 1
+    assert loader.data_end == len(b'a,b,c\n1,2,3\n\n')
+
+    with open(path, 'ab') as fh:
+        fh.write(b',6\n7,8,9\n')
+    fmt = draw.sniff_text_format(str(path))
+    scope = SimpleNamespace(current_file=str(path), follow={
+        'pos': loader.data_end, 'fmt': fmt, 'header': ['a', 'b', 'c'], 'raw_cols': ['a', 'b', 'c']})
+    blocks = draw.ProOscilloscope.read_appended_rows(scope)
+    store.append_rows(blocks)
+    assert list(store.values('a')) == [1, 4, 7] and list(store.values('c')) == [3, 6, 9]
+    assert draw.ProOscilloscope.read_appended_rows(scope) is None
+
+
+# === 位通道 (panel_key) ===
+def test_panel_key_matches_whole_words():
+    """ 报文名须整词出现：STW10 不是 STW1，POS_ZSW1 优先于 ZSW1 """
+    if not draw.PANEL_CONFIGS: pytest.skip("gui_AI 不可用，没有报文配置")
+    assert draw.panel_key('STW1') == 'STW1'
+    assert draw.panel_key('stw1_soll') == 'STW1'
+    assert draw.panel_key('Drive.POS_ZSW1') == 'POS_ZSW1'
+    assert draw.panel_key('轴1 ZSW2') == 'ZSW2'
+    assert draw.panel_key('EposALWordLo') == 'EposALWord Lo'
+    assert draw.panel_key('STW10') is None
+    assert draw.panel_key('XSTW1') is None
+    assert draw.panel_key('速度') is None
+
+
+# === 行偏移索引 (LineIndex) 与区间加载 ===
+def write_rows(path, rows, trailing_newline=True):
+    """ 写入行长不等的 CSV，返回各数据行的起始字节 """
+    text = b'idx,val\n'
+    starts = []
+    for i in range(rows):
+        starts.append(len(text))
+        text += f"{i},{i * 7 % 1000}".encode() + (b'\n' if trailing_newline or i < rows - 1 else b'')
+    path.write_bytes(text)
+    return np.array(starts), len(text)
+
+
+def test_line_index_offsets_across_scan_blocks(tmp_path, monkeypatch):
+    """ 扫描块很小时 (换行落在块边界上) 记录的偏移仍是正确的行首 """
+    monkeypatch.setattr(draw, 'LINE_INDEX_SCAN_BYTES', 7)
+    for trailing in (True, False):
+        path = tmp_path / f'rows_{trailing}.csv'
+        starts, size = write_rows(path, 1000, trailing)
+        index = draw.LineIndex.build(str(path), stride=64)
+        assert index.rows == 1000
+        assert np.array_equal(index.offsets, starts[::64])
+        for row in (0, 1, 63, 64, 65, 999):
+            pos, skip = index.locate(row)
+            assert pos == starts[row - skip] and (row - skip) % 64 == 0
+            assert index.byte_pos(row) == (starts[-(-row // 64) * 64] if -(-row // 64) * 64 < 1000 else size)
+
+
+def test_line_index_sidecar_invalidated_by_change(tmp_path):
+    path = tmp_path / 'rows.csv'
+    write_rows(path, 100)
+    draw.LineIndex.build(str(path), stride=8).save(str(path))
+    loaded = draw.LineIndex.load(str(path))
+    assert loaded is not None and loaded.rows == 100 and loaded.stride == 8
+    with open(path, 'ab') as fh:
+        fh.write(b'100,0\n')
+    assert draw.LineIndex.load(str(path)) is None
+
+
+def test_window_load_reads_exact_rows(tmp_path):
+    """ 区间加载的行与整表读取的同一区间一致 (含跨索引步长、末行无换行) """
+    path = tmp_path / 'rows.csv'
+    write_rows(path, 1000, trailing_newline=False)
+    index = draw.LineIndex.build(str(path), stride=64)
+    for start, end in ((0, 1), (0, 64), (63, 65), (64, 128), (100, 357), (990, 1000)):
+        _, store = load_text(str(path), row_range=(start, end), line_index=index)
+        assert len(store) == end - start
+        assert list(store.values('idx')) == list(range(start, end))
+        assert list(store.values('val')) == [i * 7 % 1000 for i in range(start, end)]
+
+
+# === 触发搜索 (TriggerScanner) ===
+def scan(spec, values, chunk, period=1.0):
+    """ 按 chunk 行一块喂给扫描器，返回 (起始行, 结束行) """
+    scanner = draw.TriggerScanner(spec, draw.TimeBase(0, period))
+    for start in range(0, len(values), chunk):
+        scanner.feed(start, values[start:start + chunk])
+    return scanner.finish(len(values))
+
+
+def test_trigger_scanner_independent_of_chunk_size():
+    """ 分块扫描与整列一次扫描的结果相同 (回差状态、未结束的段跨块传递) """
+    rng = np.random.default_rng(1)
+    t = np.arange(20_000)
+    analog = np.sin(t / 300.0) * 10 + rng.normal(0, 0.8, len(t))
+    analog[rng.integers(0, len(t), 200)] = np.nan
+    word = (rng.random(len(t)) < 0.01).cumsum().astype(np.uint16)
+    specs = [
+        (draw.trigger_spec('level', 'x', level=2.0, hysteresis=1.5, edge='rise'), analog),
+        (draw.trigger_spec('level', 'x', level=-1.0, hysteresis=0.5, edge='both'), analog),
+        (draw.trigger_spec('bit', 'x', bit=1, edge='fall'), word),
+        (draw.trigger_spec('window', 'x', low=-3.0, high=3.0, inside=False, min_width=20.0), analog),
+        (draw.trigger_spec('pulse', 'x', level=5.0, polarity='high', min_width=100.0), analog),
+    ]
+    for spec, values in specs:
+        whole = scan(spec, values, len(values))
+        assert len(whole[0]) > 0, spec
+        for chunk in (1, 7, 999, 4096):
+            starts, ends = scan(spec, values, chunk)
+            assert np.array_equal(starts, whole[0]) and np.array_equal(ends, whole[1]), (spec, chunk)
+
+
+def test_trigger_scanner_matches_across_chunk_boundaries():
+    # 预备段 (低于 level - hysteresis) 在前一块，回差带跨过块边界，穿越在后一块
+    level = draw.trigger_spec('level', 'x', level=1.0, hysteresis=0.6, edge='rise')
+    values = np.array([0.0, 0.5, 0.5, 1.2, 0.5, 1.2])
+    for chunk in (1, 2, 3, 6):
+        starts, _ = scan(level, values, chunk)
+        assert list(starts) == [3], chunk
+
+    # 位跳变恰好落在块的第一行
+    bit = draw.trigger_spec('bit', 'x', bit=0, edge='rise')
+    word = np.array([0, 0, 0, 0, 0, 1, 1, 0, 1, 1], dtype=np.uint16)
+    assert list(scan(bit, word, 5)[0]) == [5, 8]
+
+    # 脉冲跨块：宽度按整段计算，各块内的部分都不够宽
+    pulse = draw.trigger_spec('pulse', 'x', level=1.0, polarity='high', min_width=5.0)
+    values = np.zeros(20)
+    values[3:9] = 2.0     # 6 行，宽度 (9 - 3) * 1 ms
+    values[12:15] = 2.0   # 3 行，不够宽
+    values[17:] = 2.0     # 到末尾仍未结束：宽度 (19 - 17) ms，不够宽
+    for chunk in (1, 4, 5, 20):
+        starts, ends = scan(pulse, values, chunk)
+        assert list(starts) == [3] and list(ends) == [9], chunk
+    values[14:] = 2.0     # 段延续到数据末尾，宽度 (19 - 12) ms
+    for chunk in (1, 4, 5, 20):
+        starts, ends = scan(pulse, values, chunk)
+        assert list(starts) == [3, 12] and list(ends) == [9, 20], chunk